@@ -0,0 +1,260 @@
+import time
+import threading
+
+import VenmoSingleFlight
+
+
+NONE = "none"
+VALID = "valid"
+EXPIRING = "expiring"
+INVALID = "invalid"
+
+
+class TokenManager():
+    """
+        Brief:
+            Tracks the oauth token of a toolbox and renews it. A 401 on a request marks the token invalid and triggers one re-login through `relogin`. Re-logins are single flight per token, so a burst of 401s for the same token logs in once and every caller uses the new token, and a 401 for a token that was already replaced does not log in again. If the login response said when the token expires, it is renewed in the background shortly before that.
+
+        Instance Variables:
+            @var `refreshMargin : float`
+                    -seconds before the expiry a background renewal starts
+            @var `reloginBackoff : float`
+                    -seconds to wait after a failed re-login before trying again, so wrong credentials do not cause a login storm
+    """
+
+    def __init__(self, relogin, refreshMargin = 60.0, reloginBackoff = 5.0, clock = time.monotonic):
+        """
+            Args:
+                @param `relogin : function`
+                        -called with no arguments to log in again. Returns the new token, or "" if it failed
+                @param `refreshMargin : float = 60.0`
+                        -seconds before the expiry a background renewal starts
+                @param `reloginBackoff : float = 5.0`
+                        -seconds to wait after a failed re-login before trying again
+        """
+
+        self.refreshMargin = refreshMargin
+        self.reloginBackoff = reloginBackoff
+
+        self.__relogin = relogin
+        self.__clock = clock
+        self.__token = ""
+        self.__expiresAt = None
+        self.__invalid = False
+        self.__lastFailure = None
+        self.__background = None
+        self.__singleFlight = VenmoSingleFlight.SingleFlight()
+        self.__lock = threading.Lock()
+        self.__counters = {"unauthorized" : 0, "relogins" : 0, "failedRelogins" : 0, "backgroundRelogins" : 0, "replays" : 0}
+
+
+    @property
+    def token(self) -> str:
+        return self.__token
+
+
+    def set(self, token, expiresIn = None) -> None:
+        """
+            Brief:
+                Stores a freshly issued token.
+
+            Args:
+                @param `token : str`
+                        -the oauth token
+                @param `expiresIn : float = None`
+                        -seconds the token is valid for, ex `expires_in` of the login response. None if unknown
+
+            Returns:
+                `None`
+        """
+
+        with self.__lock:
+            self.__token = token
+            self.__invalid = False
+            self.__expiresAt = self.__clock() + float(expiresIn) if expiresIn else None
+
+
+    def clear(self) -> None:
+
+        self.set("")
+
+
+    def state(self) -> str:
+        """
+            Returns:
+                `str` : `NONE` without a token, `INVALID` if the api rejected it or it expired, `EXPIRING` within `refreshMargin` of its expiry, `VALID` otherwise
+        """
+
+        with self.__lock:
+
+            if (not self.__token):
+                return NONE
+
+            if (self.__invalid):
+                return INVALID
+
+            if (self.__expiresAt is not None):
+
+                remaining = self.__expiresAt - self.__clock()
+
+                if (remaining <= 0):
+                    return INVALID
+
+                if (remaining <= self.refreshMargin):
+                    return EXPIRING
+
+            return VALID
+
+
+    def valid(self) -> bool:
+        """
+            Returns:
+                `bool` : whether there is a token that was not rejected and has not expired
+        """
+
+        return self.state() in (VALID, EXPIRING)
+
+
+    def authorize(self, headers) -> dict:
+        """
+            Brief:
+                Puts the current token in the headers of a request that carries one, ex a request that waited in a queue while the token was renewed. Headers without `Authorization`, such as the login request, are returned unchanged.
+
+            Args:
+                @param `headers : dict`
+                        -the request headers
+
+            Returns:
+                `dict` : the headers, copied if the token had to be replaced
+        """
+
+        current = "Bearer " + self.__token
+
+        if ("Authorization" not in headers or not self.__token or headers["Authorization"] == current):
+            return headers
+
+        headers = dict(headers)
+        headers["Authorization"] = current
+
+        return headers
+
+
+    def beforeRequest(self, headers) -> None:
+        """
+            Brief:
+                Starts a background renewal if the token of an authenticated request is about to expire.
+
+            Returns:
+                `None`
+        """
+
+        if ("Authorization" in headers and self.state() == EXPIRING):
+            self.refreshInBackground()
+
+
+    def refresh(self, staleAuthorization = None, timeout = None) -> bool:
+        """
+            Brief:
+                Renews the token after the api rejected it. Callers that pass the same rejected token share one re-login.
+
+            Args:
+                @param `staleAuthorization : str = None`
+                        -the `Authorization` header that was rejected. If the token was already replaced, nothing is done. None renews the current token
+                @param `timeout : float = None`
+                        -longest to wait for a re-login another caller started
+
+            Returns:
+                `bool` : whether there is a new token to use
+        """
+
+        with self.__lock:
+
+            if (staleAuthorization is not None):
+                self.__counters["unauthorized"] += 1
+
+            stale = staleAuthorization if staleAuthorization is not None else "Bearer " + self.__token
+
+            if (self.__token and stale != "Bearer " + self.__token):
+                return True
+
+            self.__invalid = True
+
+        try:
+            return self.__singleFlight.do(("relogin", stale), lambda : self.__runRelogin(stale), timeout)
+        except VenmoSingleFlight.WaitTimeoutError:
+            return False
+
+
+    def refreshInBackground(self) -> None:
+        """
+            Brief:
+                Renews the current token on a background thread, unless a renewal is already running.
+
+            Returns:
+                `None`
+        """
+
+        with self.__lock:
+
+            if (self.__background is not None and self.__background.is_alive()):
+                return
+
+            if (self.__lastFailure is not None and self.__clock() - self.__lastFailure < self.reloginBackoff):
+                return
+
+            stale = "Bearer " + self.__token
+            self.__counters["backgroundRelogins"] += 1
+            self.__background = threading.Thread(target = lambda : self.__singleFlight.do(("relogin", stale), lambda : self.__runRelogin(stale)), daemon = True)
+            self.__background.start()
+
+
+    def countReplay(self) -> None:
+
+        with self.__lock:
+            self.__counters["replays"] += 1
+
+
+    def stats(self) -> dict:
+        """
+            Returns:
+                `dict` : the token `state`, seconds until it `expiresIn` (None if unknown), and the number of `unauthorized` responses, `relogins`, `failedRelogins`, `backgroundRelogins` and `replays` of rejected requests
+        """
+
+        state = self.state()
+
+        with self.__lock:
+            result = dict(self.__counters)
+            result["expiresIn"] = self.__expiresAt - self.__clock() if self.__expiresAt is not None else None
+
+        result["state"] = state
+
+        return result
+
+
+    def __runRelogin(self, stale) -> bool:
+
+        with self.__lock:
+
+            if (self.__token and stale != "Bearer " + self.__token):
+                return True
+
+            if (self.__lastFailure is not None and self.__clock() - self.__lastFailure < self.reloginBackoff):
+                return False
+
+            self.__counters["relogins"] += 1
+
+        try:
+            token = self.__relogin()
+        except Exception:
+            token = ""
+
+        with self.__lock:
+
+            if (not token):
+                self.__lastFailure = self.__clock()
+                self.__counters["failedRelogins"] += 1
+                return False
+
+            self.__lastFailure = None
+
+        return True
@@ -0,0 +1,592 @@
+import os
+import sys
+import gc
+import json
+import time
+import tempfile
+import tracemalloc
+from statistics import median
+from concurrent.futures import ThreadPoolExecutor
+
+import VenmoToolbox
+import VenmoFakeBackend
+import VenmoRecords
+import VenmoRecordReplay
+import VenmoCodec
+import VenmoLazyView
+import VenmoEmulator
+import VenmoHttp2
+
+
+def makeFakeToolbox(backend = None) -> VenmoToolbox.VenmoToolbox:
+    """
+        Brief:
+            Creates a toolbox logged in to a `FakeVenmoBackend` without touching `auth.json` or the network.
+
+        Args:
+            @param `backend : VenmoFakeBackend.FakeVenmoBackend = None`
+                    -backend to log in to. A new one is made if None
+
+        Returns:
+            `VenmoToolbox.VenmoToolbox` : the logged in toolbox
+    """
+
+    toolbox = VenmoToolbox.VenmoToolbox(autoRevokeTokenOnDelete = False)
+    toolbox.session = VenmoFakeBackend.FakeSession(backend)
+
+    loginResponse = toolbox.session.post(toolbox.endpoints["base"] + toolbox.endpoints["oauth"], json = {"phone_email_or_username" : "me", "client_id" : "1", "password" : toolbox.session.backend.password})
+
+    toolbox.deviceID = toolbox.generateRandomDeviceID()
+    toolbox.setAccountVariables(loginResponse.json())
+
+    return toolbox
+
+
+def benchmarkConditionalGets(iterations = 200, friendCount = 1000) -> dict:
+    """
+        Brief:
+            Fetches the account, payment methods and friend list repeatedly with and without conditional GETs and reports the bytes downloaded, json decodes and time taken.
+
+        Args:
+            @param `iterations : int = 200`
+                    -number of times each resource is fetched
+            @param `friendCount : int = 1000`
+                    -size of the friend list
+
+        Returns:
+            `dict` : results keyed by `full` and `conditional`
+    """
+
+    results = {}
+
+    for name, conditionalEndpoints in (("full", set()), ("conditional", {"account", "paymentMethods", "friends"})):
+
+        backend = VenmoFakeBackend.FakeVenmoBackend(userCount = friendCount + 1, friendCount = friendCount)
+        toolbox = makeFakeToolbox(backend)
+
+        for endpoint in ("account", "paymentMethods", "friends"):
+            toolbox.endpointRegistry.tune(endpoint, conditional = endpoint in conditionalEndpoints, cacheTTL = 0.0)
+
+        toolbox.transport.resetStats()
+
+        start = time.perf_counter()
+
+        for iteration in range(iterations):
+            toolbox.setAccountVariables(toolbox.loginJson)
+            toolbox.getPaymentMethods()
+            toolbox.getFriends()
+
+        elapsed = time.perf_counter() - start
+        stats = toolbox.getTransportStats()
+
+        results[name] = {
+            "seconds" : elapsed,
+            "requests" : stats["requests"],
+            "bytesReceived" : stats["bytesReceived"],
+            "decodes" : stats["decodes"],
+            "notModified" : stats["notModified"],
+        }
+
+    return results
+
+
+def benchmarkRecordMemory(count = 100000) -> dict:
+    """
+        Brief:
+            Compares the memory held by a decoded friend list as json dicts and as `FriendRecord`s.
+
+        Args:
+            @param `count : int = 100000`
+                    -number of friends in the list
+
+        Returns:
+            `dict` : results keyed by `dicts` and `records`
+    """
+
+    backend = VenmoFakeBackend.FakeVenmoBackend(userCount = 0)
+    template = backend.users["1"]
+    payload = json.dumps({"data" : [dict(template, id = str(2000000000000000000 + index), username = "user-" + str(index)) for index in range(count)]})
+
+    results = {}
+
+    for name, parse in (("dicts", lambda text : json.loads(text)["data"]), ("records", lambda text : VenmoRecords.FriendRecord.fromResponse(json.loads(text)))):
+
+        gc.collect()
+        tracemalloc.start()
+
+        start = time.perf_counter()
+        parsed = parse(payload)
+        elapsed = time.perf_counter() - start
+
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[name] = {"seconds" : elapsed, "retainedBytes" : current, "peakBytes" : peak, "bytesPerEntry" : current // max(1, len(parsed))}
+
+        del parsed
+
+    return results
+
+
+def benchmarkCodecs(targetBytes = 20000000) -> dict:
+    """
+        Brief:
+            Times decoding and encoding of representative api payloads with every installed json codec, against the old `json.loads(response.text)` path. Garbage collection is paused while timing, like `timeit` does. The payloads are a single user, a page of 50 search results, a friend list of 1337 users and an activity feed of 500 stories, as served by the fake backend.
+
+        Args:
+            @param `targetBytes : int = 20000000`
+                    -bytes to decode per payload and codec. Small payloads are decoded more often so every measurement takes about as long
+
+        Returns:
+            `dict` : microseconds per decode (`<payload>Decode`) and per encode (`<payload>Encode`), keyed by `text` for the old path and by codec name
+    """
+
+    backend = VenmoFakeBackend.FakeVenmoBackend(userCount = 1400, friendCount = 1337)
+    headers = {"Authorization" : "Bearer fake-token"}
+
+    for index in range(500):
+        backend.addActivity(str(2000000000000000000 + index), amount = index + 0.5, note = "payload " + str(index), action = "pay" if index % 3 else "charge")
+
+    payloads = {
+        "user" : backend.handle("GET", "/users/2000000000000000001", headers)[2],
+        "search" : backend.handle("GET", "/users", headers, {"query" : "user-1", "limit" : 50})[2],
+        "friends" : backend.handle("GET", "/users/1/friends?limit=1337", headers)[2],
+        "feed" : backend.handle("GET", "/stories/target-or-actor/1?limit=500", headers)[2],
+    }
+
+    variants = {"text" : (lambda content : json.loads(content.decode("UTF-8")), lambda obj : json.dumps(obj).encode("UTF-8"))}
+
+    for name in VenmoCodec.CODECS:
+        codec = VenmoCodec.getCodec(name)
+        variants[name] = (codec.loads, codec.dumps)
+
+    results = {}
+
+    for variant, (loads, dumps) in variants.items():
+
+        results[variant] = {}
+
+        for payloadName, content in payloads.items():
+
+            repeats = max(5, targetBytes // len(content))
+            decoded = loads(content)
+
+            gc.collect()
+            gc.disable()
+
+            start = time.perf_counter()
+            for repeat in range(repeats):
+                loads(content)
+            results[variant][payloadName + "Decode"] = (time.perf_counter() - start) / repeats * 1000000
+
+            start = time.perf_counter()
+            for repeat in range(repeats):
+                dumps(decoded)
+            results[variant][payloadName + "Encode"] = (time.perf_counter() - start) / repeats * 1000000
+
+            gc.enable()
+
+    return results
+
+
+def benchmarkLazyViews(targetBytes = 20000000) -> dict:
+    """
+        Brief:
+            Compares decoding whole responses with reading them through `VenmoLazyView.LazyView` for the access patterns of the toolbox: the username of a single user, the first match in a page of 50 search results, and the first entry of a 1337 entry friend list.
+
+        Args:
+            @param `targetBytes : int = 20000000`
+                    -bytes to read per payload and variant
+
+        Returns:
+            `dict` : microseconds per read (`<payload>Micros`) and peak bytes allocated by one read (`<payload>PeakBytes`), keyed by `decode` with the fastest codec, `stdlib` and `lazy`
+    """
+
+    backend = VenmoFakeBackend.FakeVenmoBackend(userCount = 1400, friendCount = 1337)
+    headers = {"Authorization" : "Bearer fake-token"}
+    codec = VenmoCodec.getCodec()
+
+    payloads = {
+        "user" : (backend.handle("GET", "/users/2000000000000000001", headers)[2], lambda parsed : parsed.get("data").get("username")),
+        "search" : (backend.handle("GET", "/users", headers, {"query" : "user-1", "limit" : 50})[2], lambda parsed : next(user["id"] for user in parsed.get("data") if user["username"] == "user-1")),
+        "friends" : (backend.handle("GET", "/users/1/friends?limit=1337", headers)[2], lambda parsed : next(iter(parsed.get("data")))["username"]),
+    }
+
+    variants = {"decode" : codec.loads, "stdlib" : VenmoCodec.getCodec("json").loads, "lazy" : VenmoLazyView.LazyView}
+    results = {}
+
+    for variant, parse in variants.items():
+
+        results[variant] = {}
+
+        for payloadName, (content, read) in payloads.items():
+
+            repeats = max(5, targetBytes // len(content))
+
+            start = time.perf_counter()
+            for repeat in range(repeats):
+                read(parse(content))
+            results[variant][payloadName + "Micros"] = (time.perf_counter() - start) / repeats * 1000000
+
+            gc.collect()
+            tracemalloc.start()
+            read(parse(content))
+            results[variant][payloadName + "PeakBytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    return results
+
+
+BUDGET_CALLS = {
+    "getUserInformationByID" : lambda toolbox : toolbox.getUserInformationByID("2000000000000000001"),
+    "getUserInformationByUsername" : lambda toolbox : toolbox.getUserInformationByUsername("user-2"),
+    "getUserIDByUsername" : lambda toolbox : toolbox.getUserIDByUsername("user-3"),
+    "getUsernameByUserID" : lambda toolbox : toolbox.getUsernameByUserID("2000000000000000004"),
+    "searchUsers" : lambda toolbox : toolbox.searchUsers("user-1"),
+    "getPaymentMethods" : lambda toolbox : toolbox.getPaymentMethods(),
+    "getFriends" : lambda toolbox : toolbox.getFriends(),
+    "getUsersFriends" : lambda toolbox : toolbox.getUsersFriends("2000000000000000005"),
+    "getFriendsDelta" : lambda toolbox : toolbox.getFriendsDelta(),
+    "getActivityFeed" : lambda toolbox : toolbox.getActivityFeed(),
+    "sendMoneyByUserID" : lambda toolbox : toolbox.sendMoneyByUserID(1.0, "2000000000000000006", "100", "budget"),
+    "sendMoneyByUsername" : lambda toolbox : toolbox.sendMoneyByUsername(1.0, "user-7", "100", "budget"),
+    "requestMoneyByUserID" : lambda toolbox : toolbox.requestMoneyByUserID(1.0, "2000000000000000008", "budget"),
+    "requestMoneyByUsername" : lambda toolbox : toolbox.requestMoneyByUsername(1.0, "user-9", "budget"),
+    "sendFriendRequestByUserID" : lambda toolbox : toolbox.sendFriendRequestByUserID("2000000000000000010"),
+    "sendFriendRequestByUsername" : lambda toolbox : toolbox.sendFriendRequestByUsername("user-11"),
+}
+
+
+def checkRequestBudgets(budgets = None) -> dict:
+    """
+        Brief:
+            Calls every public toolbox method in `VenmoToolbox.REQUEST_BUDGETS` twice on a fresh toolbox logged in to a `FakeVenmoBackend`, once with an empty identity cache and once right after, and counts the requests the backend receives each time.
+
+        Args:
+            @param `budgets : dict = None`
+                    -(cold, warm) request budgets by method name. `VenmoToolbox.REQUEST_BUDGETS` if None
+
+        Returns:
+            `dict` : `cold` and `warm` request counts, their budgets and whether they were kept (`ok`) by method name
+    """
+
+    budgets = budgets if budgets is not None else VenmoToolbox.REQUEST_BUDGETS
+    backend = VenmoFakeBackend.FakeVenmoBackend(userCount = 100, friendCount = 20)
+    results = {}
+
+    for name, (coldBudget, warmBudget) in budgets.items():
+
+        toolbox = makeFakeToolbox(backend)
+        counts = []
+
+        for _ in range(2):
+            backend.resetStats()
+            BUDGET_CALLS[name](toolbox)
+            counts.append(backend.stats()["requests"])
+
+        results[name] = {"cold" : counts[0], "coldBudget" : coldBudget, "warm" : counts[1], "warmBudget" : warmBudget, "ok" : counts[0] <= coldBudget and counts[1] <= warmBudget}
+
+    return results
+
+
+def benchmarkHttp2(lookups = 2000, concurrency = 64, handshakeLatency = 0.05, latency = 0.005) -> dict:
+    """
+        Brief:
+            Looks up users by id from `concurrency` threads, once through a toolbox on HTTP/1.1 against an HTTP/1.1 emulator and once through a toolbox on HTTP/2 against an h2c emulator. Every new connection to the emulators takes `handshakeLatency` seconds, like a TCP and TLS handshake would. Reports the connections each emulator accepted and the latency of the lookups. Needs `httpx[http2]` and `h2`, and is skipped without them.
+
+        Args:
+            @param `lookups : int = 2000`
+                    -number of users looked up
+            @param `concurrency : int = 64`
+                    -number of threads looking users up at once. The toolbox's concurrency limiter still bounds the requests in flight
+            @param `handshakeLatency : float = 0.05`
+                    -seconds every new connection is delayed by
+            @param `latency : float = 0.005`
+                    -seconds every response is delayed by
+
+        Returns:
+            `dict` : results keyed by `http1` and `http2`, empty if skipped
+    """
+
+    results = {}
+
+    if (not VenmoHttp2.available() or VenmoEmulator.h2 is None):
+        print("\tskipped, install httpx[http2] to run it")
+        return results
+
+    for name, http2 in (("http1", False), ("http2", True)):
+
+        faults = VenmoEmulator.FaultInjector(VenmoEmulator.LatencyDistribution("fixed", latency), handshakeLatency = handshakeLatency)
+        backend = VenmoFakeBackend.FakeVenmoBackend(userCount = lookups, friendCount = 10)
+
+        with VenmoEmulator.VenmoEmulator(backend = backend, faults = faults, http2 = http2) as emulator:
+
+            toolbox = VenmoToolbox.VenmoToolbox(autoRevokeTokenOnDelete = False)
+            toolbox.session = VenmoHttp2.Http2Session(priorKnowledge = True) if http2 else VenmoHttp2.makeSession()
+            toolbox.endpoints["base"] = emulator.baseURL
+
+            loginResponse = toolbox.session.post(emulator.baseURL + toolbox.endpoints["oauth"], json = {"phone_email_or_username" : "me", "client_id" : "1", "password" : backend.password})
+            toolbox.setAccountVariables(loginResponse.json())
+
+            userIDs = [userID for userID in backend.users if userID != "1"][:lookups]
+
+            def lookUp(userID):
+                start = time.perf_counter()
+                toolbox.getUserInformationByID(userID)
+                return time.perf_counter() - start
+
+            start = time.perf_counter()
+
+            with ThreadPoolExecutor(max_workers = concurrency) as executor:
+                latencies = sorted(executor.map(lookUp, userIDs))
+
+            elapsed = time.perf_counter() - start
+
+            results[name] = {
+                "seconds" : elapsed,
+                "lookupsPerSecond" : len(latencies) / elapsed,
+                "p50Ms" : latencies[len(latencies) // 2] * 1000,
+                "p99Ms" : latencies[int(len(latencies) * 0.99)] * 1000,
+                "connections" : faults.stats()["connections"],
+            }
+
+            toolbox.session.close()
+
+    return results
+
+
+BENCHMARKS = {
+    "conditional" : benchmarkConditionalGets,
+    "records" : benchmarkRecordMemory,
+    "codecs" : benchmarkCodecs,
+    "lazy" : benchmarkLazyViews,
+    "http2" : benchmarkHttp2,
+}
+
+
+def __workflowLogin(toolbox, metadata) -> None:
+
+    previousDirectory = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        os.chdir(directory)
+
+        try:
+            with open("auth.json", mode = "w", encoding = "UTF-8") as authFile:
+                authFile.write(json.dumps(dict(metadata["login"], client_id = "1")))
+
+            if (not toolbox.login(deviceID = metadata.get("deviceID", "88884260-0503-8081-5801-20A76F357009"))):
+                raise RuntimeError("Login workflow failed")
+        finally:
+            os.chdir(previousDirectory)
+
+
+WORKFLOWS = (
+    ("login", __workflowLogin),
+    ("userLookup", lambda toolbox, metadata : toolbox.getUserInformationByUsername(metadata["lookup"]["username"])),
+    ("listFriends", lambda toolbox, metadata : toolbox.getFriends()),
+    ("sendMoney", lambda toolbox, metadata : toolbox.sendMoneyByUsername(metadata["payment"]["amount"], metadata["lookup"]["username"], metadata["payment"]["funding_source_id"], metadata["payment"]["note"])),
+)
+
+
+def runWorkflows(session, metadata, workflows = None) -> dict:
+    """
+        Brief:
+            Runs the standard workflows (login, user lookup, listing friends and sending money) in order on a new toolbox.
+
+        Args:
+            @param `session : requests.Session`
+                    -session the toolbox sends its requests over, ex a `ReplaySession`
+            @param `metadata : dict`
+                    -the workflow parameters, see `recordFixture`
+            @param `workflows : list = None`
+                    -names of the workflows to run. All of them if None, `login` always runs first
+
+        Returns:
+            `dict` : seconds taken by each workflow
+    """
+
+    toolbox = VenmoToolbox.VenmoToolbox(autoRevokeTokenOnDelete = False)
+    toolbox.session = session
+
+    timings = {}
+
+    for name, workflow in WORKFLOWS:
+
+        if (workflows is not None and name != "login" and name not in workflows):
+            continue
+
+        start = time.perf_counter()
+        workflow(toolbox, metadata)
+        timings[name] = time.perf_counter() - start
+
+    return timings
+
+
+def recordFixture(path, session = None, metadata = None) -> None:
+    """
+        Brief:
+            Runs the standard workflows once through a `RecordingSession` and saves the scrubbed exchanges as a fixture. Records against a new `FakeVenmoBackend` unless a session is passed.
+
+        Args:
+            @param `path : str`
+                    -the fixture file to write
+            @param `session : requests.Session = None`
+                    -session to record, ex `requests.Session()` to record the live api
+            @param `metadata : dict = None`
+                    -workflow parameters: `{"login" : {"phone_email_or_username", "password"}, "deviceID", "lookup" : {"username"}, "payment" : {"funding_source_id", "amount", "note"}}`. Use a remembered device id when recording the live api, a recording with a 2FA prompt prompts again on replay
+
+        Returns:
+            `None`
+    """
+
+    if (session is None):
+        session = VenmoFakeBackend.FakeSession()
+
+    if (metadata is None):
+        metadata = {
+            "login" : {"phone_email_or_username" : "me", "password" : "password"},
+            "lookup" : {"username" : "user-42"},
+            "payment" : {"funding_source_id" : "100", "amount" : 1.0, "note" : "benchmark"},
+        }
+
+    recordingSession = VenmoRecordReplay.RecordingSession(session)
+
+    runWorkflows(recordingSession, metadata)
+
+    recordingSession.save(path, metadata)
+
+
+def benchmarkReplay(fixturePath, iterations = 50, realtime = False) -> dict:
+    """
+        Brief:
+            Replays a fixture through the standard workflows and reports the median time of each one.
+
+        Args:
+            @param `fixturePath : str`
+                    -the fixture file
+            @param `iterations : int = 50`
+                    -number of times the workflows are replayed
+            @param `realtime : bool = False`
+                    -replay with the recorded latencies instead of at full speed
+
+        Returns:
+            `dict` : median seconds by workflow
+    """
+
+    fixture = VenmoRecordReplay.Fixture(fixturePath)
+    samples = {}
+
+    for iteration in range(iterations):
+
+        session = VenmoRecordReplay.ReplaySession(fixture, realtime)
+
+        for name, seconds in runWorkflows(session, fixture.metadata).items():
+            samples.setdefault(name, []).append(seconds)
+
+        if (session.misses):
+            raise RuntimeError(str(session.misses) + " requests had no recorded exchange. The fixture does not match the current client.")
+
+    return {name : median(values) for name, values in samples.items()}
+
+
+def compareWithBaseline(results, baselinePath, tolerance = 0.25) -> list:
+    """
+        Brief:
+            Compares benchmark results with a stored baseline.
+
+        Args:
+            @param `results : dict`
+                    -seconds by workflow
+            @param `baselinePath : str`
+                    -json file with the baseline seconds by workflow
+            @param `tolerance : float = 0.25`
+                    -how much slower than the baseline a workflow may be, 0.25 being 25%
+
+        Returns:
+            `list` : `(workflow, baselineSeconds, seconds)` of every workflow that regressed
+    """
+
+    with open(baselinePath, mode = "r", encoding = "UTF-8") as file:
+        baseline = json.loads(file.read())
+
+    return [(name, baseline[name], seconds) for name, seconds in results.items() if name in baseline and seconds > baseline[name] * (1 + tolerance)]
+
+
+def __replayCommand(args) -> int:
+
+    if (not args):
+        print("Usage: VenmoBenchmarks.py replay <fixture> [baseline.json] [--update] [--realtime]")
+        return 2
+
+    fixturePath = args[0]
+    baselinePath = args[1] if len(args) > 1 and not args[1].startswith("--") else None
+
+    results = benchmarkReplay(fixturePath, realtime = "--realtime" in args)
+
+    for name, seconds in results.items():
+        print("\t" + name + " : " + format(seconds * 1000, ".3f") + "ms")
+
+    if (baselinePath is None):
+        return 0
+
+    if ("--update" in args or not os.path.exists(baselinePath)):
+
+        with open(baselinePath, mode = "w", encoding = "UTF-8") as file:
+            file.write(json.dumps(results, indent = 2))
+
+        print("Baseline written to " + baselinePath)
+        return 0
+
+    regressions = compareWithBaseline(results, baselinePath)
+
+    for name, baselineSeconds, seconds in regressions:
+        print("REGRESSION " + name + " : " + format(baselineSeconds * 1000, ".3f") + "ms -> " + format(seconds * 1000, ".3f") + "ms")
+
+    return 1 if regressions else 0
+
+
+def main(args) -> int:
+
+    if (args and args[0] == "record"):
+
+        if (len(args) < 2):
+            print("Usage: VenmoBenchmarks.py record <fixture>")
+            return 2
+
+        recordFixture(args[1])
+        print("Fixture written to " + args[1])
+        return 0
+
+    if (args and args[0] == "replay"):
+        return __replayCommand(args[1:])
+
+    if (args and args[0] == "budgets"):
+
+        results = checkRequestBudgets()
+
+        for name, result in results.items():
+            print(("\t" if result["ok"] else "OVER BUDGET ") + name + " : cold=" + str(result["cold"]) + "/" + str(result["coldBudget"]) + ", warm=" + str(result["warm"]) + "/" + str(result["warmBudget"]))
+
+        return 0 if all(result["ok"] for result in results.values()) else 1
+
+    names = args if args else list(BENCHMARKS)
+
+    for name in names:
+
+        if (name not in BENCHMARKS):
+            print("Unknown benchmark " + name + ". Choose from: " + ", ".join(BENCHMARKS))
+            continue
+
+        print(name)
+
+        for variant, result in BENCHMARKS[name]().items():
+            print("\t" + variant + " : " + ", ".join(key + "=" + (format(value, ".4f") if isinstance(value, float) else str(value)) for key, value in result.items()))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,335 @@
+import time
+import threading
+from collections import deque
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """
+        Brief:
+            Raised instead of sending a request while the circuit for its endpoint class is open.
+
+        Instance Variables:
+            @var `name : str`
+                    -the endpoint class of the open circuit
+            @var `retryAfter : float`
+                    -seconds until the circuit lets a probe request through
+    """
+
+    def __init__(self, name, retryAfter):
+
+        super().__init__("The venmo api is failing for {} requests, not sending the request. Retry in {:.1f} seconds.".format(name, retryAfter))
+
+        self.name = name
+        self.retryAfter = retryAfter
+
+
+
+class CircuitBreaker():
+    """
+        Brief:
+            Tracks the outcome of recent calls and stops calls while the dependency is failing. The circuit opens once the failure rate or the rate of slow calls over the last `windowSize` calls crosses its threshold. While open, calls fail fast with `CircuitOpenError`. After `openSeconds` it goes half open and lets `halfOpenProbes` calls through, closing again if they all succeed and reopening if any fail.
+
+        Instance Variables:
+            @var `name : str`
+                    -name of the circuit, ex the endpoint class
+            @var `failureRateThreshold : float`
+                    -fraction of failed calls in the window that opens the circuit
+            @var `slowCallSeconds : float`
+                    -calls taking at least this long count as slow
+            @var `slowCallRateThreshold : float`
+                    -fraction of slow calls in the window that opens the circuit
+            @var `windowSize : int`
+                    -number of recent calls the rates are measured over
+            @var `minimumCalls : int`
+                    -number of calls needed in the window before the circuit can open
+            @var `openSeconds : float`
+                    -how long the circuit stays open before it lets probes through
+            @var `halfOpenProbes : int`
+                    -number of probe calls let through while half open
+    """
+
+    def __init__(self, name, failureRateThreshold = 0.5, slowCallSeconds = 10.0, slowCallRateThreshold = 0.8, windowSize = 20, minimumCalls = 10, openSeconds = 30.0, halfOpenProbes = 2, clock = time.monotonic):
+
+        self.name = name
+        self.failureRateThreshold = failureRateThreshold
+        self.slowCallSeconds = slowCallSeconds
+        self.slowCallRateThreshold = slowCallRateThreshold
+        self.windowSize = windowSize
+        self.minimumCalls = minimumCalls
+        self.openSeconds = openSeconds
+        self.halfOpenProbes = halfOpenProbes
+
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__state = CLOSED
+        self.__window = deque(maxlen = windowSize)
+        self.__openedAt = 0.0
+        self.__probesInFlight = 0
+        self.__probeSuccesses = 0
+        self.__rejected = 0
+
+
+    def beforeCall(self) -> bool:
+        """
+            Brief:
+                Checks whether a call may go ahead. Must be followed by `recordSuccess`, `recordFailure` or, if the call is not sent after all, `cancelCall` with the value returned here.
+
+            Returns:
+                `bool` : whether the call is a half open probe
+
+            Raises:
+                `CircuitOpenError` : if the circuit is open, or half open with every probe already in flight
+        """
+
+        with self.__lock:
+
+            if (self.__state == OPEN):
+
+                remaining = self.openSeconds - (self.__clock() - self.__openedAt)
+
+                if (remaining > 0):
+                    self.__rejected += 1
+                    raise CircuitOpenError(self.name, remaining)
+
+                self.__state = HALF_OPEN
+                self.__probesInFlight = 0
+                self.__probeSuccesses = 0
+
+            if (self.__state == HALF_OPEN):
+
+                if (self.__probesInFlight + self.__probeSuccesses >= self.halfOpenProbes):
+                    self.__rejected += 1
+                    raise CircuitOpenError(self.name, 0.0)
+
+                self.__probesInFlight += 1
+                return True
+
+            return False
+
+
+    def recordSuccess(self, latency, probe = False) -> None:
+        """
+            Brief:
+                Records a call that got a usable response. Slow calls count against the slow call rate.
+
+            Args:
+                @param `latency : float`
+                        -how long the call took in seconds
+                @param `probe : bool = False`
+                        -the value returned by `beforeCall`
+
+            Returns:
+                `None`
+        """
+
+        slow = latency >= self.slowCallSeconds
+
+        with self.__lock:
+
+            if (probe):
+
+                self.__probesInFlight -= 1
+
+                if (self.__state != HALF_OPEN):
+                    return
+
+                if (slow):
+                    self.__open()
+                    return
+
+                self.__probeSuccesses += 1
+
+                if (self.__probeSuccesses >= self.halfOpenProbes):
+                    self.__state = CLOSED
+                    self.__window.clear()
+
+                return
+
+            self.__record(False, slow)
+
+
+    def recordFailure(self, latency = 0.0, probe = False) -> None:
+        """
+            Brief:
+                Records a call that failed, ex a connection error, timeout or 5xx response.
+
+            Args:
+                @param `latency : float = 0.0`
+                        -how long the call took in seconds
+                @param `probe : bool = False`
+                        -the value returned by `beforeCall`
+
+            Returns:
+                `None`
+        """
+
+        with self.__lock:
+
+            if (probe):
+
+                self.__probesInFlight -= 1
+
+                if (self.__state == HALF_OPEN):
+                    self.__open()
+
+                return
+
+            self.__record(True, latency >= self.slowCallSeconds)
+
+
+    def cancelCall(self, probe = False) -> None:
+        """
+            Brief:
+                Gives back a call allowed by `beforeCall` that was never sent, ex because it timed out waiting for a concurrency slot. Nothing is recorded, a probe only frees its place.
+
+            Args:
+                @param `probe : bool = False`
+                        -the value returned by `beforeCall`
+
+            Returns:
+                `None`
+        """
+
+        if (not probe):
+            return
+
+        with self.__lock:
+            self.__probesInFlight -= 1
+
+
+    def state(self) -> str:
+        """
+            Returns:
+                `str` : `closed`, `open` or `half_open`
+        """
+
+        with self.__lock:
+
+            if (self.__state == OPEN and self.__clock() - self.__openedAt >= self.openSeconds):
+                return HALF_OPEN
+
+            return self.__state
+
+
+    def stats(self) -> dict:
+        """
+            Brief:
+                Returns the state of the circuit and the rates it is measured on.
+
+            Returns:
+                `dict` : `state`, `calls` in the window, `failureRate`, `slowCallRate`, `rejected` calls and `retryAfter` seconds while open
+        """
+
+        state = self.state()
+
+        with self.__lock:
+
+            calls = len(self.__window)
+
+            return {
+                "state" : state,
+                "calls" : calls,
+                "failureRate" : sum(1 for failed, slow in self.__window if failed) / calls if calls else 0.0,
+                "slowCallRate" : sum(1 for failed, slow in self.__window if slow) / calls if calls else 0.0,
+                "rejected" : self.__rejected,
+                "retryAfter" : max(0.0, self.openSeconds - (self.__clock() - self.__openedAt)) if state == OPEN else 0.0,
+            }
+
+
+    def reset(self) -> None:
+        """
+            Brief:
+                Closes the circuit and forgets every recorded call.
+
+            Returns:
+                `None`
+        """
+
+        with self.__lock:
+            self.__state = CLOSED
+            self.__window.clear()
+            self.__probesInFlight = 0
+            self.__probeSuccesses = 0
+
+
+    def __record(self, failed, slow) -> None:
+
+        self.__window.append((failed, slow))
+
+        if (self.__state != CLOSED or len(self.__window) < self.minimumCalls):
+            return
+
+        calls = len(self.__window)
+        failureRate = sum(1 for entryFailed, entrySlow in self.__window if entryFailed) / calls
+        slowCallRate = sum(1 for entryFailed, entrySlow in self.__window if entrySlow) / calls
+
+        if (failureRate >= self.failureRateThreshold or slowCallRate >= self.slowCallRateThreshold):
+            self.__open()
+
+
+    def __open(self) -> None:
+
+        self.__state = OPEN
+        self.__openedAt = self.__clock()
+        self.__probeSuccesses = 0
+
+
+
+class CircuitBreakerRegistry():
+    """
+        Brief:
+            Holds one circuit breaker per endpoint class, creating them on first use with the same settings.
+
+        Instance Variables:
+            @var `settings : dict`
+                    -keyword arguments passed to every new `CircuitBreaker`
+    """
+
+    def __init__(self, **settings):
+        """
+            Args:
+                @param `**settings`
+                        -keyword arguments passed to every new `CircuitBreaker`, ex `failureRateThreshold = 0.5`
+        """
+
+        self.settings = settings
+        self.__breakers = {}
+        self.__lock = threading.Lock()
+
+
+    def get(self, name) -> CircuitBreaker:
+        """
+            Args:
+                @param `name : str`
+                        -the endpoint class
+
+            Returns:
+                `CircuitBreaker` : the breaker for the endpoint class
+        """
+
+        with self.__lock:
+
+            breaker = self.__breakers.get(name)
+
+            if (breaker is None):
+                breaker = CircuitBreaker(name, **self.settings)
+                self.__breakers[name] = breaker
+
+            return breaker
+
+
+    def states(self) -> dict:
+        """
+            Returns:
+                `dict` : `CircuitBreaker.stats()` of every breaker by endpoint class
+        """
+
+        with self.__lock:
+            breakers = dict(self.__breakers)
+
+        return {name : breaker.stats() for name, breaker in breakers.items()}
@@ -0,0 +1,102 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class StdlibCodec():
+    """
+        Brief:
+            Json codec on top of the standard library `json` module. Always available.
+    """
+
+    name = "json"
+
+    def loads(self, data):
+        """
+            Brief:
+                Decodes json.
+
+            Args:
+                @param `data : bytes | str`
+                        -the encoded json, ex `response.content`
+
+            Returns:
+                `dict | list` : the decoded value
+        """
+
+        return json.loads(data)
+
+
+    def dumps(self, obj, sortKeys = False, indent = None, default = None) -> bytes:
+        """
+            Brief:
+                Encodes a value as compact UTF-8 json, or indented if `indent` is given.
+
+            Args:
+                @param `obj : dict | list`
+                        -the value to encode
+                @param `sortKeys : bool = False`
+                        -sort the keys of every dict, ex to use the result as a cache key
+                @param `indent : int = None`
+                        -number of spaces to indent nested values by. Compact if None
+                @param `default : callable = None`
+                        -called with values json can not encode, returns an encodable replacement
+
+            Returns:
+                `bytes` : the encoded json
+        """
+
+        return json.dumps(obj, indent = indent, separators = (",", ":") if indent is None else (",", ": "), sort_keys = sortKeys, ensure_ascii = False, default = default).encode("UTF-8")
+
+
+
+class OrjsonCodec():
+    """
+        Brief:
+            Json codec on top of `orjson`, which decodes and encodes several times faster than the standard library and works on bytes directly. Only available if `orjson` is installed.
+    """
+
+    name = "orjson"
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+    def dumps(self, obj, sortKeys = False, indent = None, default = None) -> bytes:
+
+        if (indent not in (None, 2)):
+            return StdlibCodec().dumps(obj, sortKeys, indent, default)
+
+        return orjson.dumps(obj, default = default, option = (orjson.OPT_SORT_KEYS if sortKeys else 0) | (orjson.OPT_INDENT_2 if indent else 0))
+
+
+
+CODECS = {"json" : StdlibCodec}
+
+if (orjson is not None):
+    CODECS["orjson"] = OrjsonCodec
+
+
+def getCodec(name = None):
+    """
+        Brief:
+            Returns a json codec by name.
+
+        Args:
+            @param `name : str = None`
+                    -a key of `CODECS`. None picks the fastest installed codec
+
+        Returns:
+            `StdlibCodec | OrjsonCodec` : the codec
+    """
+
+    if (name is None):
+        name = "orjson" if "orjson" in CODECS else "json"
+
+    if (name not in CODECS):
+        raise ValueError("Unknown or unavailable json codec " + str(name) + ". Choose from: " + ", ".join(CODECS))
+
+    return CODECS[name]()
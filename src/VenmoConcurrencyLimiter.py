@@ -0,0 +1,194 @@
+import time
+import threading
+
+
+SUCCESS = "success"
+ERROR = "error"
+THROTTLED = "throttled"
+DROPPED = "dropped"
+
+
+class AcquireTimeoutError(TimeoutError):
+    """
+        Brief:
+            Raised when a request waited longer than allowed for a free concurrency slot.
+    """
+
+
+
+class AdaptiveLimiter():
+    """
+        Brief:
+            Adaptive concurrency limit for requests to the venmo api. Works like TCP congestion control (AIMD): while requests succeed and their recent latency stays near the long term average, the limit grows by about one per round trip. Throttled (429), failed (5xx), dropped or slow requests shrink it by `backoffRatio`, at most once per `decreaseInterval`. Requests beyond the limit wait in `acquire` for a free slot.
+
+        Instance Variables:
+            @var `minLimit : int`
+                    -the limit never drops below this
+            @var `maxLimit : int`
+                    -the limit never grows above this
+            @var `backoffRatio : float`
+                    -factor the limit is multiplied by on a decrease
+            @var `latencyTolerance : float`
+                    -recent latency above `latencyTolerance` times the long term average counts as a sign of overload
+            @var `decreaseInterval : float`
+                    -minimum seconds between two decreases, so one burst of failures only shrinks the limit once. None waits one recent round trip
+            @var `smoothing : tuple`
+                    -weights of a new latency sample in the recent and the long term moving averages
+    """
+
+    def __init__(self, initialLimit = 4, minLimit = 1, maxLimit = 64, backoffRatio = 0.7, latencyTolerance = 2.0, decreaseInterval = None, smoothing = (0.2, 0.02), clock = time.monotonic):
+
+        self.minLimit = minLimit
+        self.maxLimit = maxLimit
+        self.backoffRatio = backoffRatio
+        self.latencyTolerance = latencyTolerance
+        self.decreaseInterval = decreaseInterval
+        self.smoothing = smoothing
+
+        self.__clock = clock
+        self.__condition = threading.Condition()
+        self.__limit = float(max(minLimit, min(maxLimit, initialLimit)))
+        self.__inFlight = 0
+        self.__recentLatency = None
+        self.__baselineLatency = None
+        self.__lastDecrease = None
+        self.__counters = {SUCCESS : 0, ERROR : 0, THROTTLED : 0, DROPPED : 0, "increases" : 0, "decreases" : 0, "waits" : 0}
+
+
+    @property
+    def limit(self) -> int:
+        """
+            Returns:
+                `int` : the current number of requests allowed in flight at once
+        """
+
+        return max(self.minLimit, int(self.__limit))
+
+
+    def acquire(self, timeout = None) -> None:
+        """
+            Brief:
+                Waits for a free slot under the current limit. Must be followed by `release`.
+
+            Args:
+                @param `timeout : float = None`
+                        -longest to wait in seconds, None waits as long as needed
+
+            Returns:
+                `None`
+
+            Raises:
+                `AcquireTimeoutError` : if no slot was free within `timeout`
+        """
+
+        with self.__condition:
+
+            if (self.__inFlight >= self.limit):
+
+                self.__counters["waits"] += 1
+
+                if (not self.__condition.wait_for(lambda : self.__inFlight < self.limit, timeout)):
+                    raise AcquireTimeoutError("Timed out waiting for a free request slot, the concurrency limit is " + str(self.limit) + ".")
+
+            self.__inFlight += 1
+
+
+    def tryAcquire(self, reserve = 0) -> bool:
+        """
+            Brief:
+                Takes a free slot without waiting. Must be followed by `release` if it succeeds.
+
+            Args:
+                @param `reserve : int = 0`
+                        -number of slots to leave free for other callers. At least one slot can always be taken when nothing is in flight
+
+            Returns:
+                `bool` : whether a slot was taken
+        """
+
+        with self.__condition:
+
+            if (self.__inFlight >= max(1, self.limit - reserve)):
+                return False
+
+            self.__inFlight += 1
+
+            return True
+
+
+    def release(self, latency, outcome = SUCCESS) -> None:
+        """
+            Brief:
+                Frees the slot taken by `acquire` and adjusts the limit from the outcome of the request.
+
+            Args:
+                @param `latency : float`
+                        -how long the request took in seconds
+                @param `outcome : str = SUCCESS`
+                        -`SUCCESS`, `ERROR` for a 5xx, `THROTTLED` for a 429, `DROPPED` for a timeout or connection error, or None if the request was never sent
+
+            Returns:
+                `None`
+        """
+
+        with self.__condition:
+
+            saturated = self.__inFlight >= self.limit
+            self.__inFlight -= 1
+            now = self.__clock()
+
+            if (outcome in (ERROR, THROTTLED, DROPPED)):
+
+                self.__counters[outcome] += 1
+                self.__decrease(now)
+
+            elif (outcome == SUCCESS):
+
+                self.__counters[SUCCESS] += 1
+
+                if (self.__baselineLatency is None):
+                    self.__recentLatency = latency
+                    self.__baselineLatency = latency
+                else:
+                    self.__recentLatency += (latency - self.__recentLatency) * self.smoothing[0]
+                    self.__baselineLatency += (latency - self.__baselineLatency) * self.smoothing[1]
+
+                if (self.__recentLatency > self.__baselineLatency * self.latencyTolerance):
+                    self.__decrease(now)
+                elif (saturated and self.__limit < self.maxLimit):
+                    self.__limit = min(float(self.maxLimit), self.__limit + 1.0 / self.__limit)
+                    self.__counters["increases"] += 1
+
+            self.__condition.notify_all()
+
+
+    def stats(self) -> dict:
+        """
+            Brief:
+                Returns the current limit and counters, ex to export the chosen limit as a metric.
+
+            Returns:
+                `dict` : `limit`, `inFlight`, the `recentLatency` and `baselineLatency` moving averages, the number of requests per outcome and the number of `increases`, `decreases` and `waits`
+        """
+
+        with self.__condition:
+
+            result = dict(self.__counters)
+            result["limit"] = self.limit
+            result["inFlight"] = self.__inFlight
+            result["recentLatency"] = self.__recentLatency
+            result["baselineLatency"] = self.__baselineLatency
+
+            return result
+
+
+    def __decrease(self, now) -> None:
+
+        interval = self.decreaseInterval if self.decreaseInterval is not None else (self.__recentLatency or 0.0)
+
+        if (self.__lastDecrease is not None and now - self.__lastDecrease < interval):
+            return
+
+        self.__lastDecrease = now
+        self.__limit = max(float(self.minLimit), self.__limit * self.backoffRatio)
+        self.__counters["decreases"] += 1
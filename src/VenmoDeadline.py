@@ -0,0 +1,125 @@
+import time
+
+
+class DeadlineExceededError(TimeoutError):
+    """
+        Brief:
+            Raised when the remaining time budget of an operation cannot cover its next request.
+
+        Instance Variables:
+            @var `remaining : float`
+                    -seconds that were left in the budget
+    """
+
+    def __init__(self, remaining, step = ""):
+
+        message = "Deadline exceeded"
+
+        if (step):
+            message += " before " + step
+
+        super().__init__(message + ", {:.3f} seconds of the budget left.".format(max(0.0, remaining)))
+
+        self.remaining = remaining
+
+
+
+class Deadline():
+    """
+        Brief:
+            An absolute point in time an operation has to finish by. Composite toolbox methods pass one deadline to every request they make, so each request only gets the time that is left of the overall budget.
+
+        Instance Variables:
+            @var `expiresAt : float`
+                    -`time.monotonic()` value the deadline expires at, None for no deadline
+            @var `minimumStep : float`
+                    -smallest budget in seconds worth starting a request with. Requests with less time left fail fast
+    """
+
+    def __init__(self, seconds = None, minimumStep = 0.05, clock = time.monotonic):
+        """
+            Args:
+                @param `seconds : float = None`
+                        -time budget from now. None means no deadline
+                @param `minimumStep : float = 0.05`
+                        -smallest budget in seconds worth starting a request with
+        """
+
+        self.__clock = clock
+        self.expiresAt = None if seconds is None else clock() + seconds
+        self.minimumStep = minimumStep
+
+
+    @classmethod
+    def of(cls, deadline):
+        """
+            Brief:
+                Converts the `deadline` argument the toolbox methods take into a `Deadline`.
+
+            Args:
+                @param `deadline : float | Deadline | None`
+                        -a budget in seconds, an existing deadline, or None for no deadline
+
+            Returns:
+                `Deadline` : the deadline. An existing deadline is returned as is so nested calls share it
+        """
+
+        if (isinstance(deadline, Deadline)):
+            return deadline
+
+        return cls(deadline)
+
+
+    def remaining(self) -> float:
+        """
+            Returns:
+                `float` : seconds left, or None if there is no deadline
+        """
+
+        if (self.expiresAt is None):
+            return None
+
+        return self.expiresAt - self.__clock()
+
+
+    def expired(self) -> bool:
+        """
+            Returns:
+                `bool` : whether the deadline has passed
+        """
+
+        remaining = self.remaining()
+
+        return remaining is not None and remaining <= 0
+
+
+    def timeout(self, default = None, step = "") -> float:
+        """
+            Brief:
+                Returns the timeout to use for the next request: the smaller of the remaining budget and `default`.
+
+            Args:
+                @param `default : float = None`
+                        -the timeout used without a deadline
+                @param `step : str = ""`
+                        -name of the next step, used in the error message
+
+            Returns:
+                `float` : the timeout in seconds
+
+            Raises:
+                `DeadlineExceededError` : if less than `minimumStep` seconds are left
+        """
+
+        remaining = self.remaining()
+
+        if (remaining is None):
+            return default
+
+        if (remaining < self.minimumStep):
+            raise DeadlineExceededError(remaining, step)
+
+        if (default is None):
+            return remaining
+
+        return min(default, remaining)
@@ -0,0 +1,579 @@
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import threading
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import VenmoFakeBackend
+
+try:
+    import h2.config
+    import h2.events
+    import h2.connection
+    import h2.exceptions
+except ImportError:
+    h2 = None
+
+
+class LatencyDistribution():
+    """
+        Brief:
+            Draws the artificial latency added to each response.
+
+        Instance Variables:
+            @var `kind : str`
+                    -`none`, `fixed`, `uniform`, `exponential` or `lognormal`
+            @var `params : tuple`
+                    -parameters of the distribution in seconds. `fixed : value`, `uniform : low, high`, `exponential : mean`, `lognormal : median, sigma`
+    """
+
+    KINDS = ("none", "fixed", "uniform", "exponential", "lognormal")
+
+    def __init__(self, kind = "none", *params):
+
+        if (kind not in self.KINDS):
+            raise ValueError("Unknown latency distribution " + kind)
+
+        self.kind = kind
+        self.params = tuple(float(param) for param in params)
+        self.__random = random.Random()
+
+
+    @classmethod
+    def parse(cls, text):
+        """
+            Brief:
+                Parses a distribution written as `kind:param:param`, ex `lognormal:0.05:0.5`.
+
+            Args:
+                @param `text : str`
+                        -the distribution
+
+            Returns:
+                `LatencyDistribution` : the parsed distribution
+        """
+
+        parts = text.split(":")
+
+        return cls(parts[0], *parts[1:])
+
+
+    def sample(self) -> float:
+        """
+            Returns:
+                `float` : a latency in seconds
+        """
+
+        if (self.kind == "fixed"):
+            return self.params[0]
+
+        if (self.kind == "uniform"):
+            return self.__random.uniform(self.params[0], self.params[1])
+
+        if (self.kind == "exponential"):
+            return self.__random.expovariate(1.0 / self.params[0])
+
+        if (self.kind == "lognormal"):
+            return self.__random.lognormvariate(0.0, self.params[1]) * self.params[0]
+
+        return 0.0
+
+
+
+class FaultInjector():
+    """
+        Brief:
+            Decides which faults to inject into each request.
+
+        Instance Variables:
+            @var `latency : LatencyDistribution`
+                    -latency added before every response
+            @var `errorRate : float`
+                    -fraction of requests answered with a 500
+            @var `dropRate : float`
+                    -fraction of requests whose connection is closed without a response
+            @var `throttleRate : float`
+                    -chance that a request starts a burst of 429 responses
+            @var `throttleBurst : int`
+                    -number of requests answered with 429 in each burst
+            @var `retryAfter : float`
+                    -`Retry-After` seconds sent with 429 responses
+            @var `handshakeLatency : float`
+                    -seconds every new connection is delayed by before its first request, imitating a TCP and TLS handshake
+    """
+
+    def __init__(self, latency = None, errorRate = 0.0, dropRate = 0.0, throttleRate = 0.0, throttleBurst = 20, retryAfter = 1.0, handshakeLatency = 0.0, seed = None):
+
+        self.latency = latency if latency is not None else LatencyDistribution()
+        self.errorRate = errorRate
+        self.dropRate = dropRate
+        self.throttleRate = throttleRate
+        self.throttleBurst = throttleBurst
+        self.retryAfter = retryAfter
+        self.handshakeLatency = handshakeLatency
+
+        self.__random = random.Random(seed)
+        self.__throttleRemaining = 0
+        self.__lock = threading.Lock()
+        self.__counters = {"connections" : 0, "requests" : 0, "errors" : 0, "dropped" : 0, "throttled" : 0}
+
+
+    def decide(self) -> str:
+        """
+            Returns:
+                `str` : the fault for the next request, `drop`, `throttle`, `error` or "" for none
+        """
+
+        with self.__lock:
+
+            self.__counters["requests"] += 1
+
+            if (self.__throttleRemaining == 0 and self.throttleRate and self.__random.random() < self.throttleRate):
+                self.__throttleRemaining = self.throttleBurst
+
+            if (self.__throttleRemaining > 0):
+                self.__throttleRemaining -= 1
+                self.__counters["throttled"] += 1
+                return "throttle"
+
+            roll = self.__random.random()
+
+            if (roll < self.dropRate):
+                self.__counters["dropped"] += 1
+                return "drop"
+
+            if (roll < self.dropRate + self.errorRate):
+                self.__counters["errors"] += 1
+                return "error"
+
+            return ""
+
+
+    def connect(self) -> float:
+        """
+            Brief:
+                Counts a new connection.
+
+            Returns:
+                `float` : seconds to delay the connection by
+        """
+
+        with self.__lock:
+            self.__counters["connections"] += 1
+
+        return self.handshakeLatency
+
+
+    def stats(self) -> dict:
+        """
+            Returns:
+                `dict` : number of `connections` accepted, `requests`, injected `errors`, `dropped` connections and `throttled` responses
+        """
+
+        with self.__lock:
+            return dict(self.__counters)
+
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+
+        super().setup()
+        time.sleep(self.server.faults.connect())
+
+
+    def log_message(self, format, *args) -> None:
+
+        if (self.server.verbose):
+            super().log_message(format, *args)
+
+
+    def __handle(self) -> None:
+
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        rawBody = self.rfile.read(length) if length else b""
+
+        try:
+            body = json.loads(rawBody) if rawBody else None
+        except ValueError:
+            body = None
+
+        faults = self.server.faults
+        fault = faults.decide()
+
+        time.sleep(faults.latency.sample())
+
+        if (fault == "drop"):
+            self.close_connection = True
+            return
+
+        if (fault == "throttle"):
+            self.__respond(429, {"Retry-After" : str(int(faults.retryAfter))}, b"{\"error\":{\"code\":429,\"message\":\"Too many requests\"}}")
+            return
+
+        if (fault == "error"):
+            self.__respond(500, {}, b"{\"error\":{\"code\":500,\"message\":\"Internal server error\"}}")
+            return
+
+        status, headers, content = self.server.backend.handle(self.command, self.path, dict(self.headers.items()), body)
+
+        self.__respond(status, headers, content)
+
+
+    def __respond(self, status, headers, content) -> None:
+
+        self.send_response(status)
+
+        for key, value in headers.items():
+            self.send_header(key, value)
+
+        if ("Content-Type" not in headers):
+            self.send_header("Content-Type", "application/json")
+
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+
+        if (content):
+            self.wfile.write(content)
+
+
+    do_GET = __handle
+    do_POST = __handle
+    do_DELETE = __handle
+
+
+
+class _Http2Handler(socketserver.BaseRequestHandler):
+    """
+        Brief:
+            Serves one HTTP/2 connection with prior knowledge (h2c). The connection's thread reads frames and every request that arrives is answered on a worker thread, so the streams of one connection are served concurrently.
+    """
+
+    def setup(self) -> None:
+
+        time.sleep(self.server.faults.connect())
+
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.__connection = h2.connection.H2Connection(h2.config.H2Configuration(client_side = False, header_encoding = "utf-8"))
+        self.__lock = threading.Lock()
+        self.__windowOpened = threading.Condition(self.__lock)
+        self.__streams = {}
+        self.__closed = False
+
+
+    def handle(self) -> None:
+
+        workers = ThreadPoolExecutor(max_workers = self.server.maxStreams)
+
+        with self.__lock:
+            self.__connection.initiate_connection()
+            self.__flush()
+
+        try:
+            while (not self.__closed):
+
+                try:
+                    data = self.request.recv(65536)
+                except OSError:
+                    break
+
+                if (not data):
+                    break
+
+                with self.__lock:
+
+                    try:
+                        events = self.__connection.receive_data(data)
+                    except h2.exceptions.ProtocolError:
+                        self.__flush()
+                        break
+
+                    for event in events:
+                        self.__onEvent(event, workers)
+
+                    self.__flush()
+
+        finally:
+
+            with self.__lock:
+                self.__closed = True
+                self.__windowOpened.notify_all()
+
+            workers.shutdown(wait = False, cancel_futures = True)
+
+
+    def __onEvent(self, event, workers) -> None:
+
+        if (isinstance(event, h2.events.RequestReceived)):
+            self.__streams[event.stream_id] = (dict(event.headers), bytearray())
+
+        elif (isinstance(event, h2.events.DataReceived)):
+
+            if (event.stream_id in self.__streams):
+                self.__streams[event.stream_id][1].extend(event.data)
+                self.__connection.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+
+        elif (isinstance(event, h2.events.StreamEnded)):
+
+            headers, body = self.__streams.pop(event.stream_id, (None, None))
+
+            if (headers is not None):
+                workers.submit(self.__handleStream, event.stream_id, headers, bytes(body))
+
+        elif (isinstance(event, h2.events.StreamReset)):
+            self.__streams.pop(event.stream_id, None)
+
+        elif (isinstance(event, h2.events.WindowUpdated)):
+            self.__windowOpened.notify_all()
+
+        elif (isinstance(event, h2.events.ConnectionTerminated)):
+            self.__closed = True
+
+
+    def __handleStream(self, streamID, headers, rawBody) -> None:
+
+        try:
+            body = json.loads(rawBody) if rawBody else None
+        except ValueError:
+            body = None
+
+        faults = self.server.faults
+        fault = faults.decide()
+
+        time.sleep(faults.latency.sample())
+
+        if (fault == "drop"):
+            with self.__lock:
+                if (not self.__closed):
+                    self.__connection.reset_stream(streamID)
+                    self.__flush()
+            return
+
+        if (fault == "throttle"):
+            self.__respond(streamID, 429, {"Retry-After" : str(int(faults.retryAfter))}, b"{\"error\":{\"code\":429,\"message\":\"Too many requests\"}}")
+            return
+
+        if (fault == "error"):
+            self.__respond(streamID, 500, {}, b"{\"error\":{\"code\":500,\"message\":\"Internal server error\"}}")
+            return
+
+        requestHeaders = {"-".join(part.capitalize() for part in name.split("-")) : value for name, value in headers.items() if not name.startswith(":")}
+        status, responseHeaders, content = self.server.backend.handle(headers.get(":method", "GET"), headers.get(":path", "/"), requestHeaders, body)
+
+        self.__respond(streamID, status, responseHeaders, content)
+
+
+    def __respond(self, streamID, status, headers, content) -> None:
+
+        responseHeaders = [(":status", str(status))]
+        responseHeaders.extend((key.lower(), str(value)) for key, value in headers.items())
+
+        if ("Content-Type" not in headers):
+            responseHeaders.append(("content-type", "application/json"))
+
+        responseHeaders.append(("content-length", str(len(content))))
+
+        with self.__lock:
+
+            try:
+                self.__connection.send_headers(streamID, responseHeaders, end_stream = not content)
+
+                sent = 0
+
+                while (sent < len(content) and not self.__closed):
+
+                    window = min(self.__connection.local_flow_control_window(streamID), self.__connection.max_outbound_frame_size)
+
+                    if (window <= 0):
+                        self.__flush()
+                        self.__windowOpened.wait()
+                        continue
+
+                    chunk = content[sent : sent + window]
+                    sent += len(chunk)
+
+                    self.__connection.send_data(streamID, chunk, end_stream = sent >= len(content))
+
+                self.__flush()
+
+            except (h2.exceptions.StreamClosedError, h2.exceptions.ProtocolError):
+                pass
+
+
+    def __flush(self) -> None:
+
+        data = self.__connection.data_to_send()
+
+        if (data):
+            try:
+                self.request.sendall(data)
+            except OSError:
+                self.__closed = True
+
+
+
+class _Http2Server(socketserver.ThreadingTCPServer):
+
+    daemon_threads = True
+    allow_reuse_address = True
+    maxStreams = 100
+
+
+
+class VenmoEmulator():
+    """
+        Brief:
+            Local http server that serves the endpoints in `VenmoToolbox.endpoints` from a `FakeVenmoBackend`, with configurable latency, 500 errors, 429 bursts and dropped connections. Point a toolbox at it with `toolbox.endpoints["base"] = emulator.baseURL`. It speaks HTTP/1.1 with keep alive, or HTTP/2 with prior knowledge (h2c) if made with `http2`, ex for a toolbox made with `http2 = True` and a `VenmoHttp2.Http2Session(priorKnowledge = True)` session. Dropped HTTP/2 requests have their stream reset.
+
+        Instance Variables:
+            @var `backend : VenmoFakeBackend.FakeVenmoBackend`
+                    -the backend answering requests
+            @var `faults : FaultInjector`
+                    -the faults injected into requests
+            @var `baseURL : str`
+                    -api base url of the running emulator
+            @var `http2 : bool`
+                    -whether it speaks HTTP/2 instead of HTTP/1.1
+    """
+
+    def __init__(self, host = "127.0.0.1", port = 0, backend = None, faults = None, verbose = False, http2 = False):
+        """
+            Args:
+                @param `host : str = "127.0.0.1"`
+                        -address to listen on
+                @param `port : int = 0`
+                        -port to listen on, 0 picks a free port
+                @param `backend : VenmoFakeBackend.FakeVenmoBackend = None`
+                        -backend to serve. A new one is made if None
+                @param `faults : FaultInjector = None`
+                        -faults to inject. None injects nothing
+                @param `verbose : bool = False`
+                        -log every request to stderr. HTTP/1.1 only
+                @param `http2 : bool = False`
+                        -speak HTTP/2 with prior knowledge instead of HTTP/1.1. Needs the `h2` package
+
+            Raises:
+                `ImportError` : if `http2` is set and `h2` is not installed
+        """
+
+        if (http2 and h2 is None):
+            raise ImportError("The HTTP/2 emulator needs the h2 package. Install it with: pip install h2")
+
+        self.backend = backend if backend is not None else VenmoFakeBackend.FakeVenmoBackend()
+        self.faults = faults if faults is not None else FaultInjector()
+        self.http2 = http2
+
+        if (http2):
+            self.__server = _Http2Server((host, port), _Http2Handler)
+        else:
+            self.__server = ThreadingHTTPServer((host, port), _RequestHandler)
+            self.__server.daemon_threads = True
+
+        self.__server.backend = self.backend
+        self.__server.faults = self.faults
+        self.__server.verbose = verbose
+        self.__thread = None
+
+        self.baseURL = "http://{}:{}/v1".format(*self.__server.server_address[:2])
+
+
+    def start(self) -> "VenmoEmulator":
+        """
+            Brief:
+                Starts serving on a background thread.
+
+            Returns:
+                `VenmoEmulator` : this emulator
+        """
+
+        self.__thread = threading.Thread(target = self.__server.serve_forever, daemon = True)
+        self.__thread.start()
+
+        return self
+
+
+    def serveForever(self) -> None:
+        """
+            Brief:
+                Serves on the calling thread until interrupted.
+
+            Returns:
+                `None`
+        """
+
+        self.__server.serve_forever()
+
+
+    def stop(self) -> None:
+        """
+            Brief:
+                Stops the server and closes its socket.
+
+            Returns:
+                `None`
+        """
+
+        if (self.__thread is not None):
+            self.__server.shutdown()
+            self.__thread.join()
+            self.__thread = None
+
+        self.__server.server_close()
+
+
+    def __enter__(self):
+        return self.start()
+
+
+    def __exit__(self, excType, excValue, traceback):
+        self.stop()
+
+
+
+def parseArgs(args) -> argparse.Namespace:
+
+    parser = argparse.ArgumentParser(description = "Local venmo api emulator with latency and fault injection.")
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 8080)
+    parser.add_argument("--users", type = int, default = 1000, help = "number of users in the directory")
+    parser.add_argument("--friends", type = int, default = 100, help = "number of friends per user")
+    parser.add_argument("--latency", default = "none", help = "kind:params, ex fixed:0.05, uniform:0.01:0.1, exponential:0.05, lognormal:0.05:0.5")
+    parser.add_argument("--error-rate", type = float, default = 0.0, help = "fraction of requests answered with a 500")
+    parser.add_argument("--drop-rate", type = float, default = 0.0, help = "fraction of connections closed without a response")
+    parser.add_argument("--throttle-rate", type = float, default = 0.0, help = "chance a request starts a burst of 429s")
+    parser.add_argument("--throttle-burst", type = int, default = 20, help = "number of 429s in a burst")
+    parser.add_argument("--handshake-latency", type = float, default = 0.0, help = "seconds every new connection is delayed by")
+    parser.add_argument("--http2", action = "store_true", help = "speak HTTP/2 with prior knowledge (h2c) instead of HTTP/1.1")
+    parser.add_argument("--seed", type = int, default = None)
+    parser.add_argument("--verbose", action = "store_true")
+
+    return parser.parse_args(args)
+
+
+def main(args) -> None:
+
+    options = parseArgs(args)
+
+    faults = FaultInjector(LatencyDistribution.parse(options.latency), options.error_rate, options.drop_rate, options.throttle_rate, options.throttle_burst, handshakeLatency = options.handshake_latency, seed = options.seed)
+    emulator = VenmoEmulator(options.host, options.port, VenmoFakeBackend.FakeVenmoBackend(options.users, options.friends), faults, options.verbose, options.http2)
+
+    print("Serving the venmo api emulator at " + emulator.baseURL + ". The password is \"" + emulator.backend.password + "\".")
+
+    try:
+        emulator.serveForever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.stop()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,270 @@
+from urllib.parse import quote, urlencode
+
+import VenmoScheduler
+
+
+DEFAULT_BASE = "https://api.venmo.com/v1"
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE")
+
+
+class Endpoint():
+    """
+        Brief:
+            Descriptor of one venmo api endpoint: how to build its url and the policies its requests are sent with. The path template is split into its literal pieces and the fixed query string is encoded once, so building a url only joins strings. Descriptors are immutable, assigning a field raises `AttributeError`. Use `replace` or `EndpointRegistry.tune` to change a policy.
+
+        Instance Variables:
+            @var `name : str`
+                    -name the toolbox dispatches by, ex `friends`
+            @var `method : str`
+                    -http method
+            @var `path : str`
+                    -path template below the base url, `{}` marks each path argument, ex `/users/{}/friends`
+            @var `params : dict`
+                    -query parameters sent with every request, ex `{"limit" : 1337}`
+            @var `rateClass : str`
+                    -endpoint class that shares a circuit breaker, ex `users`
+            @var `priority : str`
+                    -scheduler priority class of the requests, see `VenmoScheduler`. A `VenmoToolbox.priority` block overrides it
+            @var `timeout : float`
+                    -seconds to wait for the api on each request, None for the toolbox's `timeout`
+            @var `retries : int`
+                    -times a request is sent again after a connection error, timeout, 5xx or 429. 0 for endpoints that are not safe to repeat, ex payments
+            @var `cacheTTL : float`
+                    -seconds a cached response is served without asking the api again. 0 to always ask
+            @var `conditional : bool`
+                    -revalidate GETs with `If-None-Match`/`If-Modified-Since` instead of downloading them in full
+            @var `idempotent : bool`
+                    -whether sending a request twice has the same effect as sending it once. Only idempotent requests are sent again with a renewed token after a 401. Defaults to whether `method` is idempotent, see `IDEMPOTENT_METHODS`
+    """
+
+    __slots__ = ("name", "method", "path", "params", "rateClass", "priority", "timeout", "retries", "cacheTTL", "conditional", "idempotent", "__literals", "__query")
+
+    def __init__(self, name, method, path, params = None, rateClass = None, priority = VenmoScheduler.INTERACTIVE, timeout = None, retries = 0, cacheTTL = 0.0, conditional = False, idempotent = None):
+
+        self.name = name
+        self.method = method
+        self.path = path
+        self.params = dict(params) if params else {}
+        self.rateClass = rateClass if rateClass is not None else name
+        self.priority = priority
+        self.timeout = timeout
+        self.retries = retries
+        self.cacheTTL = cacheTTL
+        self.conditional = conditional
+        self.idempotent = idempotent if idempotent is not None else method in IDEMPOTENT_METHODS
+
+        self.__literals = tuple(path.split("{}"))
+        self.__query = urlencode(self.params)
+
+
+    @property
+    def fragment(self) -> str:
+        """
+            Returns:
+                `str` : the path template with the fixed query string, the form `VenmoToolbox.endpoints` used to keep
+        """
+
+        return self.path + "?" + self.__query if self.__query else self.path
+
+
+    @property
+    def safe(self) -> bool:
+        """
+            Returns:
+                `bool` : whether requests to the endpoint can be repeated without side effects, see `idempotent`
+        """
+
+        return self.idempotent
+
+
+    def url(self, base, *args, params = None) -> str:
+        """
+            Brief:
+                Builds the full url of a request.
+
+            Args:
+                @param `base : str`
+                        -the base url, ex `https://api.venmo.com/v1`
+                @param `*args : str`
+                        -one value per `{}` in `path`, quoted
+                @param `params : dict = None`
+                        -query parameters of this request, added after the fixed ones. Parameters that are None are left out
+
+            Returns:
+                `str` : the url
+        """
+
+        literals = self.__literals
+
+        if (len(args) != len(literals) - 1):
+            raise ValueError("Endpoint " + self.name + " takes " + str(len(literals) - 1) + " path arguments, got " + str(len(args)))
+
+        if (args):
+            parts = [literals[0]]
+
+            for arg, literal in zip(args, literals[1:]):
+                parts.append(quote(str(arg), safe = ""))
+                parts.append(literal)
+
+            path = "".join(parts)
+        else:
+            path = literals[0]
+
+        query = self.__query
+
+        if (params):
+
+            extra = urlencode({key : value for key, value in params.items() if value is not None})
+
+            if (extra):
+                query = query + "&" + extra if query else extra
+
+        return base + path + "?" + query if query else base + path
+
+
+    def replace(self, **policies) -> "Endpoint":
+        """
+            Brief:
+                Returns a copy with some fields changed, ex `endpoint.replace(timeout = 5.0, retries = 1)`.
+
+            Returns:
+                `Endpoint` : the copy
+        """
+
+        fields = {field : getattr(self, field) for field in ("name", "method", "path", "params", "rateClass", "priority", "timeout", "retries", "cacheTTL", "conditional", "idempotent")}
+
+        for field in policies:
+            if (field not in fields):
+                raise TypeError("Endpoint has no field " + field)
+
+        fields.update(policies)
+
+        return Endpoint(**fields)
+
+
+    def __setattr__(self, name, value) -> None:
+
+        if (hasattr(self, "_Endpoint__query")):
+            raise AttributeError("Endpoint " + self.name + " is immutable, use replace to change " + name)
+
+        object.__setattr__(self, name, value)
+
+
+    def __delattr__(self, name) -> None:
+
+        raise AttributeError("Endpoint " + self.name + " is immutable")
+
+
+    def __repr__(self) -> str:
+
+        return "Endpoint(" + self.name + ", " + self.method + " " + self.fragment + ")"
+
+
+
+DEFAULT_ENDPOINTS = (
+    Endpoint("oauth", "POST", "/oauth/access_token", rateClass = "auth", timeout = 15.0),
+    Endpoint("logout", "DELETE", "/oauth/access_token", rateClass = "auth", timeout = 5.0, retries = 1),
+    Endpoint("2FAGet", "GET", "/account/two-factor/token", {"client_id" : "1"}, rateClass = "auth", timeout = 15.0, retries = 2),
+    Endpoint("2FAPost", "POST", "/account/two-factor/token", rateClass = "auth", timeout = 15.0),
+    Endpoint("account", "GET", "/me", rateClass = "account", timeout = 10.0, retries = 2, conditional = True),
+    Endpoint("paymentMethods", "GET", "/payment-methods", rateClass = "account", timeout = 10.0, retries = 2, cacheTTL = 60.0, conditional = True),
+    Endpoint("activity", "GET", "/stories/target-or-actor/{}", rateClass = "account", timeout = 15.0, retries = 2, conditional = True),
+    Endpoint("userLookup", "GET", "/users/{}", rateClass = "users", timeout = 10.0, retries = 2),
+    Endpoint("usersLookup", "GET", "/users", rateClass = "users", timeout = 10.0, retries = 2),
+    Endpoint("friends", "GET", "/users/{}/friends", {"limit" : 1337}, rateClass = "users", timeout = 20.0, retries = 2, conditional = True),
+    Endpoint("friendRequest", "POST", "/friend-requests", rateClass = "social", timeout = 15.0),
+    Endpoint("pay", "POST", "/payments", rateClass = "payments", priority = VenmoScheduler.PAYMENTS),
+)
+
+
+class EndpointRegistry():
+    """
+        Brief:
+            The endpoints a toolbox can call, by name. Every toolbox has its own registry, so policies tuned on one do not affect the others.
+    """
+
+    def __init__(self, endpoints = DEFAULT_ENDPOINTS):
+        """
+            Args:
+                @param `endpoints : list = DEFAULT_ENDPOINTS`
+                        -the `Endpoint` descriptors to start with
+        """
+
+        self.__endpoints = {endpoint.name : endpoint for endpoint in endpoints}
+
+
+    def get(self, name) -> Endpoint:
+        """
+            Returns:
+                `Endpoint` : the endpoint called `name`, otherwise None
+        """
+
+        return self.__endpoints.get(name)
+
+
+    def register(self, endpoint) -> None:
+        """
+            Brief:
+                Adds an endpoint, or replaces the one with the same name.
+
+            Args:
+                @param `endpoint : Endpoint`
+                        -the descriptor
+
+            Returns:
+                `None`
+        """
+
+        self.__endpoints[endpoint.name] = endpoint
+
+
+    def tune(self, name, **policies) -> Endpoint:
+        """
+            Brief:
+                Changes the policies of an endpoint, ex `registry.tune("friends", timeout = 5.0, conditional = False)`.
+
+            Args:
+                @param `name : str`
+                        -the endpoint name
+                @param `**policies`
+                        -the fields of `Endpoint` to change
+
+            Returns:
+                `Endpoint` : the new descriptor
+        """
+
+        endpoint = self[name].replace(**policies)
+        self.__endpoints[name] = endpoint
+
+        return endpoint
+
+
+    def fragments(self) -> dict:
+        """
+            Returns:
+                `dict` : the path of every endpoint with its fixed query string, by name
+        """
+
+        return {name : endpoint.fragment for name, endpoint in self.__endpoints.items()}
+
+
+    def __getitem__(self, name) -> Endpoint:
+
+        endpoint = self.__endpoints.get(name)
+
+        if (endpoint is None):
+            raise KeyError("Unknown endpoint " + str(name))
+
+        return endpoint
+
+
+    def __contains__(self, name) -> bool:
+        return name in self.__endpoints
+
+
+    def __iter__(self):
+        return iter(list(self.__endpoints.values()))
+
+
+    def __len__(self) -> int:
+        return len(self.__endpoints)
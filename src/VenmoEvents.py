@@ -0,0 +1,534 @@
+import abc
+import sys
+import time
+import queue
+import threading
+from collections import deque
+
+import VenmoCodec
+
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG : "DEBUG", INFO : "INFO", WARNING : "WARNING", ERROR : "ERROR"}
+
+REQUEST = "request"
+LOGIN = "login"
+LOGOUT = "logout"
+TWO_FACTOR = "twoFactor"
+USER_LOOKUP = "userLookup"
+PAYMENT = "payment"
+FRIEND_REQUEST = "friendRequest"
+TRANSPORT = "transport"
+
+
+class Event():
+    """
+        Brief:
+            One structured event.
+
+        Instance Variables:
+            @var `kind : str`
+                    -what happened, ex `PAYMENT` or `REQUEST`
+            @var `level : int`
+                    -`DEBUG`, `INFO`, `WARNING` or `ERROR`
+            @var `message : str`
+                    -human readable text, "" if there is none
+            @var `time : float`
+                    -`time.time()` it was emitted at
+            @var `endpoint : str`
+                    -name of the endpoint in `VenmoEndpoints.DEFAULT_ENDPOINTS` it concerns, None if none
+            @var `userID : str`
+                    -venmo id of the user it concerns, None if none
+            @var `outcome : str`
+                    -short machine readable result, ex `sent`, `failed` or `notFound`
+            @var `latency : float`
+                    -seconds the operation took, None if not measured
+            @var `fields : dict`
+                    -any other fields
+    """
+
+    __slots__ = ("kind", "level", "message", "time", "endpoint", "userID", "outcome", "latency", "fields")
+
+    def __init__(self, kind, level = INFO, message = "", endpoint = None, userID = None, outcome = None, latency = None, fields = None, timestamp = None):
+
+        self.kind = kind
+        self.level = level
+        self.message = message
+        self.time = timestamp if timestamp is not None else time.time()
+        self.endpoint = endpoint
+        self.userID = str(userID) if userID is not None else None
+        self.outcome = outcome
+        self.latency = latency
+        self.fields = fields if fields is not None else {}
+
+
+    def toJson(self) -> dict:
+        """
+            Returns:
+                `dict` : the event as a flat json object. Fields that are None are left out
+        """
+
+        result = {"time" : self.time, "level" : LEVEL_NAMES.get(self.level, str(self.level)), "kind" : self.kind}
+
+        for name in ("message", "endpoint", "userID", "outcome", "latency"):
+
+            value = getattr(self, name)
+
+            if (value is not None and value != ""):
+                result[name] = value
+
+        for name, value in self.fields.items():
+
+            if (value is not None):
+                result.setdefault(name, value)
+
+        return result
+
+
+    def __repr__(self) -> str:
+        return "Event(" + ", ".join(key + "=" + repr(value) for key, value in self.toJson().items()) + ")"
+
+
+
+class Sink(abc.ABC):
+    """
+        Brief:
+            Base class of the event sinks. `write` is called for every event at or above `minLevel` on the event bus's dispatcher thread, and `flush` after every batch of events.
+
+        Instance Variables:
+            @var `minLevel : int`
+                    -lowest level written
+    """
+
+    def __init__(self, minLevel = INFO):
+
+        self.minLevel = minLevel
+
+
+    @abc.abstractmethod
+    def write(self, event) -> None:
+        """
+            Brief:
+                Writes one event. Subclasses must implement it.
+
+            Args:
+                @param `event : Event`
+                        -the event
+
+            Returns:
+                `None`
+        """
+
+
+    def flush(self) -> None:
+        pass
+
+
+    def close(self) -> None:
+        self.flush()
+
+
+
+class TextSink(Sink):
+    """
+        Brief:
+            Writes events as lines of text, by default to stderr.
+
+        Instance Variables:
+            @var `stream : file`
+                    -text stream written to. None writes to whatever `sys.stderr` is at the time
+            @var `verbose : bool`
+                    -write the time, level, kind and fields of every event. Otherwise only the messages are written, like the toolbox used to print them
+    """
+
+    def __init__(self, stream = None, minLevel = INFO, verbose = True):
+        """
+            Args:
+                @param `stream : file = None`
+                        -text stream written to, None for `sys.stderr`
+                @param `minLevel : int = INFO`
+                        -lowest level written
+                @param `verbose : bool = True`
+                        -write the time, level, kind and fields of every event instead of only the messages
+        """
+
+        super().__init__(minLevel)
+
+        self.stream = stream
+        self.verbose = verbose
+
+
+    def write(self, event) -> None:
+
+        if (self.verbose):
+            self.__stream().write(self.format(event) + "\n")
+        elif (event.message):
+            self.__stream().write(event.message + "\n")
+
+
+    def flush(self) -> None:
+        self.__stream().flush()
+
+
+    def format(self, event) -> str:
+        """
+            Args:
+                @param `event : Event`
+                        -the event
+
+            Returns:
+                `str` : the line written for the event in verbose mode, ex `2024-01-01 12:00:00.250 INFO payment: Sent 5.00 to 123. endpoint=pay userID=123 outcome=sent latency=84.1ms`
+        """
+
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(event.time)) + format(event.time % 1, ".3f")[1:]
+        parts = [stamp, LEVEL_NAMES.get(event.level, str(event.level)), event.kind + ":"]
+
+        if (event.message):
+            parts.append(event.message)
+
+        for name in ("endpoint", "userID", "outcome"):
+
+            value = getattr(event, name)
+
+            if (value is not None):
+                parts.append(name + "=" + str(value))
+
+        if (event.latency is not None):
+            parts.append("latency=" + format(event.latency * 1000, ".1f") + "ms")
+
+        parts.extend(name + "=" + str(value) for name, value in event.fields.items() if value is not None)
+
+        return " ".join(parts)
+
+
+    def __stream(self):
+        return self.stream if self.stream is not None else sys.stderr
+
+
+
+class JsonLinesSink(Sink):
+    """
+        Brief:
+            Writes every event as one json object per line, see `Event.toJson`, to a file or a text stream.
+    """
+
+    def __init__(self, path = None, stream = None, minLevel = DEBUG):
+        """
+            Args:
+                @param `path : str = None`
+                        -file to append to
+                @param `stream : file = None`
+                        -text stream to write to instead of a file
+                @param `minLevel : int = DEBUG`
+                        -lowest level written
+        """
+
+        super().__init__(minLevel)
+
+        if ((path is None) == (stream is None)):
+            raise ValueError("Pass either a path or a stream")
+
+        self.__codec = VenmoCodec.getCodec()
+        self.__file = open(path, mode = "ab") if path is not None else None
+        self.__stream = stream
+
+
+    def write(self, event) -> None:
+
+        line = self.__codec.dumps(event.toJson()) + b"\n"
+
+        if (self.__file is not None):
+            self.__file.write(line)
+        else:
+            self.__stream.write(line.decode("UTF-8"))
+
+
+    def flush(self) -> None:
+        (self.__file if self.__file is not None else self.__stream).flush()
+
+
+    def close(self) -> None:
+
+        self.flush()
+
+        if (self.__file is not None):
+            self.__file.close()
+
+
+
+class MemorySink(Sink):
+    """
+        Brief:
+            Keeps the latest events in memory, ex for tests, benchmarks or a status screen.
+
+        Instance Variables:
+            @var `maxEvents : int`
+                    -most events kept, the oldest are dropped first
+    """
+
+    def __init__(self, maxEvents = 10000, minLevel = DEBUG):
+
+        super().__init__(minLevel)
+
+        self.maxEvents = maxEvents
+        self.__events = deque(maxlen = maxEvents)
+        self.__lock = threading.Lock()
+
+
+    def write(self, event) -> None:
+
+        with self.__lock:
+            self.__events.append(event)
+
+
+    def events(self, kind = None) -> list:
+        """
+            Args:
+                @param `kind : str = None`
+                        -only return events of this kind, all of them if None
+
+            Returns:
+                `list` : the kept events, oldest first
+        """
+
+        with self.__lock:
+            return [event for event in self.__events if kind is None or event.kind == kind]
+
+
+    def clear(self) -> None:
+
+        with self.__lock:
+            self.__events.clear()
+
+
+
+_STOP = object()
+
+
+
+class EventBus():
+    """
+        Brief:
+            Hands events to pluggable sinks without blocking the caller. `emit` only puts the event in a bounded queue and a dispatcher thread writes it to the sinks, so a slow terminal or file never slows the toolbox down. If the queue is full the event is dropped and counted. Without sinks, or below the lowest level any sink writes, `emit` returns right away without creating the event, so nothing is printed by default.
+
+        Instance Variables:
+            @var `maxQueued : int`
+                    -most events waiting for the dispatcher
+    """
+
+    def __init__(self, maxQueued = 10000):
+        """
+            Args:
+                @param `maxQueued : int = 10000`
+                        -most events waiting for the dispatcher before new ones are dropped
+        """
+
+        self.maxQueued = maxQueued
+
+        self.__queue = queue.Queue(maxQueued)
+        self.__sinks = ()
+        self.__minLevel = None
+        self.__thread = None
+        self.__pending = 0
+        self.__lock = threading.Lock()
+        self.__drained = threading.Condition(self.__lock)
+        self.__counters = {"emitted" : 0, "dropped" : 0, "delivered" : 0, "sinkErrors" : 0}
+
+
+    def addSink(self, sink) -> Sink:
+        """
+            Brief:
+                Starts writing events to a sink. Starts the dispatcher thread if needed.
+
+            Args:
+                @param `sink : Sink`
+                        -the sink
+
+            Returns:
+                `Sink` : the sink
+        """
+
+        with self.__lock:
+
+            self.__sinks = self.__sinks + (sink,)
+            self.__minLevel = min(each.minLevel for each in self.__sinks)
+
+            if (self.__thread is None):
+                self.__thread = threading.Thread(target = self.__run, daemon = True)
+                self.__thread.start()
+
+        return sink
+
+
+    def removeSink(self, sink) -> None:
+        """
+            Brief:
+                Stops writing events to a sink. Events already queued may still reach it.
+
+            Returns:
+                `None`
+        """
+
+        with self.__lock:
+            self.__sinks = tuple(each for each in self.__sinks if each is not sink)
+            self.__minLevel = min((each.minLevel for each in self.__sinks), default = None)
+
+
+    def enabled(self, level = DEBUG) -> bool:
+        """
+            Args:
+                @param `level : int = DEBUG`
+                        -an event level
+
+            Returns:
+                `bool` : whether any sink writes events of that level. Check it before measuring something only an event needs
+        """
+
+        minLevel = self.__minLevel
+
+        return minLevel is not None and level >= minLevel
+
+
+    def emit(self, kind, message = "", level = INFO, endpoint = None, userID = None, outcome = None, latency = None, **fields) -> None:
+        """
+            Brief:
+                Queues an event for the sinks, see `Event` for the arguments. Never blocks.
+
+            Returns:
+                `None`
+        """
+
+        if (not self.enabled(level)):
+            return
+
+        event = Event(kind, level, message, endpoint, userID, outcome, latency, fields)
+
+        with self.__lock:
+
+            try:
+                self.__queue.put_nowait(event)
+            except queue.Full:
+                self.__counters["dropped"] += 1
+                return
+
+            self.__counters["emitted"] += 1
+            self.__pending += 1
+
+
+    def flush(self, timeout = 1.0) -> bool:
+        """
+            Brief:
+                Waits until the sinks have written and flushed every queued event, ex before prompting for input so messages show up first.
+
+            Args:
+                @param `timeout : float = 1.0`
+                        -most seconds to wait
+
+            Returns:
+                `bool` : whether every event was written in time
+        """
+
+        with self.__drained:
+            return self.__drained.wait_for(lambda : self.__pending == 0, timeout)
+
+
+    def close(self, timeout = 1.0) -> None:
+        """
+            Brief:
+                Flushes the queued events, stops the dispatcher thread and closes every sink. Adding a sink afterwards starts a new dispatcher.
+
+            Args:
+                @param `timeout : float = 1.0`
+                        -most seconds to wait for the queued events, and then for the dispatcher to stop
+
+            Returns:
+                `None`
+        """
+
+        self.flush(timeout)
+
+        with self.__lock:
+            sinks = self.__sinks
+            thread = self.__thread
+            self.__sinks = ()
+            self.__minLevel = None
+            self.__thread = None
+
+        if (thread is not None):
+            try:
+                self.__queue.put(_STOP, timeout = timeout)
+            except queue.Full:
+                pass
+            else:
+                thread.join(timeout)
+
+        for sink in sinks:
+            try:
+                sink.close()
+            except Exception:
+                pass
+
+
+    def stats(self) -> dict:
+        """
+            Returns:
+                `dict` : number of events `emitted`, `dropped` because the queue was full and `delivered` to sinks, `sinkErrors` raised by sinks, events still `queued` and the number of `sinks`
+        """
+
+        with self.__lock:
+            result = dict(self.__counters)
+            result["queued"] = self.__pending
+            result["sinks"] = len(self.__sinks)
+
+        return result
+
+
+    def __run(self) -> None:
+
+        stopping = False
+
+        while (not stopping):
+
+            batch = [self.__queue.get()]
+
+            while (len(batch) < 256):
+                try:
+                    batch.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if (_STOP in batch):
+                stopping = True
+                batch = [event for event in batch if event is not _STOP]
+
+            sinks = self.__sinks
+            delivered = 0
+            errors = 0
+
+            for sink in sinks:
+
+                for event in batch:
+
+                    if (event.level < sink.minLevel):
+                        continue
+
+                    try:
+                        sink.write(event)
+                        delivered += 1
+                    except Exception:
+                        errors += 1
+
+                try:
+                    sink.flush()
+                except Exception:
+                    errors += 1
+
+            with self.__drained:
+                self.__counters["delivered"] += delivered
+                self.__counters["sinkErrors"] += errors
+                self.__pending -= len(batch)
+                self.__drained.notify_all()
@@ -0,0 +1,430 @@
+import json
+import time
+import hashlib
+import threading
+from email.utils import formatdate
+from urllib.parse import urlsplit, parse_qs
+
+
+def requestBody(jsonBody = None, data = None):
+    """
+        Brief:
+            Returns the json body of a request made through a session stand in, whether it was passed as `json` or already encoded as `data`.
+
+        Args:
+            @param `jsonBody : dict = None`
+                    -the `json` argument of the request
+            @param `data : bytes | str = None`
+                    -the `data` argument of the request
+
+        Returns:
+            `dict` : the body, None if there is none
+    """
+
+    if (jsonBody is not None):
+        return jsonBody
+
+    if (data):
+        return json.loads(data)
+
+    return None
+
+
+
+class FakeResponse():
+    """
+        Brief:
+            Minimal stand in for `requests.Response` returned by `FakeSession`.
+    """
+
+    def __init__(self, statusCode, headers, content):
+        self.status_code = statusCode
+        self.headers = headers
+        self.content = content
+        self.ok = statusCode < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("UTF-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+
+class FakeVenmoBackend():
+    """
+        Brief:
+            In memory imitation of the parts of the venmo api the toolbox uses. Generates a directory of users, friend lists and payment methods, and sends `ETag`/`Last-Modified` validators so conditional requests can be measured. Requests are counted per method and path.
+
+        Instance Variables:
+            @var `users : dict`
+                    -user json by user id, the logged in user is id `1`
+            @var `friends : dict`
+                    -list of friend ids by user id
+            @var `paymentMethods : list`
+                    -payment method json of the logged in user
+            @var `payments : list`
+                    -json bodies of every payment or charge that was posted
+            @var `stories : list`
+                    -activity feed stories, oldest first. Posted payments and `addActivity` add to it
+            @var `password : str`
+                    -password the fake oauth endpoint accepts
+            @var `accessToken : str`
+                    -the token the oauth endpoint hands out. Only the latest token is accepted, see `revokeTokens`
+            @var `tokenLifetime : float`
+                    -seconds a token is accepted for, sent as `expires_in` on login. Every login issues a new token while it is set. None for tokens that do not expire
+    """
+
+    def __init__(self, userCount = 1000, friendCount = 100, password = "password"):
+        """
+            Args:
+                @param `userCount : int = 1000`
+                        -number of users in the fake directory, not counting the logged in user
+                @param `friendCount : int = 100`
+                        -number of friends every user has
+                @param `password : str = "password"`
+                        -password the fake oauth endpoint accepts
+        """
+
+        self.password = password
+        self.accessToken = "fake-token"
+        self.tokenLifetime = None
+        self.users = {}
+        self.friends = {}
+        self.payments = []
+        self.friendRequests = []
+        self.stories = []
+        self.lastModified = formatdate(usegmt = True)
+        self.__lock = threading.Lock()
+        self.__counters = {"requests" : 0, "bytesSent" : 0, "notModified" : 0}
+        self.__pathCounts = {}
+        self.__tokenIssuedAt = time.monotonic()
+        self.__tokenGeneration = 0
+
+        self.users["1"] = self.__makeUser("1", "me", "Test", "Account", "me")
+
+        for index in range(userCount):
+            userID = str(2000000000000000000 + index)
+            self.users[userID] = self.__makeUser(userID, "user-" + str(index), "First" + str(index), "Last" + str(index), "not_friends")
+
+        userIDs = list(self.users)
+
+        for position, userID in enumerate(userIDs):
+            self.friends[userID] = [userIDs[(position + offset) % len(userIDs)] for offset in range(1, min(friendCount, len(userIDs) - 1) + 1)]
+
+        self.paymentMethods = [
+            {"id" : "100", "type" : "balance", "name" : "Venmo balance", "last_four" : None, "peer_payment_role" : "default"},
+            {"id" : "101", "type" : "bank", "name" : "Test Bank", "last_four" : "1234", "peer_payment_role" : "backup"},
+        ]
+
+
+    def __makeUser(self, userID, username, firstName, lastName, friendStatus) -> dict:
+
+        return {
+            "id" : userID,
+            "username" : username,
+            "first_name" : firstName,
+            "last_name" : lastName,
+            "display_name" : firstName + " " + lastName,
+            "friend_status" : friendStatus,
+            "is_active" : True,
+            "is_blocked" : False,
+            "about" : "No Short Bio",
+            "profile_picture_url" : "https://example.invalid/" + userID + ".png",
+            "date_joined" : "2015-01-01T00:00:00",
+            "identity_type" : "personal",
+        }
+
+
+    def revokeTokens(self) -> str:
+        """
+            Brief:
+                Invalidates every issued token, ex to simulate a revoked or expired session. Requests with the old token get a 401 until the client logs in again.
+
+            Returns:
+                `str` : the token the next login hands out
+        """
+
+        with self.__lock:
+            self.__tokenGeneration += 1
+            self.accessToken = "fake-token-" + str(self.__tokenGeneration)
+            self.__tokenIssuedAt = time.monotonic()
+
+        return self.accessToken
+
+
+    def addActivity(self, actorID, targetID = "1", amount = 1.0, note = "", action = "pay") -> dict:
+        """
+            Brief:
+                Adds a story to the activity feed, ex to simulate an incoming payment or payment request.
+
+            Args:
+                @param `actorID : str`
+                        -id of the user who sent the payment or request
+                @param `targetID : str = "1"`
+                        -id of the user it was sent to, the logged in user by default
+                @param `amount : float = 1.0`
+                        -amount in dollars
+                @param `note : str = ""`
+                        -the payment note
+                @param `action : str = "pay"`
+                        -`pay` for a payment, `charge` for a payment request
+
+            Returns:
+                `dict` : the story json
+        """
+
+        with self.__lock:
+
+            storyID = str(4000000000000000000 + len(self.stories))
+            story = {
+                "id" : storyID,
+                "type" : "payment",
+                "date_created" : formatdate(usegmt = True),
+                "payment" : {
+                    "id" : str(3000000000000000000 + len(self.stories)),
+                    "action" : action,
+                    "amount" : amount,
+                    "note" : note,
+                    "status" : "settled" if action == "pay" else "pending",
+                    "actor" : self.users.get(str(actorID), {"id" : str(actorID)}),
+                    "target" : {"type" : "user", "user" : self.users.get(str(targetID), {"id" : str(targetID)})},
+                },
+            }
+
+            self.stories.append(story)
+
+        return story
+
+
+    def handle(self, method, url, headers = None, body = None) -> tuple:
+        """
+            Brief:
+                Handles one api request.
+
+            Args:
+                @param `method : str`
+                        -http method
+                @param `url : str`
+                        -full url or path of the request
+                @param `headers : dict = None`
+                        -request headers
+                @param `body : dict = None`
+                        -decoded json body
+
+            Returns:
+                `tuple` : `(statusCode : int, headers : dict, content : bytes)`
+        """
+
+        headers = headers or {}
+        parts = urlsplit(url)
+        path = parts.path
+
+        if (path.startswith("/v1")):
+            path = path[3:]
+
+        query = {key : values[-1] for key, values in parse_qs(parts.query).items()}
+
+        status, payload = self.__route(method.upper(), path.rstrip("/"), query, headers, body or {})
+
+        content = json.dumps(payload, separators = (",", ":")).encode("UTF-8")
+        responseHeaders = {"Content-Type" : "application/json; charset=utf-8"}
+
+        if (method.upper() == "GET" and status == 200):
+
+            etag = "\"" + hashlib.sha1(content).hexdigest()[:20] + "\""
+            responseHeaders["ETag"] = etag
+            responseHeaders["Last-Modified"] = self.lastModified
+
+            if (headers.get("If-None-Match") == etag or (not headers.get("If-None-Match") and headers.get("If-Modified-Since") == self.lastModified)):
+                status = 304
+                content = b""
+
+        with self.__lock:
+
+            self.__counters["requests"] += 1
+            self.__counters["bytesSent"] += len(content)
+
+            if (status == 304):
+                self.__counters["notModified"] += 1
+
+            countKey = method.upper() + " " + self.__pathTemplate(path)
+            self.__pathCounts[countKey] = self.__pathCounts.get(countKey, 0) + 1
+
+        return status, responseHeaders, content
+
+
+    def __pathTemplate(self, path) -> str:
+
+        parts = path.rstrip("/").split("/")
+
+        return "/".join("{}" if part.isdigit() else part for part in parts)
+
+
+    def __route(self, method, path, query, headers, body) -> tuple:
+
+        parts = path.strip("/").split("/")
+        authorized = headers.get("Authorization", "") == "Bearer " + self.accessToken and (self.tokenLifetime is None or time.monotonic() - self.__tokenIssuedAt < self.tokenLifetime)
+
+        if (path == "/oauth/access_token"):
+
+            if (method == "DELETE"):
+                return 200, {}
+
+            if (body.get("password", "") != self.password):
+                return 400, {"error" : {"code" : 264, "message" : "Your email or password was incorrect."}}
+
+            if (self.tokenLifetime is not None):
+                self.revokeTokens()
+
+            loginJson = {"access_token" : self.accessToken, "balance" : "100.00", "user" : dict(self.users["1"])}
+
+            if (self.tokenLifetime is not None):
+                loginJson["expires_in"] = self.tokenLifetime
+
+            return 200, loginJson
+
+        if (path.startswith("/account/two-factor/token")):
+            return 200, {"data" : {"status" : "sent"}}
+
+        if (not authorized):
+            return 401, {"error" : {"code" : 261, "message" : "You did not pass a valid OAuth access token."}}
+
+        if (path == "/me"):
+            return 200, {"data" : {"user" : dict(self.users["1"]), "balance" : "100.00"}}
+
+        if (path == "/payment-methods"):
+            return 200, {"data" : self.paymentMethods}
+
+        if (path == "/users" and method == "GET"):
+
+            search = body.get("query", query.get("query", "")).lower()
+            limit = int(body.get("limit", query.get("limit", 50)))
+            offset = int(body.get("offset", query.get("offset", 0)))
+            matches = [user for user in self.users.values() if user["username"].lower().startswith(search)]
+
+            return 200, {"data" : matches[offset:offset + limit]}
+
+        if (len(parts) >= 2 and parts[0] == "users"):
+
+            user = self.users.get(parts[1])
+
+            if (user is None):
+                return 400, {"error" : {"code" : 283, "message" : "Resource not found."}}
+
+            if (len(parts) == 3 and parts[2] == "friends"):
+                limit = int(query.get("limit", 1337))
+                return 200, {"data" : [self.users[friendID] for friendID in self.friends[parts[1]][:limit]]}
+
+            return 200, {"data" : user}
+
+        if (len(parts) == 3 and parts[0] == "stories" and parts[1] == "target-or-actor"):
+
+            limit = int(query.get("limit", 50))
+            beforeID = query.get("before_id")
+            stories = [story for story in reversed(self.stories) if parts[2] in (story["payment"]["actor"]["id"], story["payment"]["target"]["user"]["id"])]
+
+            if (beforeID is not None):
+                stories = [story for story in stories if int(story["id"]) < int(beforeID)]
+
+            return 200, {"data" : stories[:limit]}
+
+        if (path == "/friend-requests" and method == "POST"):
+
+            if (body.get("user_id", "") in self.friendRequests):
+                return 400, {"error" : {"code" : 2208, "message" : "Friend request already pending."}}
+
+            self.friendRequests.append(body.get("user_id", ""))
+            return 200, {"data" : {"user" : self.users.get(body.get("user_id", ""), {})}}
+
+        if (path == "/payments" and method == "POST"):
+
+            if (body.get("user_id", "") not in self.users):
+                return 400, {"error" : {"code" : 1339, "message" : "User not found."}}
+
+            with self.__lock:
+                paymentID = str(3000000000000000000 + len(self.payments))
+                self.payments.append(dict(body, id = paymentID))
+
+            amount = body.get("amount", 0)
+            self.addActivity("1", body.get("user_id", ""), abs(float(amount)), body.get("note", ""), "charge" if float(amount) < 0 else "pay")
+
+            return 200, {"data" : {"payment" : dict(body, id = paymentID, status = "settled")}}
+
+        return 404, {"error" : {"code" : 404, "message" : "Unknown endpoint " + method + " " + path}}
+
+
+    def stats(self) -> dict:
+        """
+            Brief:
+                Returns request counters.
+
+            Returns:
+                `dict` : `requests` handled, `bytesSent` in response bodies, `notModified` responses and `paths` with a request count per method and path template, ex `GET /users/{}`
+        """
+
+        with self.__lock:
+            result = dict(self.__counters)
+            result["paths"] = dict(self.__pathCounts)
+
+        return result
+
+
+    def resetStats(self) -> None:
+        """
+            Brief:
+                Resets the request counters.
+
+            Returns:
+                `None`
+        """
+
+        with self.__lock:
+            for key in self.__counters:
+                self.__counters[key] = 0
+            self.__pathCounts.clear()
+
+
+
+class FakeSession():
+    """
+        Brief:
+            Drop in replacement for `requests.Session` that sends every request to a `FakeVenmoBackend` in process.
+
+        Instance Variables:
+            @var `backend : FakeVenmoBackend`
+                    -backend the requests are handled by
+    """
+
+    def __init__(self, backend = None):
+        """
+            Args:
+                @param `backend : FakeVenmoBackend = None`
+                        -backend to send requests to. A new one is made if None
+        """
+
+        self.backend = backend if backend is not None else FakeVenmoBackend()
+
+
+    def request(self, method, url, headers = None, json = None, timeout = None, data = None, **kwargs) -> FakeResponse:
+
+        status, responseHeaders, content = self.backend.handle(method, url, headers, requestBody(json, data))
+
+        return FakeResponse(status, responseHeaders, content)
+
+
+    def get(self, url, **kwargs) -> FakeResponse:
+        return self.request("GET", url, **kwargs)
+
+
+    def post(self, url, **kwargs) -> FakeResponse:
+        return self.request("POST", url, **kwargs)
+
+
+    def delete(self, url, **kwargs) -> FakeResponse:
+        return self.request("DELETE", url, **kwargs)
+
+
+    def close(self) -> None:
+        pass
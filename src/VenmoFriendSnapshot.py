@@ -0,0 +1,232 @@
+import sys
+import json
+import time
+import hashlib
+import threading
+
+
+def hashFriends(friends) -> str:
+    """
+        Brief:
+            Content hash of a friend list. The order of the friends does not change it.
+
+        Args:
+            @param `friends : dict`
+                    -username by venmo id
+
+        Returns:
+            `str` : hex sha256 of the sorted `id:username` pairs
+    """
+
+    digest = hashlib.sha256()
+
+    for userID in sorted(friends):
+        digest.update((userID + ":" + friends[userID] + "\n").encode("UTF-8"))
+
+    return digest.hexdigest()
+
+
+
+class FriendSnapshot():
+    """
+        Brief:
+            Compact form of a friend list: only the ids and usernames, interned so snapshots of the same list share their strings, and the content hash of the whole list.
+
+        Instance Variables:
+            @var `friends : dict`
+                    -username by venmo id, both interned strings
+            @var `contentHash : str`
+                    -`hashFriends` of `friends`
+            @var `takenAt : float`
+                    -unix time the snapshot was taken
+            @var `userID : str`
+                    -venmo id of the account whose friend list it is, None if unknown
+    """
+
+    __slots__ = ("friends", "contentHash", "takenAt", "userID")
+
+    def __init__(self, friends, contentHash = None, takenAt = None, userID = None):
+
+        self.friends = {sys.intern(str(userID)) : sys.intern(str(username)) for userID, username in friends.items()}
+        self.contentHash = contentHash if contentHash is not None else hashFriends(self.friends)
+        self.takenAt = takenAt if takenAt is not None else time.time()
+        self.userID = str(userID) if userID is not None else None
+
+
+    @classmethod
+    def fromResponse(cls, responseJson, userID = None):
+        """
+            Brief:
+                Builds a snapshot from the json returned by `VenmoToolbox.getFriends`.
+
+            Args:
+                @param `responseJson : dict`
+                        -the friend list json
+                @param `userID : str = None`
+                        -venmo id of the account whose friend list it is
+
+            Returns:
+                `FriendSnapshot` : the snapshot
+        """
+
+        return cls({str(friend.get("id", "")) : friend.get("username", "") for friend in responseJson.get("data", [])}, userID = userID)
+
+
+    def toJson(self) -> dict:
+
+        return {"userID" : self.userID, "takenAt" : self.takenAt, "hash" : self.contentHash, "friends" : self.friends}
+
+
+    @classmethod
+    def fromJson(cls, obj):
+
+        return cls(obj.get("friends", {}), obj.get("hash"), obj.get("takenAt"), obj.get("userID"))
+
+
+    def __len__(self) -> int:
+        return len(self.friends)
+
+
+
+class FriendDelta():
+    """
+        Brief:
+            Changes between two friend list snapshots.
+
+        Instance Variables:
+            @var `added : list`
+                    -`{"id", "username"}` of every new friend
+            @var `removed : list`
+                    -`{"id", "username"}` of every friend that is gone
+            @var `unchanged : bool`
+                    -whether the content hashes matched, in which case the lists were not compared at all
+            @var `previous : FriendSnapshot`
+                    -the older snapshot, None on the first snapshot
+            @var `current : FriendSnapshot`
+                    -the newer snapshot
+    """
+
+    __slots__ = ("added", "removed", "unchanged", "previous", "current")
+
+    def __init__(self, previous, current):
+
+        self.previous = previous
+        self.current = current
+        self.added = []
+        self.removed = []
+        self.unchanged = previous is not None and previous.contentHash == current.contentHash
+
+        if (self.unchanged):
+            return
+
+        oldIDs = previous.friends.keys() if previous is not None else set()
+        newIDs = current.friends.keys()
+
+        self.added = [{"id" : userID, "username" : current.friends[userID]} for userID in sorted(newIDs - oldIDs)]
+        self.removed = [{"id" : userID, "username" : previous.friends[userID]} for userID in sorted(oldIDs - newIDs)]
+
+
+    def toJson(self) -> dict:
+
+        return {
+            "unchanged" : self.unchanged,
+            "count" : len(self.current),
+            "hash" : self.current.contentHash,
+            "previousTakenAt" : self.previous.takenAt if self.previous is not None else None,
+            "added" : self.added,
+            "removed" : self.removed,
+        }
+
+
+
+class SnapshotStore():
+    """
+        Brief:
+            Keeps the latest friend list snapshot, in memory and optionally in a json file so a daily audit can compare against the previous run. Snapshots record the account they were taken for, and a snapshot of another account is never compared against, so a file shared by several logins is reset instead of reporting one account's friends as the other's changes.
+
+        Instance Variables:
+            @var `path : str`
+                    -json file the snapshot is kept in, None to keep it in memory only
+    """
+
+    def __init__(self, path = None):
+        """
+            Args:
+                @param `path : str = None`
+                        -json file to load the previous snapshot from and save new ones to
+        """
+
+        self.path = path
+        self.__latest = None
+        self.__latestResponse = None
+        self.__loaded = False
+        self.__lock = threading.Lock()
+
+
+    def latest(self, userID = None) -> FriendSnapshot:
+        """
+            Args:
+                @param `userID : str = None`
+                        -only return a snapshot of this account's friend list. None returns the latest snapshot of any account
+
+            Returns:
+                `FriendSnapshot` : the latest snapshot, None if there is none yet or it belongs to another account
+        """
+
+        with self.__lock:
+
+            if (not self.__loaded):
+
+                self.__loaded = True
+
+                if (self.path is not None):
+                    try:
+                        with open(self.path, mode = "r", encoding = "UTF-8") as file:
+                            self.__latest = FriendSnapshot.fromJson(json.loads(file.read()))
+                    except (FileNotFoundError, ValueError):
+                        self.__latest = None
+
+            if (userID is not None and self.__latest is not None and self.__latest.userID != str(userID)):
+                return None
+
+            return self.__latest
+
+
+    def update(self, responseJson, userID = None) -> FriendDelta:
+        """
+            Brief:
+                Snapshots a freshly fetched friend list and compares it with the latest one. If the content hash is unchanged, the stored snapshot is kept and nothing is rewritten. If the json is the very object the latest snapshot was made from, ex a body reused by the transport after a `304 Not Modified`, it is not even hashed again.
+
+            Args:
+                @param `responseJson : dict`
+                        -the friend list json
+                @param `userID : str = None`
+                        -venmo id of the account whose friend list it is. A stored snapshot of another account is replaced as if there were none
+
+            Returns:
+                `FriendDelta` : the changes since the latest snapshot. Everything counts as added on the first snapshot
+        """
+
+        previous = self.latest(userID)
+
+        if (previous is not None and responseJson is self.__latestResponse):
+            return FriendDelta(previous, previous)
+
+        current = FriendSnapshot.fromResponse(responseJson, userID)
+        delta = FriendDelta(previous, current)
+
+        with self.__lock:
+            self.__latestResponse = responseJson
+
+        if (delta.unchanged):
+            return delta
+
+        with self.__lock:
+
+            self.__latest = current
+
+            if (self.path is not None):
+                with open(self.path, mode = "w", encoding = "UTF-8") as file:
+                    file.write(json.dumps(current.toJson(), separators = (",", ":")))
+
+        return delta
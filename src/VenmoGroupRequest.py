@@ -0,0 +1,401 @@
+from decimal import Decimal
+from fractions import Fraction
+from concurrent.futures import ThreadPoolExecutor
+
+import VenmoDeadline
+import VenmoMoney
+import VenmoWatcher
+import VenmoReconcile
+
+
+PLANNED = "planned"
+REQUESTED = "requested"
+FAILED = "failed"
+ERROR = "error"
+UNRESOLVED = "unresolved"
+SKIPPED = "skipped"
+
+MEMBER_COLUMNS = ["member", "userID", "amount", "status", "error"]
+
+
+def splitCents(totalCents, weights) -> list:
+    """
+        Brief:
+            Splits a total in cents by weights so the shares add up to exactly the total. Every share is first rounded down, then the cents left over go one each to the shares that lost the most to rounding, earlier shares first on ties (the largest remainder method).
+
+        Args:
+            @param `totalCents : int`
+                    -the total in cents
+            @param `weights : list`
+                    -a non negative weight per share, ex `[1, 1, 1]` for an even split or `[2, 1, 1]`. Weights are read exactly, so "0.1" is a tenth
+
+        Returns:
+            `list` : the share of every weight in cents
+
+        Raises:
+            `ValueError` : if a weight is negative or all of them are zero
+    """
+
+    weights = [Fraction(str(weight)) for weight in weights]
+    totalWeight = sum(weights)
+
+    if (any(weight < 0 for weight in weights) or totalWeight == 0):
+        raise ValueError("Weights must be non negative and not all zero")
+
+    exact = [totalCents * weight / totalWeight for weight in weights]
+    shares = [int(share // 1) for share in exact]
+
+    leftover = totalCents - sum(shares)
+    order = sorted(range(len(shares)), key = lambda index : (-(exact[index] - shares[index]), index))
+
+    for index in order[:leftover]:
+        shares[index] += 1
+
+    return shares
+
+
+
+class Member():
+    """
+        Brief:
+            One member of a group request and what happened to their request.
+
+        Instance Variables:
+            @var `member : str`
+                    -the username or venmo id the member was given as
+            @var `userID : int`
+                    -the member's venmo id, -1 if it could not be resolved
+            @var `weight : Fraction`
+                    -the member's weight in the split
+            @var `cents : int`
+                    -the member's share in cents
+            @var `status : str`
+                    -`PLANNED` before sending, then `REQUESTED`, `FAILED` if the api refused it, `ERROR` if it could not be sent, `UNRESOLVED` if the username was not found, or `SKIPPED` for a share of 0
+            @var `error : str`
+                    -why it failed, "" otherwise
+    """
+
+    __slots__ = ("member", "userID", "weight", "cents", "status", "error")
+
+    def __init__(self, member, weight = 1, userID = -1, cents = 0, status = PLANNED, error = ""):
+
+        self.member = member
+        self.userID = userID
+        self.weight = Fraction(str(weight))
+        self.cents = cents
+        self.status = status
+        self.error = error
+
+
+    @property
+    def amount(self) -> Decimal:
+        return Decimal(self.cents).scaleb(-2)
+
+
+    def toJson(self) -> dict:
+        """
+            Returns:
+                `dict` : the member as a row, see `MEMBER_COLUMNS`
+        """
+
+        return {"member" : self.member, "userID" : self.userID, "amount" : str(self.amount), "status" : self.status, "error" : self.error}
+
+
+    def __repr__(self) -> str:
+        return "Member(" + ", ".join(key + "=" + str(value) for key, value in self.toJson().items()) + ")"
+
+
+
+class GroupResult():
+    """
+        Brief:
+            The outcome of a group request.
+
+        Instance Variables:
+            @var `members : list`
+                    -every `Member`, in the order they were given
+            @var `note : str`
+                    -the note the requests were sent with
+    """
+
+    def __init__(self, members, note):
+
+        self.members = members
+        self.note = note
+
+
+    def retryList(self, statuses = (FAILED,)) -> list:
+        """
+            Args:
+                @param `statuses : tuple = (FAILED,)`
+                        -the statuses to retry. Payment requests are not idempotent and an `ERROR` may have reached venmo before the connection failed, so members with an `ERROR` are only included when asked for, best after `GroupRequest.confirmErrors`
+
+            Returns:
+                `list` : the members with one of the statuses, with the share they still owe
+        """
+
+        return [member for member in self.members if member.status in statuses]
+
+
+    def requestedCents(self) -> int:
+        """
+            Returns:
+                `int` : total of the shares that were requested, in cents
+        """
+
+        return sum(member.cents for member in self.members if member.status == REQUESTED)
+
+
+    def counts(self) -> dict:
+        """
+            Returns:
+                `dict` : number of members per status
+        """
+
+        counts = {}
+
+        for member in self.members:
+            counts[member.status] = counts.get(member.status, 0) + 1
+
+        return counts
+
+
+    def ok(self) -> bool:
+        """
+            Returns:
+                `bool` : whether every member with a share was requested
+        """
+
+        return all(member.status in (REQUESTED, SKIPPED) for member in self.members)
+
+
+
+class GroupRequest():
+    """
+        Brief:
+            Charges a shared cost to many members at once. The total is split exactly in cents, evenly or by weights, usernames are resolved through the toolbox's identity cache and bulk lookups, and the payment requests are sent concurrently under `maxConcurrency`. Every member gets an outcome, and the members that failed can be sent again with `retry` without touching the ones that went through.
+
+        Instance Variables:
+            @var `toolbox : VenmoToolbox.VenmoToolbox`
+                    -the logged in toolbox to send the requests with
+            @var `maxConcurrency : int`
+                    -most requests in flight at once. The toolbox's concurrency limiter may allow fewer
+            @var `audienceVisibility : int`
+                    -visibility of the requests, see `VenmoToolbox.requestMoneyByUserID`
+    """
+
+    def __init__(self, toolbox, maxConcurrency = 8, audienceVisibility = 0):
+        """
+            Args:
+                @param `toolbox : VenmoToolbox.VenmoToolbox`
+                        -the logged in toolbox to send the requests with
+                @param `maxConcurrency : int = 8`
+                        -most requests in flight at once
+                @param `audienceVisibility : int = 0`
+                        -0 -> private, 1 -> friends only, 2 -> public
+        """
+
+        self.toolbox = toolbox
+        self.maxConcurrency = maxConcurrency
+        self.audienceVisibility = audienceVisibility
+
+
+    def plan(self, total, members, deadline = None) -> list:
+        """
+            Brief:
+                Splits the total between the members and resolves their venmo ids, without sending anything.
+
+            Args:
+                @param `total : str | float | Decimal`
+                        -the total to charge in dollars
+                @param `members : list | dict`
+                        -usernames or venmo ids for an even split, or `{member : weight}` or `(member, weight)` pairs for a weighted one. A member given more than once gets the sum of their weights
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds for resolving the usernames
+
+            Returns:
+                `list` : a `Member` per member with its share, `UNRESOLVED` if its username was not found, keeping its share so the others are not charged more, and `SKIPPED` if its share is 0
+
+            Raises:
+                `ValueError` : if there are no members, the total is not positive or the weights are invalid
+        """
+
+        totalCents = VenmoMoney.toCents(total)
+
+        if (totalCents <= 0):
+            raise ValueError("The total must be positive")
+
+        weighted = {}
+        planned = []
+
+        for member, weight in (members.items() if isinstance(members, dict) else (member if isinstance(member, tuple) else (member, 1) for member in members)):
+
+            member = str(member).strip()
+
+            if (member == ""):
+                continue
+
+            key = member.lower()
+
+            if (key in weighted):
+                weighted[key].weight += Fraction(str(weight))
+            else:
+                weighted[key] = Member(member, weight)
+                planned.append(weighted[key])
+
+        if (not planned):
+            raise ValueError("A group request needs at least one member")
+
+        for member, cents in zip(planned, splitCents(totalCents, [member.weight for member in planned])):
+            member.cents = cents
+
+        self.__resolve(planned, deadline)
+
+        for member in planned:
+
+            if (member.userID == -1):
+                member.status = UNRESOLVED
+                member.error = "User not found."
+            elif (member.cents == 0):
+                member.status = SKIPPED
+
+        return planned
+
+
+    def send(self, total, members, note, deadline = None) -> GroupResult:
+        """
+            Brief:
+                Splits the total between the members and sends each of them a payment request for their share, concurrently.
+
+            Args:
+                @param `total : str | float | Decimal`
+                        -the total to charge in dollars
+                @param `members : list | dict`
+                        -see `plan`, or members returned by `plan` to send as planned
+                @param `note : str`
+                        -the note sent with every request
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request. Requests that do not fit end as `ERROR`
+
+            Returns:
+                `GroupResult` : the outcome of every member
+        """
+
+        deadline = VenmoDeadline.Deadline.of(deadline)
+
+        if (isinstance(members, list) and members and all(isinstance(member, Member) for member in members)):
+            planned = members
+        else:
+            planned = self.plan(total, members, deadline)
+
+        self.__sendAll([member for member in planned if member.status == PLANNED], note, deadline)
+
+        return GroupResult(planned, note)
+
+
+    def retry(self, result, deadline = None, statuses = (FAILED,)) -> GroupResult:
+        """
+            Brief:
+                Sends the requests of the members in `result.retryList(statuses)` again, with the same shares and note. The members that were already requested are left alone.
+
+            Args:
+                @param `result : GroupResult`
+                        -the result of `send` or of an earlier `retry`
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request
+                @param `statuses : tuple = (FAILED,)`
+                        -the statuses to retry. Pass `(ERROR,)` only after `confirmErrors`, a request that hit an `ERROR` may already have been sent and would charge the member twice
+
+            Returns:
+                `GroupResult` : `result`, updated
+        """
+
+        self.__sendAll(result.retryList(statuses), result.note, VenmoDeadline.Deadline.of(deadline))
+
+        return result
+
+
+    def confirmErrors(self, result, maxStories = 200) -> int:
+        """
+            Brief:
+                Looks for the requests of the members that hit an `ERROR` in the newest stories of the activity feed. A member whose request is found, to the same venmo id with the same amount and note, is marked `REQUESTED`, since the request reached venmo before the connection failed. Every story is matched to one member at most.
+
+            Args:
+                @param `result : GroupResult`
+                        -the result of `send` or `retry`
+                @param `maxStories : int = 200`
+                        -most feed stories to read
+
+            Returns:
+                `int` : number of members found and marked `REQUESTED`
+        """
+
+        errors = result.retryList((ERROR,))
+
+        if (not errors):
+            return 0
+
+        sent = {}
+
+        for row in VenmoReconcile.transactionsFromFeed(self.toolbox, "id", maxStories = maxStories, kind = VenmoWatcher.REQUEST_SENT):
+            key = (row.recipient, abs(row.cents), row.note.lower())
+            sent[key] = sent.get(key, 0) + 1
+
+        confirmed = 0
+
+        for member in errors:
+
+            key = (str(member.userID).lower(), member.cents, result.note.strip().lower())
+
+            if (sent.get(key, 0) > 0):
+                sent[key] -= 1
+                member.status = REQUESTED
+                member.error = ""
+                confirmed += 1
+
+        return confirmed
+
+
+    def __resolve(self, members, deadline) -> None:
+
+        usernames = []
+
+        for member in members:
+
+            if (member.member.isdigit()):
+                member.userID = int(member.member)
+            else:
+                usernames.append(member.member)
+
+        if (not usernames):
+            return
+
+        resolved = self.toolbox.resolveUsernames(usernames, self.maxConcurrency, deadline)["resolved"]
+        resolvedByKey = {username.lower() : userID for username, userID in resolved.items()}
+
+        for member in members:
+
+            if (not member.member.isdigit()):
+                member.userID = int(resolvedByKey.get(member.member.lower(), -1))
+
+
+    def __sendAll(self, members, note, deadline) -> None:
+
+        if (not members):
+            return
+
+        with ThreadPoolExecutor(max_workers = max(1, min(self.maxConcurrency, len(members)))) as executor:
+            list(executor.map(lambda member : self.__sendOne(member, note, deadline), members))
+
+
+    def __sendOne(self, member, note, deadline) -> None:
+
+        try:
+            requested = self.toolbox.requestMoneyByUserID(member.amount, member.userID, note, self.audienceVisibility, deadline)
+        except Exception as e:
+            member.status = ERROR
+            member.error = str(e) or type(e).__name__
+            return
+
+        member.status = REQUESTED if requested else FAILED
+        member.error = "" if requested else "The api refused the request."
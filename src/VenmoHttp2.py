@@ -0,0 +1,122 @@
+import json
+import importlib.util
+
+import requests
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+def available() -> bool:
+    """
+        Returns:
+            `bool` : whether `httpx` and its `h2` extra are installed, ex `pip install httpx[http2]`
+    """
+
+    return httpx is not None and importlib.util.find_spec("h2") is not None
+
+
+def unavailableReason() -> str:
+    """
+        Returns:
+            `str` : why the HTTP/2 transport cannot be used, ex to warn that a toolbox fell back to HTTP/1.1. "" if it can
+    """
+
+    if (httpx is None):
+        return "httpx is not installed. Install it with: pip install httpx[http2]"
+
+    if (importlib.util.find_spec("h2") is None):
+        return "httpx is installed without http2 support. Install it with: pip install httpx[http2]"
+
+    return ""
+
+
+
+class Http2Session():
+    """
+        Brief:
+            Stand in for `requests.Session` that sends requests over HTTP/2 with `httpx`. Concurrent requests to one host are multiplexed as streams over a single connection instead of each taking a connection of their own, which saves a TCP and TLS handshake for every request above the pool size. Servers that do not speak HTTP/2 are talked to over HTTP/1.1, negotiated through TLS ALPN, so it works against any server.
+
+        Instance Variables:
+            @var `priorKnowledge : bool`
+                    -speak HTTP/2 right away on plain `http://` urls (h2c), ex against a local stub server. Servers that only speak HTTP/1.1 cannot be reached this way
+    """
+
+    def __init__(self, priorKnowledge = False, maxConnections = 16):
+        """
+            Args:
+                @param `priorKnowledge : bool = False`
+                        -speak HTTP/2 right away on plain `http://` urls
+                @param `maxConnections : int = 16`
+                        -most connections kept per host. HTTP/2 hosts normally need one
+
+            Raises:
+                `ImportError` : if `httpx` or `h2` is not installed, see `available`
+        """
+
+        if (not available()):
+            raise ImportError("The HTTP/2 transport is not available, " + unavailableReason())
+
+        self.priorKnowledge = priorKnowledge
+        self.__client = httpx.Client(http2 = True, http1 = not priorKnowledge, limits = httpx.Limits(max_connections = maxConnections, max_keepalive_connections = maxConnections), timeout = None)
+
+
+    def request(self, method, url, headers = None, data = None, json = None, timeout = None, **kwargs):
+        """
+            Brief:
+                Sends a request, with the arguments of `requests.Session.request` the toolbox uses.
+
+            Returns:
+                `httpx.Response` : the response. It has the `status_code`, `headers`, `content`, `text` and `json()` of a `requests.Response`
+        """
+
+        if (json is not None):
+            data = _encodeJson(json)
+            headers = dict(headers or {}, **{"Content-Type" : "application/json"})
+
+        return self.__client.request(method, url, headers = headers, content = data, timeout = timeout)
+
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+
+    def close(self) -> None:
+        self.__client.close()
+
+
+
+def _encodeJson(obj) -> bytes:
+
+    return json.dumps(obj, separators = (",", ":")).encode("UTF-8")
+
+
+def makeSession(http2 = False, priorKnowledge = False):
+    """
+        Brief:
+            Creates the session a toolbox sends its requests over.
+
+        Args:
+            @param `http2 : bool = False`
+                    -use an `Http2Session`. Falls back to a `requests.Session` if `httpx` or `h2` is not installed. The fallback is silent, check `unavailableReason` to warn about it
+            @param `priorKnowledge : bool = False`
+                    -see `Http2Session`
+
+        Returns:
+            `Http2Session | requests.Session` : the session
+    """
+
+    if (http2 and available()):
+        return Http2Session(priorKnowledge)
+
+    return requests.Session()
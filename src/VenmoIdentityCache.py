@@ -0,0 +1,166 @@
+import threading
+from collections import OrderedDict
+
+import VenmoLazyView
+
+
+class IdentityCache():
+    """
+        Brief:
+            Thread safe, size bounded two way mapping between venmo usernames and venmo ids. Usernames are matched case insensitively. The least recently used entries are evicted first once the cache is full.
+
+        Instance Variables:
+            @var `maxEntries : int`
+                    -maximum number of username/id pairs to hold
+    """
+
+    def __init__(self, maxEntries = 100000):
+        """
+            Args:
+                @param `maxEntries : int = 100000`
+                        -maximum number of username/id pairs to hold
+        """
+
+        self.maxEntries = maxEntries
+        self.__idsByUsername = OrderedDict()
+        self.__usernamesByID = {}
+        self.__lock = threading.Lock()
+
+
+    def add(self, username, userID) -> None:
+        """
+            Brief:
+                Stores a username/id pair, replacing any older pair for either side.
+
+            Args:
+                @param `username : str`
+                        -a venmo username
+                @param `userID : int`
+                        -the matching venmo id
+
+            Returns:
+                `None`
+        """
+
+        if (not username):
+            return
+
+        key = username.lower()
+        userID = int(userID)
+
+        with self.__lock:
+
+            oldID = self.__idsByUsername.pop(key, None)
+            if (oldID is not None):
+                self.__usernamesByID.pop(oldID, None)
+
+            oldUsername = self.__usernamesByID.pop(userID, None)
+            if (oldUsername is not None):
+                self.__idsByUsername.pop(oldUsername.lower(), None)
+
+            self.__idsByUsername[key] = userID
+            self.__usernamesByID[userID] = username
+
+            while (len(self.__idsByUsername) > self.maxEntries):
+                evictedKey, evictedID = self.__idsByUsername.popitem(last = False)
+                self.__usernamesByID.pop(evictedID, None)
+
+
+    def addUser(self, userJson) -> None:
+        """
+            Brief:
+                Stores the username/id pair found in a user json object, ex an entry of a search or friends response. Objects without both fields are ignored.
+
+            Args:
+                @param `userJson : dict | VenmoLazyView.LazyView`
+                        -a venmo user json object
+
+            Returns:
+                `None`
+        """
+
+        if (not isinstance(userJson, (dict, VenmoLazyView.LazyView))):
+            return
+
+        username = userJson.get("username", "")
+        userID = userJson.get("id", "")
+
+        if (username and userID):
+            self.add(username, userID)
+
+
+    def getUserID(self, username) -> int:
+        """
+            Brief:
+                Looks up a cached venmo id by username
+
+            Args:
+                @param `username : str`
+                        -a venmo username
+
+            Returns:
+                `int` : the cached id, otherwise -1
+        """
+
+        with self.__lock:
+
+            key = username.lower()
+            userID = self.__idsByUsername.get(key)
+
+            if (userID is None):
+                return -1
+
+            self.__idsByUsername.move_to_end(key)
+            return userID
+
+
+    def getUsername(self, userID) -> str:
+        """
+            Brief:
+                Looks up a cached venmo username by venmo id
+
+            Args:
+                @param `userID : int`
+                        -a venmo id
+
+            Returns:
+                `str` : the cached username, otherwise ""
+        """
+
+        with self.__lock:
+
+            username = self.__usernamesByID.get(int(userID))
+
+            if (username is None):
+                return ""
+
+            self.__idsByUsername.move_to_end(username.lower())
+            return username
+
+
+    def pairs(self) -> list:
+        """
+            Returns:
+                `list` : every cached `(username, id)` pair, least recently used first
+        """
+
+        with self.__lock:
+            return [(self.__usernamesByID[userID], userID) for userID in self.__idsByUsername.values()]
+
+
+    def clear(self) -> None:
+        """
+            Brief:
+                Removes every cached entry.
+
+            Returns:
+                `None`
+        """
+
+        with self.__lock:
+            self.__idsByUsername.clear()
+            self.__usernamesByID.clear()
+
+
+    def __len__(self) -> int:
+        return len(self.__idsByUsername)
@@ -0,0 +1,376 @@
+import re
+import json
+import threading
+
+
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_SCALAR = re.compile(rb"[^,:\]}\s]+")
+_FILLER = re.compile(rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*', re.DOTALL)
+
+_QUOTE = ord('"')
+_OPENERS = (ord("{"), ord("["))
+_CLOSERS = (ord("}"), ord("]"))
+
+
+def _skip(data, position) -> int:
+    """
+        Brief:
+            Finds the end of the json value at `position` without building it. Strings and the runs between brackets are matched by regular expressions, so only the brackets are looked at one by one.
+
+        Args:
+            @param `data : bytes`
+                    -the json text
+            @param `position : int`
+                    -offset of the first character of the value
+
+        Returns:
+            `int` : offset just past the value
+
+        Raises:
+            `ValueError` : if the value is cut off
+    """
+
+    if (position >= len(data)):
+        raise ValueError("Unterminated json value at offset " + str(position))
+
+    first = data[position]
+
+    if (first == _QUOTE):
+        match = _STRING.match(data, position)
+    elif (first not in _OPENERS):
+        match = _SCALAR.match(data, position)
+    else:
+        match = True
+
+    if (match is None):
+        raise ValueError("Unterminated json value at offset " + str(position))
+
+    if (match is not True):
+        return match.end()
+
+    depth = 0
+
+    while (True):
+
+        if (position >= len(data)):
+            raise ValueError("Unterminated json value")
+
+        character = data[position]
+        position += 1
+
+        if (character in _OPENERS):
+            depth += 1
+        elif (character in _CLOSERS):
+            depth -= 1
+        else:
+            raise ValueError("Unterminated json string at offset " + str(position - 1))
+
+        if (depth == 0):
+            return position
+
+        position = _FILLER.match(data, position).end()
+
+
+def _decode(data, start, end):
+
+    return json.loads(data[start : end])
+
+
+def _decodeKey(data, start, end) -> str:
+
+    key = data[start + 1 : end - 1]
+
+    return json.loads(data[start : end]) if b"\\" in key else key.decode("UTF-8")
+
+
+class LazyView():
+    """
+        Brief:
+            Read only view of a json object or array that keeps the raw bytes and only parses what is accessed. Object keys are indexed as far as a lookup needs, values that are objects or arrays are returned as views themselves, and arrays can be iterated one element at a time, so a caller that reads `data.username` or stops at the first matching entry of a large `data` array never builds the rest. Values that have to be stepped over to reach a later key are skipped by a structural scan that only tracks strings and brackets, so nothing is built for them, and the body is never decoded to a str as a whole. Views are safe to share between threads.
+
+            Objects support `get`, `[key]`, `in`, `keys()`, `items()` and iteration over their keys like a dict. Arrays support `[index]`, which returns views for object and array elements like `get`, `len()` and iteration over their elements, which yields every element fully parsed one at a time. `toJson()` parses the whole value.
+    """
+
+    __slots__ = ("__data", "__start", "__end", "__isObject", "__index", "__children", "__position", "__pending", "__offsets", "__lock")
+
+    def __init__(self, content, start = 0):
+        """
+            Args:
+                @param `content : bytes | str`
+                        -the json text, ex `response.content`. A str is encoded to UTF-8 first
+                @param `start : int = 0`
+                        -offset of the object or array in `content`
+
+            Raises:
+                `ValueError` : if there is no object or array at `start`
+        """
+
+        data = content.encode("UTF-8") if isinstance(content, str) else bytes(content)
+        start = _WHITESPACE.match(data, start).end()
+
+        if (data[start : start + 1] not in (b"{", b"[")):
+            raise ValueError("Expected a json object or array at offset " + str(start))
+
+        self.__data = data
+        self.__start = start
+        self.__end = None
+        self.__isObject = data[start : start + 1] == b"{"
+        self.__index = {}
+        self.__children = {}
+        self.__position = start + 1
+        self.__pending = None
+        self.__offsets = []
+        self.__lock = threading.Lock()
+
+
+    @property
+    def isObject(self) -> bool:
+        return self.__isObject
+
+
+    @property
+    def isArray(self) -> bool:
+        return not self.__isObject
+
+
+    def get(self, key, default = None):
+        """
+            Brief:
+                Returns the value of a key of an object view, parsing only what is needed to find it.
+
+            Args:
+                @param `key : str`
+                        -the key
+                @param `default : any = None`
+                        -returned if the key is missing or this is an array view
+
+            Returns:
+                `any` : a `LazyView` for object and array values, the parsed value otherwise
+        """
+
+        if (not self.__isObject):
+            return default
+
+        start = self.__find(key)
+
+        if (start is None):
+            return default
+
+        return self.__valueAt(key, start)
+
+
+    def path(self, *keys, default = None):
+        """
+            Brief:
+                Follows a path of object keys and array indexes, ex `view.path("data", "username")`.
+
+            Returns:
+                `any` : the value at the end of the path, or `default` if any step is missing
+        """
+
+        value = self
+
+        for key in keys:
+
+            if (not isinstance(value, LazyView)):
+                return default
+
+            try:
+                value = value[key]
+            except (KeyError, IndexError, TypeError):
+                return default
+
+        return value
+
+
+    def keys(self) -> list:
+
+        if (not self.__isObject):
+            raise TypeError("Array views have no keys")
+
+        while (self.__scanEntry()):
+            pass
+
+        return list(self.__index)
+
+
+    def items(self):
+
+        for key in self.keys():
+            yield key, self.__valueAt(key, self.__index[key])
+
+
+    def toJson(self):
+        """
+            Returns:
+                `dict | list` : the whole value, fully parsed
+        """
+
+        return _decode(self.__data, self.__start, self.__end if self.__end is not None else _skip(self.__data, self.__start))
+
+
+    def __getitem__(self, key):
+
+        if (self.__isObject):
+
+            start = self.__find(key)
+
+            if (start is None):
+                raise KeyError(key)
+
+            return self.__valueAt(key, start)
+
+        if (not isinstance(key, int)):
+            raise TypeError("Array views are indexed by int")
+
+        if (key < 0):
+            key += len(self)
+
+        while (len(self.__offsets) <= key and self.__scanElement() is not None):
+            pass
+
+        if (key < 0 or key >= len(self.__offsets)):
+            raise IndexError(key)
+
+        return self.__valueAt(key, self.__offsets[key])
+
+
+    def __contains__(self, key) -> bool:
+
+        return self.__isObject and self.__find(key) is not None
+
+
+    def __iter__(self):
+
+        if (self.__isObject):
+            yield from self.keys()
+            return
+
+        data = self.__data
+        position = self.__start + 1
+
+        while (True):
+
+            position = _WHITESPACE.match(data, position).end()
+
+            if (data[position : position + 1] == b"]"):
+                return
+
+            if (data[position : position + 1] == b","):
+                position = _WHITESPACE.match(data, position + 1).end()
+
+            end = _skip(data, position)
+
+            yield _decode(data, position, end)
+
+            position = end
+
+
+    def __len__(self) -> int:
+
+        if (self.__isObject):
+            return len(self.keys())
+
+        while (self.__scanElement() is not None):
+            pass
+
+        return len(self.__offsets)
+
+
+    def __repr__(self) -> str:
+
+        return "LazyView(" + ("object" if self.__isObject else "array") + " at " + str(self.__start) + ")"
+
+
+    def __valueAt(self, key, start):
+
+        child = self.__children.get(key)
+
+        if (child is not None):
+            return child
+
+        if (self.__data[start] in _OPENERS):
+            with self.__lock:
+                return self.__children.setdefault(key, LazyView(self.__data, start))
+
+        return _decode(self.__data, start, _skip(self.__data, start))
+
+
+    def __find(self, key):
+
+        start = self.__index.get(key)
+
+        while (start is None and self.__scanEntry()):
+            start = self.__index.get(key)
+
+        return start
+
+
+    def __scanEntry(self) -> bool:
+
+        with self.__lock:
+            return self.__scanEntryLocked()
+
+
+    def __scanEntryLocked(self) -> bool:
+
+        if (self.__end is not None):
+            return False
+
+        data = self.__data
+
+        if (self.__pending is not None):
+            self.__position = _skip(data, self.__pending)
+            self.__pending = None
+
+        position = _WHITESPACE.match(data, self.__position).end()
+
+        if (data[position : position + 1] == b"}"):
+            self.__end = position + 1
+            return False
+
+        if (data[position : position + 1] == b","):
+            position = _WHITESPACE.match(data, position + 1).end()
+
+        end = _skip(data, position)
+        key = _decodeKey(data, position, end)
+        position = _WHITESPACE.match(data, end).end() + 1
+        position = _WHITESPACE.match(data, position).end()
+
+        self.__index[key] = position
+        self.__pending = position
+
+        return True
+
+
+    def __scanElement(self):
+
+        with self.__lock:
+            return self.__scanElementLocked()
+
+
+    def __scanElementLocked(self):
+
+        if (self.__end is not None):
+            return None
+
+        data = self.__data
+
+        if (self.__pending is not None):
+            self.__position = _skip(data, self.__pending)
+            self.__pending = None
+
+        position = _WHITESPACE.match(data, self.__position).end()
+
+        if (data[position : position + 1] == b"]"):
+            self.__end = position + 1
+            return None
+
+        if (data[position : position + 1] == b","):
+            position = _WHITESPACE.match(data, position + 1).end()
+
+        self.__offsets.append(position)
+        self.__pending = position
+
+        return position
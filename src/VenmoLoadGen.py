@@ -0,0 +1,286 @@
+import sys
+import math
+import time
+import random
+import argparse
+import threading
+
+import VenmoToolbox
+import VenmoEmulator
+import VenmoFakeBackend
+import VenmoCircuitBreaker
+
+
+def connectToolbox(baseURL, password = "password", username = "me", timeout = 10.0, attempts = 5) -> VenmoToolbox.VenmoToolbox:
+    """
+        Brief:
+            Creates a toolbox pointed at an emulator and logs it in without touching `auth.json`. Failed logins, ex from injected faults, are retried.
+
+        Args:
+            @param `baseURL : str`
+                    -api base url of the emulator
+            @param `password : str = "password"`
+                    -password the emulator accepts
+            @param `username : str = "me"`
+                    -username to log in with
+            @param `timeout : float = 10.0`
+                    -request timeout of the toolbox
+            @param `attempts : int = 5`
+                    -number of login attempts before giving up
+
+        Returns:
+            `VenmoToolbox.VenmoToolbox` : the logged in toolbox
+    """
+
+    toolbox = VenmoToolbox.VenmoToolbox(autoRevokeTokenOnDelete = False)
+    toolbox.endpoints["base"] = baseURL
+    toolbox.timeout = timeout
+    toolbox.deviceID = toolbox.generateRandomDeviceID()
+    toolbox.updateDefaultHeaders()
+
+    headers = dict(toolbox.defaultHeaders)
+    headers.pop("Authorization")
+
+    for attempt in range(attempts):
+
+        try:
+            response = toolbox.session.post(baseURL + toolbox.endpoints["oauth"], headers = headers, json = {"phone_email_or_username" : username, "client_id" : "1", "password" : password}, timeout = timeout)
+            toolbox.setAccountVariables(response.json())
+            return toolbox
+        except Exception:
+            if (attempt == attempts - 1):
+                raise
+            time.sleep(0.1 * (attempt + 1))
+
+
+def __failed(result) -> bool:
+
+    if (isinstance(result, dict)):
+        return result.get("error", "") != "" or result == {}
+
+    return result is False or result == -1
+
+
+OPERATIONS = {
+    "userLookup" : lambda toolbox, rng, userCount : toolbox.getUserInformationByUsername("user-" + str(rng.randrange(userCount))),
+    "userByID" : lambda toolbox, rng, userCount : toolbox.getUserInformationByID(2000000000000000000 + rng.randrange(userCount)),
+    "listFriends" : lambda toolbox, rng, userCount : toolbox.getUsersFriends(2000000000000000000 + rng.randrange(userCount)),
+    "paymentMethods" : lambda toolbox, rng, userCount : toolbox.getPaymentMethods(),
+    "sendMoney" : lambda toolbox, rng, userCount : toolbox.sendMoneyByUserID(0.01, 2000000000000000000 + rng.randrange(userCount), "100", "load test"),
+}
+
+DEFAULT_MIX = {"userLookup" : 4, "userByID" : 4, "listFriends" : 2, "paymentMethods" : 1, "sendMoney" : 1}
+
+
+def percentile(values, fraction) -> float:
+    """
+        Brief:
+            Nearest rank percentile.
+
+        Args:
+            @param `values : list`
+                    -sorted samples
+            @param `fraction : float`
+                    -the percentile as a fraction, ex 0.99
+
+        Returns:
+            `float` : the percentile, 0.0 without samples
+    """
+
+    if (not values):
+        return 0.0
+
+    return values[max(0, min(len(values) - 1, math.ceil(fraction * len(values)) - 1))]
+
+
+def runLoad(baseURL, clients = 10, duration = 10.0, mix = None, userCount = 1000, password = "password", timeout = 10.0, seed = None) -> dict:
+    """
+        Brief:
+            Drives `clients` virtual clients, each with its own logged in toolbox, through a weighted mix of toolbox operations for `duration` seconds and reports latency percentiles and throughput.
+
+        Args:
+            @param `baseURL : str`
+                    -api base url of the emulator
+            @param `clients : int = 10`
+                    -number of virtual clients running at once
+            @param `duration : float = 10.0`
+                    -seconds to run for
+            @param `mix : dict = None`
+                    -relative weight of each operation in `OPERATIONS`. Defaults to `DEFAULT_MIX`
+            @param `userCount : int = 1000`
+                    -number of users in the emulator's directory, operations pick users at random from it
+            @param `password : str = "password"`
+                    -password the emulator accepts
+            @param `timeout : float = 10.0`
+                    -request timeout of every toolbox
+            @param `seed : int = None`
+                    -seed for the operation and user choices
+
+        Returns:
+            `dict` : `operations` with `count`, `errors`, `fastFails` and `p50`/`p95`/`p99` seconds per operation, plus the overall `count`, `errors`, `seconds` and `throughput` in operations per second
+    """
+
+    mix = mix if mix is not None else DEFAULT_MIX
+    names = [name for name in mix if mix[name] > 0]
+    weights = [mix[name] for name in names]
+
+    samples = {name : [] for name in names}
+    errors = {name : 0 for name in names}
+    fastFails = {name : 0 for name in names}
+    lock = threading.Lock()
+    startBarrier = threading.Barrier(clients + 1)
+    stop = threading.Event()
+
+    def client(index) -> None:
+
+        rng = random.Random(None if seed is None else seed + index)
+        toolbox = None
+
+        try:
+            toolbox = connectToolbox(baseURL, password, timeout = timeout)
+        except Exception as e:
+            print("Virtual client " + str(index) + " could not log in: " + str(e))
+        finally:
+            startBarrier.wait()
+
+        if (toolbox is None):
+            return
+
+        localSamples = {name : [] for name in names}
+        localErrors = {name : 0 for name in names}
+        localFastFails = {name : 0 for name in names}
+
+        while (not stop.is_set()):
+
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+
+            try:
+                failed = __failed(OPERATIONS[name](toolbox, rng, userCount))
+            except VenmoCircuitBreaker.CircuitOpenError:
+                localFastFails[name] += 1
+                failed = True
+            except Exception:
+                failed = True
+
+            localSamples[name].append(time.perf_counter() - start)
+
+            if (failed):
+                localErrors[name] += 1
+
+        with lock:
+            for name in names:
+                samples[name].extend(localSamples[name])
+                errors[name] += localErrors[name]
+                fastFails[name] += localFastFails[name]
+
+    threads = [threading.Thread(target = client, args = (index,), daemon = True) for index in range(clients)]
+
+    for thread in threads:
+        thread.start()
+
+    startBarrier.wait()
+    started = time.monotonic()
+
+    stop.wait(duration)
+    stop.set()
+
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.monotonic() - started
+    report = {"operations" : {}, "count" : 0, "errors" : 0, "seconds" : elapsed}
+
+    for name in names:
+
+        values = sorted(samples[name])
+
+        report["operations"][name] = {
+            "count" : len(values),
+            "errors" : errors[name],
+            "fastFails" : fastFails[name],
+            "p50" : percentile(values, 0.50),
+            "p95" : percentile(values, 0.95),
+            "p99" : percentile(values, 0.99),
+        }
+
+        report["count"] += len(values)
+        report["errors"] += errors[name]
+
+    report["throughput"] = report["count"] / elapsed if elapsed > 0 else 0.0
+
+    return report
+
+
+def printReport(report) -> None:
+    """
+        Brief:
+            Prints a load report as a table.
+
+        Args:
+            @param `report : dict`
+                    -the report returned by `runLoad`
+
+        Returns:
+            `None`
+    """
+
+    print("{:<16}{:>8}{:>8}{:>10}{:>10}{:>10}{:>10}".format("operation", "count", "errors", "fastfail", "p50 ms", "p95 ms", "p99 ms"))
+
+    for name, stats in report["operations"].items():
+        print("{:<16}{:>8}{:>8}{:>10}{:>10.2f}{:>10.2f}{:>10.2f}".format(name, stats["count"], stats["errors"], stats["fastFails"], stats["p50"] * 1000, stats["p95"] * 1000, stats["p99"] * 1000))
+
+    print("\n{} operations, {} errors in {:.2f}s, {:.1f} ops/s".format(report["count"], report["errors"], report["seconds"], report["throughput"]))
+
+
+def parseMix(text) -> dict:
+
+    mix = {}
+
+    for part in text.split(","):
+
+        name, weight = part.split("=")
+
+        if (name not in OPERATIONS):
+            raise ValueError("Unknown operation " + name + ". Choose from: " + ", ".join(OPERATIONS))
+
+        mix[name] = float(weight)
+
+    return mix
+
+
+def main(args) -> None:
+
+    parser = argparse.ArgumentParser(description = "Load generator that drives virtual clients through VenmoToolbox workflows.")
+    parser.add_argument("--base-url", default = None, help = "api base url of a running emulator. If not set, an emulator is started in process with the fault options below")
+    parser.add_argument("--clients", type = int, default = 10)
+    parser.add_argument("--duration", type = float, default = 10.0)
+    parser.add_argument("--mix", default = None, help = "operation weights, ex userLookup=4,listFriends=1")
+    parser.add_argument("--users", type = int, default = 1000)
+    parser.add_argument("--timeout", type = float, default = 10.0)
+    parser.add_argument("--latency", default = "none")
+    parser.add_argument("--error-rate", type = float, default = 0.0)
+    parser.add_argument("--drop-rate", type = float, default = 0.0)
+    parser.add_argument("--throttle-rate", type = float, default = 0.0)
+    parser.add_argument("--throttle-burst", type = int, default = 20)
+    parser.add_argument("--seed", type = int, default = None)
+    options = parser.parse_args(args)
+
+    mix = parseMix(options.mix) if options.mix else None
+    emulator = None
+    baseURL = options.base_url
+
+    if (baseURL is None):
+        faults = VenmoEmulator.FaultInjector(VenmoEmulator.LatencyDistribution.parse(options.latency), options.error_rate, options.drop_rate, options.throttle_rate, options.throttle_burst, seed = options.seed)
+        emulator = VenmoEmulator.VenmoEmulator(backend = VenmoFakeBackend.FakeVenmoBackend(options.users, 20), faults = faults).start()
+        baseURL = emulator.baseURL
+
+    try:
+        printReport(runLoad(baseURL, options.clients, options.duration, mix, options.users, timeout = options.timeout, seed = options.seed))
+    finally:
+        if (emulator is not None):
+            emulator.stop()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
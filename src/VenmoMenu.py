@@ -1,17 +1,19 @@
 import VenmoToolbox
+import VenmoCircuitBreaker
+import VenmoOutput
+import VenmoRecords
+import VenmoFriendSnapshot
+import VenmoPicker
 import getpass
+import VenmoScheduler
+import VenmoEvents
+import VenmoGroupRequest
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
-def enumerateAndPrintDict(object) -> None:
-        
-        for key in object:
-        
-            if (type(object[key]) == type(dict())):
-        
-                enumerateAndPrintDict(object[key])
-        
-            else:
-        
-                print(key[0].upper() + key[1:] + " :", object[key])
+FRIEND_COLUMNS = ["first_name", "last_name", "username", "id"]
+PAYMENT_METHOD_COLUMNS = ["type", "name", "last_four", "id"]
+SUGGESTION_COLUMNS = ["number", "username", "first_name", "last_name"]
 
 class MenuOption():
         def __init__(self, optionID, optionMsg, optionCallback):
@@ -30,10 +32,11 @@ class MenuOption():
        
 class Menu():
 
-    def __init__(self, name, header = ""):
+    def __init__(self, name, header = "", events : VenmoEvents.EventBus = None):
         
         self.__name = name
         self.__header = header
+        self.__events = events
         self.__options : list[MenuOption] = list()
         self.__menuActive = False
 
@@ -66,8 +69,19 @@ class Menu():
             print("Not A Valid Option")
         
         else:
-        
-            self.__options[optionNumber-1].call()
+
+            try:
+
+                self.__options[optionNumber-1].call()
+
+            except VenmoCircuitBreaker.CircuitOpenError as e:
+
+                print(str(e))
+
+            finally:
+
+                if (self.__events is not None):
+                    self.__events.flush()
 
     def showMenu(self):
 
@@ -97,14 +111,64 @@ class Menu():
 
 
 class VenmoUser():
-    def __init__(self, userInfo, toolbox : VenmoToolbox.VenmoToolbox):
-        self.__userInfo = userInfo
-        self.__id = int(userInfo["id"])
-        self.__username = userInfo["username"]
-        self.__firstName = userInfo["first_name"]
-        self.__lastName = userInfo["last_name"]
-        self.__friendStatus = userInfo["friend_status"]
+    def __init__(self, userInfo, toolbox : VenmoToolbox.VenmoToolbox, output : VenmoOutput.OutputEngine = None):
+        self.__user = VenmoRecords.UserRecord.fromJson(userInfo)
+        self.__userInfo = {"data" : userInfo}
+        self.__id = self.__user.id
+        self.__friendStatus = self.__user.friendStatus
         self.__toolbox = toolbox
+        self.__output = output if output is not None else VenmoOutput.OutputEngine()
+        self.__executor = None
+        self.__prefetches = {}
+
+    def prefetch(self) -> None:
+        """
+            Brief:
+                Starts fetching the user's friends and your payment methods in the background with background priority, so the menu options that show them usually don't wait. The account info option reuses the lookup the user was found with.
+
+            Returns:
+                `None`
+        """
+
+        if (self.__executor is not None):
+            return
+
+        self.__executor = ThreadPoolExecutor(max_workers = 2)
+
+        for name, fetch in (("friends", lambda : self.__toolbox.getUsersFriends(self.__id)), ("paymentMethods", self.__toolbox.getPaymentMethods)):
+            self.__prefetches[name] = self.__executor.submit(self.__background, fetch)
+
+    def close(self) -> None:
+        """
+            Brief:
+                Cancels the prefetches that have not started. Requests already in flight finish in the background and their results are dropped.
+
+            Returns:
+                `None`
+        """
+
+        if (self.__executor is not None):
+            self.__executor.shutdown(wait = False, cancel_futures = True)
+            self.__executor = None
+
+        self.__prefetches.clear()
+
+    def __background(self, fetch):
+
+        with self.__toolbox.priority(VenmoScheduler.BACKGROUND):
+            return fetch()
+
+    def __prefetched(self, name, fetch):
+
+        future = self.__prefetches.pop(name, None)
+
+        if (future is not None and not future.cancelled()):
+            try:
+                return future.result()
+            except Exception:
+                pass
+
+        return fetch()
 
     def isFriend(self) -> bool:
 
@@ -141,7 +205,10 @@ class VenmoUser():
 
     def sendFriendRequest(self) -> None:
         if (not self.getFriendStatus()):
-            if (self.__toolbox.sendFriendRequestByUserID(self.__id)):
+            sent = self.__toolbox.sendFriendRequestByUserID(self.__id)
+            self.__toolbox.events.flush()
+
+            if (sent):
                 print("Friend request successfully sent.")
             else:
                 print("Failed to send a friend request.")
@@ -160,7 +227,7 @@ class VenmoUser():
         paymentID = 0
         paymentIDs = []
         try:
-            paymentMethods = self.__toolbox.getPaymentMethods()
+            paymentMethods = self.__prefetched("paymentMethods", self.__toolbox.getPaymentMethods)
             print("")
 
 
@@ -169,13 +236,10 @@ class VenmoUser():
                 return
 
 
+            self.__output.showRows(paymentMethods["data"], PAYMENT_METHOD_COLUMNS)
+
             for method in paymentMethods["data"]:
-                print("Type: " + method["type"])
-                print("Name: " + method["name"])
-                print("Last-Four: " + str(method["last_four"]))
                 paymentIDs.append(method["id"])
-                print("ID: " + method["id"])
-                print("")
 
             paymentID = int(input("Enter the id of the payment method you would like to user.\n:>"))
 
@@ -212,20 +276,15 @@ class VenmoUser():
         return self.__toolbox.requestMoneyByUserID(amount, self.__id, msg)
 
     def listFriends(self):
-        friends = self.__toolbox.getUsersFriends(self.__id)
+        friends = self.__prefetched("friends", lambda : self.__toolbox.getUsersFriends(self.__id))
 
         if (friends.get("data", "") != ""):
-            for friend in friends["data"]:
-                print("")
-                print("Name: " + friend["first_name"] + " "  + friend["last_name"])
-                print("Username: " + friend["username"])
-                print("ID: "  + friend["id"])
+            self.__output.showRows(friends["data"], FRIEND_COLUMNS)
         else:
             print("Error getting friend data.")
 
     def displayAccInfo(self):
-        userInfo = self.__toolbox.getUserInformationByID(self.__id)
-        enumerateAndPrintDict(userInfo)
+        self.__output.showRecord(self.__userInfo)
         
 
 
@@ -234,13 +293,17 @@ class VenmoMenu():
 
     def __init__(self):
         self.__toolbox = VenmoToolbox.VenmoToolbox()
-        
+        self.__toolbox.events.addSink(VenmoEvents.TextSink(sys.stdout, verbose = False))
+        self.__toolbox.friendSnapshots = VenmoFriendSnapshot.SnapshotStore("friends_snapshot.json")
+        self.__output = VenmoOutput.OutputEngine()
+        self.__picker = None
 
 
 
     def login(self) -> bool:
 
         successfulLogin = self.__toolbox.login()
+        self.__toolbox.events.flush()
 
         if (successfulLogin):
             return True
@@ -249,6 +312,7 @@ class VenmoMenu():
         password = getpass.getpass("Enter you password. It will not show on screen but input is being received.\n:>")
 
         successfulLogin = self.__toolbox.login(username,password)
+        self.__toolbox.events.flush()
 
         if (not successfulLogin):
             print("Unable to login.")
@@ -265,16 +329,19 @@ class VenmoMenu():
             print("User not logged in.")
             return
 
-        menu = Menu("Main Menu")
+        menu = Menu("Main Menu", events = self.__toolbox.events)
         menu.setHeader("Account :" + " " + self.__toolbox.username)
         menu.addOption("Show Account Information", self.__displayAccInfoHandler)
         menu.addOption("Show Account Venmo Balance", self.__getBalance)
         menu.addOption("List Friends", self.__listFriends)
+        menu.addOption("Show Friend List Changes", self.__showFriendChanges)
         menu.addOption("Show Payment Methods", self.__getPaymentMethods)
         menu.addOption("Get A Users Id By Username", self.__getUserIDByUsername)
         menu.addOption("Get A Username By User ID", self.__getUsernameByUserID)
         menu.addOption("Get A Users Information", self.__getUserInformationHandler)
         menu.addOption("User lookup with user action menu", self.__userLookUpWithMenu)
+        menu.addOption("Request Money From A Group", self.__requestMoneyFromGroup)
+        menu.addOption("Change Output Format", self.__changeOutputFormat)
         menu.addOption("Exit", menu.exit)
         menu.showMenu()
 
@@ -296,16 +363,20 @@ class VenmoMenu():
 
                 else:
 
-                    username = input("Enter the username of the user.\n:>")
+                    user = self.__pickUser()
 
-                    userInfo = self.__toolbox.getUserInformationByUsername(username)
+                    if (user is None):
+                        return
+
+                    userInfo = self.__toolbox.getUserInformationByID(user["id"])
 
             else:
 
                 print("Not a valid option.")
+                return
 
 
-            if (userInfo.get("error", "") != ""):
+            if (userInfo.get("error", "") != "" or not isinstance(userInfo.get("data"), dict)):
                 print("Failed to find user.")
                 return
 
@@ -322,19 +393,26 @@ class VenmoMenu():
 
     def __createUserMenu(self, userData) -> Menu:
 
-        menu = Menu("User Menu")
-        user = VenmoUser(userData, self.__toolbox)
+        menu = Menu("User Menu", events = self.__toolbox.events)
+        user = VenmoUser(userData, self.__toolbox, self.__output)
         
-        menu.setHeader("Acccout:\n\tUsername: {}\n\tID: {}\n\tName: {} {}".format(userData["username"], userData["id"], userData["first_name"], userData["last_name"]))
-        menu.addOption("Is Friend?", lambda : print("Friend Status: " + userData["friend_status"]))
+        menu.setHeader("Acccout:\n\tUsername: {}\n\tID: {}\n\tName: {} {}".format(userData.get("username", ""), userData.get("id", ""), userData.get("first_name", ""), userData.get("last_name", "")).rstrip())
+
+        if (userData.get("friend_status") is not None):
+            menu.addOption("Is Friend?", lambda : print("Friend Status: " + str(userData["friend_status"])))
+
         menu.addOption("Send Friend Request", user.sendFriendRequest)
         menu.addOption("Send Money", user.sendMoney)
         menu.addOption("Request Money", user.requestMoney)
         menu.addOption("Display Account Info", user.displayAccInfo)
         menu.addOption("Show Friends", user.listFriends)
 
+        def exitMenu():
+            user.close()
+            menu.exit()
 
-        menu.addOption("Exit", menu.exit)
+        menu.addOption("Exit", exitMenu)
+        user.prefetch()
 
         return menu
 
@@ -351,29 +429,49 @@ class VenmoMenu():
             return
 
 
-        for method in paymentMethods["data"]:
-            print("Type: " + method["type"])
-            print("Name: " + method["name"])
-            print("Last-Four: " + str(method["last_four"]))
-            print("ID: " + method["id"])
-            print("")
+        self.__output.showRows(paymentMethods["data"], PAYMENT_METHOD_COLUMNS)
 
     def __listFriends(self):
 
         friends = self.__toolbox.getFriends()
 
         if (friends.get("data", "") != ""):
-            for friend in friends["data"]:
-                print("")
-                print("Name: " + friend["first_name"] + " "  + friend["last_name"])
-                print("Username: " + friend["username"])
-                print("ID: "  + friend["id"])
+            self.__output.showRows(friends["data"], FRIEND_COLUMNS)
         else:
             print("Error getting friend data.")
 
 
+    def __showFriendChanges(self) -> None:
+
+        delta = self.__toolbox.getFriendsDelta()
+
+        if (delta.get("error", "") != "" or "added" not in delta):
+            print("Error getting friend data.")
+            return
+
+        if (delta["previousTakenAt"] is None):
+            self.__output.showLine("\nFirst snapshot of your friend list saved, " + str(delta["count"]) + " friends.")
+            return
+
+        if (delta["unchanged"]):
+            self.__output.showLine("\nNo changes to your " + str(delta["count"]) + " friends since the last snapshot.")
+            return
+
+        changes = [dict(friend, change = "added") for friend in delta["added"]] + [dict(friend, change = "removed") for friend in delta["removed"]]
+
+        self.__output.showRows(changes, ["change", "username", "id"])
+        self.__output.showLine("\n" + str(len(delta["added"])) + " added, " + str(len(delta["removed"])) + " removed, " + str(delta["count"]) + " friends now.")
+
+
     def __getBalance(self) -> None:
-        print("\nBalance: " + str(self.__toolbox.getBalance()) )
+        self.__output.showLine("\nBalance: " + str(self.__toolbox.getBalance()) )
+
+
+    def __changeOutputFormat(self) -> None:
+        outputFormat = input("Enter the output format (" + ", ".join(VenmoOutput.FORMATS) + "). Current format is " + self.__output.format + ".\n:>")
+
+        if (not self.__output.setFormat(outputFormat.strip().lower())):
+            print("Not a valid output format.")
 
 
     def __getUsernameByUserID(self) -> None:
@@ -387,16 +485,50 @@ class VenmoMenu():
 
 
     def __getUserIDByUsername(self) -> int:
-        username = input("Enter the username of ther person to lookup.\n:>")
 
-        userID  = self.__toolbox.getUserIDByUsername(username)
+        user = self.__pickUser()
+
+        if (user is None):
+            return -1
+
+        print("\nUsername:", user["username"], "UserID:", user["id"])
+        return  int(user["id"])
+
+
+    def __pickUser(self) -> dict:
 
-        if (userID == -1):
-            print("Could not find that username.")
-            return - 1
+        if (self.__picker is None):
+            self.__picker = VenmoPicker.UserPicker(self.__toolbox)
+            self.__picker.seed()
 
-        print("\nUsername:", username, "UserID:", userID)
-        return  userID
+        query = input("Start typing a username or name and hit enter.\n:>").strip()
+        suggestions = []
+
+        while (query != ""):
+
+            if (query.isdigit() and 0 < int(query) <= len(suggestions)):
+                return suggestions[int(query) - 1]
+
+            suggestions = self.__picker.suggest(query)
+
+            if (len(suggestions) < self.__picker.limit):
+                remote = self.__picker.wait(self.__toolbox.timeout)
+                suggestions = remote if remote is not None else suggestions
+
+            exact = [user for user in suggestions if user["username"].lower() == query.lower()]
+
+            if (len(exact) == 1 and len(suggestions) == 1):
+                return exact[0]
+
+            if (not suggestions):
+                print("No users found.")
+            else:
+                self.__output.showRows([dict({"number" : number}, **user) for number, user in enumerate(suggestions, 1)], SUGGESTION_COLUMNS)
+
+            query = input("Enter a number to pick a user, type more to refine the search, or hit enter to cancel.\n:>").strip()
+
+        self.__picker.cancel()
+        return None
 
     def __getUserInformationHandler(self) -> None:
 
@@ -419,7 +551,7 @@ class VenmoMenu():
 
                     userInfo = self.__toolbox.getUserInformationByUsername(username)
 
-                enumerateAndPrintDict(userInfo)
+                self.__output.showRecord(userInfo)
 
             else:
 
@@ -431,6 +563,79 @@ class VenmoMenu():
 
 
 
+    def __requestMoneyFromGroup(self) -> None:
+
+        total = input("Enter the total amount of money to split.\n:>")
+        entries = input("Enter the usernames or user ids of the members separated by commas. Add :weight to split unevenly, ex alice:2, bob, 123456.\n:>")
+
+        members = []
+
+        for entry in entries.split(","):
+
+            member, separator, weight = entry.strip().partition(":")
+
+            if (member.strip() != ""):
+                members.append((member.strip(), weight.strip() if separator else 1))
+
+        msg = input("Enter a msg for the requests.\n:>")
+
+        if (msg == ""):
+            print("Must enter a msg.")
+            return
+
+        group = VenmoGroupRequest.GroupRequest(self.__toolbox)
+
+        try:
+            planned = group.plan(total, members)
+        except (ValueError, ArithmeticError) as e:
+            print("Not a valid group request. " + str(e))
+            return
+
+        sending = [member for member in planned if member.status == VenmoGroupRequest.PLANNED]
+
+        self.__output.showRows([member.toJson() for member in planned], VenmoGroupRequest.MEMBER_COLUMNS)
+
+        if (not sending):
+            print("No one to request money from.")
+            return
+
+        confirm = input("Request " + str(sum(member.amount for member in sending)) + " from " + str(len(sending)) + " members? Enter y to send.\n:>")
+
+        if (confirm.strip().lower() != "y"):
+            print("Group request not sent.")
+            return
+
+        result = group.send(total, planned, msg)
+
+        while (True):
+
+            self.__toolbox.events.flush()
+
+            if (result.retryList((VenmoGroupRequest.ERROR,))):
+                confirmed = group.confirmErrors(result)
+                self.__toolbox.events.flush()
+
+                if (confirmed):
+                    self.__output.showLine("\nFound " + str(confirmed) + " of the requests that hit an error in your activity feed, they were sent.")
+
+            self.__output.showRows([member.toJson() for member in result.members], VenmoGroupRequest.MEMBER_COLUMNS)
+            self.__output.showLine("\nRequested " + format(result.requestedCents() / 100, ".2f") + " from " + str(result.counts().get(VenmoGroupRequest.REQUESTED, 0)) + " members.")
+
+            failed = result.retryList()
+            errors = result.retryList((VenmoGroupRequest.ERROR,))
+
+            if (failed and input("Retry the " + str(len(failed)) + " requests venmo refused? Enter y to retry.\n:>").strip().lower() == "y"):
+                group.retry(result)
+                continue
+
+            if (errors and input("WARNING: the " + str(len(errors)) + " requests that hit an error may still have reached venmo, they were not found in your activity feed. Sending them again can charge those members twice. Enter yes to send them again anyway.\n:>").strip().lower() == "yes"):
+                group.retry(result, statuses = (VenmoGroupRequest.ERROR,))
+                continue
+
+            return
+
+
+
     def __displayAccInfoHandler(self) -> None:
 
         level = input("Enter how much data you would like on a scale of 0-3 and hit enter, or enter 4 to see your oauth token.\n:>")
@@ -448,32 +653,34 @@ class VenmoMenu():
         print("")
         if (verboseLevel == 0):
 
-            print("First Name :", self.__toolbox.loginJson["user"]["first_name"])
-        
-            print("Username :", self.__toolbox.username)
+            self.__output.showRecord({
+                "first_name" : self.__toolbox.loginJson["user"]["first_name"],
+                "username" : self.__toolbox.username,
+            })
 
         elif (verboseLevel == 1):
 
-            print("First Name :", self.__toolbox.loginJson["user"]["first_name"])
-            print("Username :", self.__toolbox.username)
-            print("Userid :", self.__toolbox.userid)
-            print("Device-ID :", self.__toolbox.deviceID)
+            self.__output.showRecord({
+                "first_name" : self.__toolbox.loginJson["user"]["first_name"],
+                "username" : self.__toolbox.username,
+                "userid" : self.__toolbox.userid,
+                "device_id" : self.__toolbox.deviceID,
+            })
 
         elif (verboseLevel == 2):
 
-            for key in self.__toolbox.loginJson["user"]:
-
-                print(key[0].upper() + key[1:] + " :", self.__toolbox.loginJson["user"][key])
+            userData = dict(self.__toolbox.loginJson["user"])
+            userData["balance"] = self.__toolbox.loginJson["balance"]
 
-            print("Balance :", self.__toolbox.loginJson["balance"])
+            self.__output.showRecord(userData)
 
         elif (verboseLevel == 3):
 
-            enumerateAndPrintDict(self.__toolbox.accJson)
+            self.__output.showRecord(self.__toolbox.accJson)
         
         elif (verboseLevel == 4):
         
-            print("Authorization Token : " + self.__toolbox.bearerToken)
+            self.__output.showLine("Authorization Token : " + self.__toolbox.bearerToken)
         
         else:
         
@@ -0,0 +1,27 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+
+def toCents(amount) -> int:
+    """
+        Args:
+            @param `amount : str | float | int | Decimal`
+                    -an amount in dollars, ex "12.50" or "$12.50"
+
+        Returns:
+            `int` : the amount in cents, rounded half up
+    """
+
+    return int((Decimal(str(amount).strip().lstrip("$")) * 100).quantize(Decimal(1), rounding = ROUND_HALF_UP))
+
+
+def formatCents(cents) -> str:
+    """
+        Args:
+            @param `cents : int`
+                    -an amount in cents
+
+        Returns:
+            `str` : the amount in dollars with two decimals, ex "-12.50"
+    """
+
+    return ("-" if cents < 0 else "") + str(abs(cents) // 100) + "." + format(abs(cents) % 100, "02d")
@@ -0,0 +1,454 @@
+import sys
+
+import VenmoCodec
+import VenmoLazyView
+
+
+DEFAULT_MAX_DEPTH = 32
+DEFAULT_BUFFER_SIZE = 64 * 1024
+FORMATS = ("table", "flat", "json", "ndjson")
+
+_CODEC = VenmoCodec.getCodec()
+
+
+class BufferedWriter():
+    """
+        Brief:
+            Collects text in memory and writes it to the underlying stream in large chunks instead of one write per line.
+
+        Instance Variables:
+            @var `stream : io.TextIOBase`
+                    -stream the buffered text is written to. Defaults to sys.stdout
+            @var `bufferSize : int`
+                    -number of characters to hold before the buffer is flushed automatically
+    """
+
+    def __init__(self, stream = None, bufferSize = DEFAULT_BUFFER_SIZE):
+        """
+            Args:
+                @param `stream : io.TextIOBase = None`
+                        -stream to write to. If None, sys.stdout is looked up on every flush so redirection keeps working
+                @param `bufferSize : int`
+                        -number of characters to hold before flushing
+        """
+
+        self.stream = stream
+        self.bufferSize = bufferSize
+        self.__chunks = []
+        self.__size = 0
+
+
+    def write(self, text) -> None:
+        """
+            Brief:
+                Adds text to the buffer, flushing it if the buffer is full.
+
+            Args:
+                @param `text : str`
+                        -text to write
+
+            Returns:
+                `None`
+        """
+
+        self.__chunks.append(text)
+        self.__size += len(text)
+
+        if (self.__size >= self.bufferSize):
+            self.flush()
+
+
+    def writeLine(self, text = "") -> None:
+        """
+            Brief:
+                Adds text followed by a newline to the buffer.
+
+            Args:
+                @param `text : str = ""`
+                        -text to write
+
+            Returns:
+                `None`
+        """
+
+        self.write(text + "\n")
+
+
+    def flush(self) -> None:
+        """
+            Brief:
+                Writes everything currently buffered to the stream in a single write call.
+
+            Returns:
+                `None`
+        """
+
+        if (not self.__chunks):
+            return
+
+        stream = self.stream if self.stream is not None else sys.stdout
+
+        stream.write("".join(self.__chunks))
+        stream.flush()
+
+        self.__chunks = []
+        self.__size = 0
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, excType, excValue, traceback):
+        self.flush()
+
+
+
+def flatten(obj, maxDepth = DEFAULT_MAX_DEPTH):
+    """
+        Brief:
+            Walks a json tree without recursion and yields every leaf with its key path, ex `data.friends[0].username`. Containers deeper than `maxDepth` are yielded as a single truncated leaf.
+
+        Args:
+            @param `obj : dict | list | VenmoLazyView.LazyView`
+                    -the json tree to walk. Views are walked like the dicts and lists they stand for, parsing one value at a time
+            @param `maxDepth : int`
+                    -maximum number of nested containers to descend into
+
+        Returns:
+            `generator` : yields `(path : str, value)` tuples in document order
+    """
+
+    stack = [("", obj, 0)]
+
+    while (stack):
+
+        path, value, depth = stack.pop()
+
+        if (_isObject(value) and value):
+
+            if (depth >= maxDepth):
+                yield path, "{...}"
+                continue
+
+            for key in reversed(list(value)):
+                stack.append((path + "." + str(key) if path else str(key), value[key], depth + 1))
+
+        elif (_isArray(value) and value):
+
+            if (depth >= maxDepth):
+                yield path, "[...]"
+                continue
+
+            for index in range(len(value) - 1, -1, -1):
+                stack.append(("{}[{}]".format(path, index), value[index], depth + 1))
+
+        elif (isinstance(value, VenmoLazyView.LazyView)):
+
+            yield path, value.toJson()
+
+        else:
+
+            yield path, value
+
+
+
+def formatValue(value) -> str:
+    """
+        Brief:
+            Formats a leaf value for the text renderers.
+
+        Args:
+            @param `value : any`
+                    -a json leaf value
+
+        Returns:
+            `str` : the printable value
+    """
+
+    if (value is None):
+        return ""
+
+    if (isinstance(value, bool)):
+        return "true" if value else "false"
+
+    if (_isObject(value)):
+        return "{}"
+
+    if (_isArray(value)):
+        return "[]"
+
+    return str(value)
+
+
+def _isObject(value) -> bool:
+
+    return isinstance(value, dict) or (isinstance(value, VenmoLazyView.LazyView) and value.isObject)
+
+
+def _isArray(value) -> bool:
+
+    return isinstance(value, list) or (isinstance(value, VenmoLazyView.LazyView) and value.isArray)
+
+
+def _jsonDefault(value):
+
+    return value.toJson() if isinstance(value, VenmoLazyView.LazyView) else str(value)
+
+
+
+def renderFlat(obj, writer, maxDepth = DEFAULT_MAX_DEPTH) -> None:
+    """
+        Brief:
+            Writes one `path : value` line per leaf of the json tree.
+
+        Args:
+            @param `obj : dict | list`
+                    -the json tree to render
+            @param `writer : BufferedWriter`
+                    -writer to render into
+            @param `maxDepth : int`
+                    -maximum nesting depth to descend into
+
+        Returns:
+            `None`
+    """
+
+    for path, value in flatten(obj, maxDepth):
+        writer.writeLine(path + " : " + formatValue(value))
+
+
+def renderTable(rows, writer, columns = None, maxWidth = 40) -> None:
+    """
+        Brief:
+            Writes a list of json objects as an aligned text table. Nested values are shown by their flat key path.
+
+        Args:
+            @param `rows : list`
+                    -the objects to render, one per table row
+            @param `writer : BufferedWriter`
+                    -writer to render into
+            @param `columns : list = None`
+                    -the key paths to show. If None, every key path found in the rows is shown
+            @param `maxWidth : int = 40`
+                    -cells longer than this are cut off
+
+        Returns:
+            `None`
+    """
+
+    if (_isObject(rows)):
+        rows = [rows]
+
+    flatRows = []
+    seenColumns = {}
+
+    for row in rows:
+
+        flatRow = {}
+
+        for path, value in flatten(row, 1 if columns is None else DEFAULT_MAX_DEPTH):
+            flatRow[path] = formatValue(value)
+            if (columns is None):
+                seenColumns[path] = True
+
+        flatRows.append(flatRow)
+
+    if (columns is None):
+        columns = list(seenColumns)
+
+    if (not columns):
+        return
+
+    widths = [min(len(column), maxWidth) for column in columns]
+    cells = []
+
+    for flatRow in flatRows:
+
+        rowCells = []
+
+        for index, column in enumerate(columns):
+
+            cell = flatRow.get(column, "")
+
+            if (len(cell) > maxWidth):
+                cell = cell[:maxWidth - 3] + "..."
+
+            widths[index] = max(widths[index], len(cell))
+            rowCells.append(cell)
+
+        cells.append(rowCells)
+
+    writer.writeLine("  ".join(column[:widths[index]].ljust(widths[index]) for index, column in enumerate(columns)))
+    writer.writeLine("  ".join("-" * width for width in widths))
+
+    for rowCells in cells:
+        writer.writeLine("  ".join(cell.ljust(widths[index]) for index, cell in enumerate(rowCells)).rstrip())
+
+
+def renderJson(obj, writer, indent = 2) -> None:
+    """
+        Brief:
+            Writes the object as a single json document.
+
+        Args:
+            @param `obj : dict | list`
+                    -the object to render
+            @param `writer : BufferedWriter`
+                    -writer to render into
+            @param `indent : int = 2`
+                    -json indent level
+
+        Returns:
+            `None`
+    """
+
+    writer.writeLine(_CODEC.dumps(obj, indent = indent, default = _jsonDefault).decode("UTF-8"))
+
+
+def renderNdjson(obj, writer) -> None:
+    """
+        Brief:
+            Writes the object as newline delimited json. Lists are written one element per line, anything else as a single line.
+
+        Args:
+            @param `obj : dict | list`
+                    -the object to render
+            @param `writer : BufferedWriter`
+                    -writer to render into
+
+        Returns:
+            `None`
+    """
+
+    if (not _isArray(obj)):
+        obj = [obj]
+
+    for item in obj:
+        writer.writeLine(_CODEC.dumps(item, default = _jsonDefault).decode("UTF-8"))
+
+
+
+class OutputEngine():
+    """
+        Brief:
+            Renders api results in the selected output format through a single buffered writer. Used by every display path in the menu.
+
+        Instance Variables:
+            @var `format : str`
+                    -one of `table`, `flat`, `json` or `ndjson`
+            @var `maxDepth : int`
+                    -maximum nesting depth the flat renderer descends into
+            @var `writer : BufferedWriter`
+                    -the writer all output goes through
+    """
+
+    def __init__(self, format = "flat", stream = None, maxDepth = DEFAULT_MAX_DEPTH):
+        """
+            Args:
+                @param `format : str = "flat"`
+                        -the initial output format
+                @param `stream : io.TextIOBase = None`
+                        -stream to write to. Defaults to sys.stdout
+                @param `maxDepth : int`
+                        -maximum nesting depth the flat renderer descends into
+        """
+
+        self.format = "flat"
+        self.maxDepth = maxDepth
+        self.writer = BufferedWriter(stream)
+
+        self.setFormat(format)
+
+
+    def setFormat(self, format) -> bool:
+        """
+            Brief:
+                Changes the output format.
+
+            Args:
+                @param `format : str`
+                        -one of `table`, `flat`, `json` or `ndjson`
+
+            Returns:
+                `bool` : whether the format was valid and changed
+        """
+
+        if (format not in FORMATS):
+            return False
+
+        self.format = format
+        return True
+
+
+    def showRecord(self, obj) -> None:
+        """
+            Brief:
+                Renders a single json object, ex a user or the account json. The table format shows it as key/value rows.
+
+            Args:
+                @param `obj : dict`
+                        -the object to render
+
+            Returns:
+                `None`
+        """
+
+        if (self.format == "table"):
+            renderTable([{"Key" : path, "Value" : value} for path, value in flatten(obj, self.maxDepth)], self.writer, ["Key", "Value"], maxWidth = 80)
+        elif (self.format == "json"):
+            renderJson(obj, self.writer)
+        elif (self.format == "ndjson"):
+            renderNdjson(obj, self.writer)
+        else:
+            renderFlat(obj, self.writer, self.maxDepth)
+
+        self.writer.flush()
+
+
+    def showRows(self, rows, columns = None) -> None:
+        """
+            Brief:
+                Renders a list of json objects, ex a friend list or the payment methods.
+
+            Args:
+                @param `rows : list`
+                        -the objects to render
+                @param `columns : list = None`
+                        -key paths to show in the table and flat formats. If None, every key is shown
+
+            Returns:
+                `None`
+        """
+
+        if (self.format == "table"):
+            renderTable(rows, self.writer, columns)
+        elif (self.format == "json"):
+            renderJson(rows, self.writer)
+        elif (self.format == "ndjson"):
+            renderNdjson(rows, self.writer)
+        else:
+            for row in rows:
+                self.writer.writeLine()
+                for path, value in flatten(row, self.maxDepth):
+                    if (columns is None or path in columns):
+                        self.writer.writeLine(path + " : " + formatValue(value))
+
+        self.writer.flush()
+
+
+    def showLine(self, text = "") -> None:
+        """
+            Brief:
+                Writes a plain line of text through the same writer so it stays ordered with rendered output.
+
+            Args:
+                @param `text : str = ""`
+                        -the line to write
+
+            Returns:
+                `None`
+        """
+
+        self.writer.writeLine(text)
+        self.writer.flush()
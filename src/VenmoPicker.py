@@ -0,0 +1,355 @@
+import threading
+from bisect import bisect_left, insort
+
+import VenmoScheduler
+
+
+SEARCH_FIELDS = ("username", "first_name", "last_name", "display_name")
+
+
+class PrefixIndex():
+    """
+        Brief:
+            Local, thread safe index of venmo users by the start of their username, first, last or display name. The keys are kept in one sorted array, so a lookup is a binary search to the first key with the prefix and a walk over the keys that share it.
+    """
+
+    def __init__(self):
+
+        self.__keys = []
+        self.__users = {}
+        self.__lock = threading.Lock()
+
+
+    def add(self, users) -> int:
+        """
+            Brief:
+                Indexes users. The fields of a user that is already indexed are updated from the newer json.
+
+            Args:
+                @param `users : list`
+                        -user json objects, ex the `data` of a friends or search response. Objects without an id and username are skipped
+
+            Returns:
+                `int` : number of users that were not indexed before
+        """
+
+        newKeys = []
+        added = 0
+
+        with self.__lock:
+
+            for user in users:
+
+                if (not isinstance(user, dict) or not user.get("id") or not user.get("username")):
+                    continue
+
+                userID = str(user["id"])
+                known = self.__users.get(userID)
+                oldKeys = self.__searchKeys(known) if known is not None else set()
+
+                if (known is not None):
+                    user = dict(known, **user)
+
+                self.__users[userID] = user
+                added += known is None
+
+                newKeys.extend((key, userID) for key in self.__searchKeys(user) - oldKeys)
+
+            if (len(newKeys) > 16):
+                self.__keys.extend(newKeys)
+                self.__keys.sort()
+            else:
+                for entry in newKeys:
+                    insort(self.__keys, entry)
+
+        return added
+
+
+    def search(self, prefix, limit = 10) -> list:
+        """
+            Brief:
+                Finds the indexed users with a username or name that starts with `prefix`, case insensitively. An exact username match comes first, then usernames that start with the prefix, then name matches.
+
+            Args:
+                @param `prefix : str`
+                        -the typed text
+                @param `limit : int = 10`
+                        -maximum number of users to return
+
+            Returns:
+                `list` : the matching user json objects
+        """
+
+        prefix = prefix.strip().lower()
+
+        if (not prefix):
+            return []
+
+        exact = []
+        byUsername = []
+        byName = []
+        seen = set()
+
+        with self.__lock:
+
+            keys = self.__keys
+            position = bisect_left(keys, (prefix,))
+
+            while (position < len(keys) and keys[position][0].startswith(prefix)):
+
+                userID = keys[position][1]
+                position += 1
+
+                if (userID in seen):
+                    continue
+
+                user = self.__users[userID]
+
+                if (not any(key.startswith(prefix) for key in self.__searchKeys(user))):
+                    continue
+
+                seen.add(userID)
+                username = user["username"].lower()
+
+                if (username == prefix):
+                    exact.append(user)
+                elif (username.startswith(prefix)):
+                    byUsername.append(user)
+                else:
+                    byName.append(user)
+
+        byUsername.sort(key = lambda user : user["username"].lower())
+
+        return (exact + byUsername + byName)[:limit]
+
+
+    def __searchKeys(self, user) -> set:
+
+        return {str(user[field]).lower() for field in SEARCH_FIELDS if user.get(field)}
+
+
+    def __len__(self) -> int:
+        return len(self.__users)
+
+
+
+class UserPicker():
+    """
+        Brief:
+            Search as you type over venmo users. Every call to `suggest` answers right away from a local `PrefixIndex` of friends and users seen before. Only when the local matches run out is a `/users` search sent, after the typing has paused for `debounce` seconds, so a burst of keystrokes sends at most one search. A newer query supersedes the pending and in flight ones: their results are still indexed, but never delivered. A search that returned less than a full page covers every longer query that starts with it, so those are answered locally too.
+
+        Instance Variables:
+            @var `toolbox : VenmoToolbox.VenmoToolbox`
+                    -the logged in toolbox to search with
+            @var `index : PrefixIndex`
+                    -the local index
+            @var `debounce : float`
+                    -seconds the typing has to pause before a remote search is sent
+            @var `minRemoteLength : int`
+                    -shortest query searched remotely
+            @var `limit : int`
+                    -number of suggestions to return
+            @var `pageSize : int`
+                    -users requested per remote search
+    """
+
+    def __init__(self, toolbox, index = None, debounce = 0.25, minRemoteLength = 2, limit = 10, pageSize = 50):
+        """
+            Args:
+                @param `toolbox : VenmoToolbox.VenmoToolbox`
+                        -the logged in toolbox to search with
+                @param `index : PrefixIndex = None`
+                        -index to suggest from, a new empty one if None. See `seed`
+                @param `debounce : float = 0.25`
+                        -seconds the typing has to pause before a remote search is sent
+                @param `minRemoteLength : int = 2`
+                        -shortest query searched remotely
+                @param `limit : int = 10`
+                        -number of suggestions to return
+                @param `pageSize : int = 50`
+                        -users requested per remote search
+        """
+
+        self.toolbox = toolbox
+        self.index = index if index is not None else PrefixIndex()
+        self.debounce = debounce
+        self.minRemoteLength = minRemoteLength
+        self.limit = limit
+        self.pageSize = pageSize
+
+        self.__generation = 0
+        self.__timer = None
+        self.__result = None
+        self.__pending = False
+        self.__searched = set()
+        self.__complete = set()
+        self.__condition = threading.Condition()
+        self.__counters = {"suggestions" : 0, "remoteSearches" : 0, "debounced" : 0, "superseded" : 0, "failedSearches" : 0}
+
+
+    def seed(self) -> int:
+        """
+            Brief:
+                Fills the index with the friend list and the users in the toolbox's identity cache. Friend lists are conditional GETs, so seeding again is cheap.
+
+            Returns:
+                `int` : number of indexed users
+        """
+
+        friends = self.toolbox.getFriends().get("data", [])
+
+        if (isinstance(friends, list)):
+            self.index.add(friends)
+
+        self.index.add({"id" : str(userID), "username" : username} for username, userID in self.toolbox.identityCache.pairs())
+
+        return len(self.index)
+
+
+    def suggest(self, query, callback = None) -> list:
+        """
+            Brief:
+                Returns the local suggestions for the typed text and, if there are fewer than `limit`, schedules a debounced remote search for it. Call it on every keystroke.
+
+            Args:
+                @param `query : str`
+                        -the text typed so far
+                @param `callback : function = None`
+                        -called as `callback(query, suggestions)` on a background thread once the remote search finishes, unless a newer query superseded it
+
+            Returns:
+                `list` : the local suggestions, user json objects
+        """
+
+        suggestions = self.index.search(query, self.limit)
+
+        with self.__condition:
+
+            self.__generation += 1
+            self.__counters["suggestions"] += 1
+
+            if (self.__timer is not None):
+                self.__timer.cancel()
+                self.__counters["debounced"] += self.__pending
+                self.__timer = None
+
+            self.__result = None
+            self.__pending = len(suggestions) < self.limit and self.__needsRemote(query)
+
+            if (self.__pending):
+                self.__timer = threading.Timer(self.debounce, self.__search, (self.__generation, query, callback))
+                self.__timer.daemon = True
+                self.__timer.start()
+
+            self.__condition.notify_all()
+
+        return suggestions
+
+
+    def wait(self, timeout = None) -> list:
+        """
+            Brief:
+                Waits for the remote search of the latest query.
+
+            Args:
+                @param `timeout : float = None`
+                        -seconds to wait, None to wait until it finishes
+
+            Returns:
+                `list` : the suggestions after the remote results were indexed, or None if no search was needed, it failed or it did not finish in time
+        """
+
+        with self.__condition:
+            self.__condition.wait_for(lambda : not self.__pending, timeout)
+            return self.__result
+
+
+    def cancel(self) -> None:
+        """
+            Brief:
+                Drops the pending and in flight remote searches, ex when the picker is closed.
+
+            Returns:
+                `None`
+        """
+
+        with self.__condition:
+
+            self.__generation += 1
+
+            if (self.__timer is not None):
+                self.__timer.cancel()
+                self.__timer = None
+
+            self.__pending = False
+            self.__result = None
+            self.__condition.notify_all()
+
+
+    def stats(self) -> dict:
+        """
+            Returns:
+                `dict` : number of `suggestions` asked for, `remoteSearches` sent, searches skipped by the `debounced`, results dropped because they were `superseded`, `failedSearches` and the number of `indexed` users
+        """
+
+        with self.__condition:
+            result = dict(self.__counters)
+
+        result["indexed"] = len(self.index)
+
+        return result
+
+
+    def __needsRemote(self, query) -> bool:
+
+        query = query.strip().lower()
+
+        if (len(query) < self.minRemoteLength or query in self.__searched):
+            return False
+
+        return not any(query[:length] in self.__complete for length in range(self.minRemoteLength, len(query) + 1))
+
+
+    def __search(self, generation, query, callback) -> None:
+
+        with self.__condition:
+
+            if (generation != self.__generation):
+                return
+
+            self.__counters["remoteSearches"] += 1
+
+        try:
+            with self.toolbox.priority(VenmoScheduler.INTERACTIVE):
+                users = self.toolbox.searchUsers(query.strip(), self.pageSize)
+        except Exception:
+            users = None
+
+        failed = users is None
+        users = users if users is not None else []
+
+        self.index.add(users)
+        suggestions = self.index.search(query, self.limit)
+
+        with self.__condition:
+
+            if (not failed):
+
+                key = query.strip().lower()
+                self.__searched.add(key)
+
+                if (len(users) < self.pageSize):
+                    self.__complete.add(key)
+
+            if (generation != self.__generation):
+                self.__counters["superseded"] += 1
+                return
+
+            self.__counters["failedSearches"] += failed
+            self.__result = None if failed else suggestions
+            self.__pending = False
+            self.__timer = None
+            self.__condition.notify_all()
+
+        if (callback is not None and not failed):
+            callback(query, suggestions)
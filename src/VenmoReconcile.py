@@ -0,0 +1,476 @@
+import os
+import sys
+import csv
+import heapq
+import argparse
+import tempfile
+from itertools import groupby
+
+import VenmoCodec
+import VenmoToolbox
+import VenmoWatcher
+import VenmoScheduler
+import VenmoEvents
+import VenmoMoney
+
+
+MATCHED = "matched"
+MISSING = "missing"
+DUPLICATED = "duplicated"
+AMOUNT_MISMATCH = "amountMismatch"
+UNEXPECTED = "unexpected"
+
+STATUSES = (MATCHED, MISSING, DUPLICATED, AMOUNT_MISMATCH, UNEXPECTED)
+
+REPORT_COLUMNS = ["status", "recipient", "note", "amount", "actualAmount", "row", "transactions"]
+
+
+class Row():
+    """
+        Brief:
+            One intended payout or one transaction, reduced to what is reconciled. Recipients and notes are compared case insensitively and amounts in whole cents, so "12.5" and "12.50" match.
+
+        Instance Variables:
+            @var `recipient : str`
+                    -venmo username or id of the recipient, lower case
+            @var `cents : int`
+                    -the amount in cents
+            @var `note : str`
+                    -the payment note
+            @var `ref : str`
+                    -where the row came from, ex a line number of the payout file or a payment id
+    """
+
+    __slots__ = ("recipient", "cents", "note", "ref")
+
+    def __init__(self, recipient, amount, note = "", ref = ""):
+        """
+            Args:
+                @param `recipient : str`
+                        -venmo username or id of the recipient
+                @param `amount : str | float | int`
+                        -the amount in dollars
+                @param `note : str = ""`
+                        -the payment note
+                @param `ref : str = ""`
+                        -where the row came from
+        """
+
+        self.recipient = str(recipient).strip().lower()
+        self.cents = VenmoMoney.toCents(amount)
+        self.note = str(note or "").strip()
+        self.ref = str(ref)
+
+
+    def key(self, matchNotes = True) -> tuple:
+        """
+            Returns:
+                `tuple` : `(recipient, note, cents, ref)`, the sort key rows are reconciled by. The note is "" if notes are not matched
+        """
+
+        return (self.recipient, self.note.lower() if matchNotes else "", self.cents, self.ref)
+
+
+
+class Outcome():
+    """
+        Brief:
+            The reconciliation result for one intended payout, or for one transaction nobody intended.
+
+        Instance Variables:
+            @var `status : str`
+                    -`MATCHED` paid exactly once, `DUPLICATED` paid more than once, `AMOUNT_MISMATCH` paid with another amount, `MISSING` not paid, or `UNEXPECTED` for a transaction without an intended payout
+            @var `recipient : str`
+                    -the recipient
+            @var `note : str`
+                    -the note, as compared
+            @var `cents : int`
+                    -intended amount in cents, None for `UNEXPECTED`
+            @var `row : str`
+                    -`ref` of the intended row, None for `UNEXPECTED`
+            @var `transactions : list`
+                    -`(ref, cents)` of the transactions it was matched with
+    """
+
+    __slots__ = ("status", "recipient", "note", "cents", "row", "transactions")
+
+    def __init__(self, status, recipient, note, cents, row, transactions):
+
+        self.status = status
+        self.recipient = recipient
+        self.note = note
+        self.cents = cents
+        self.row = row
+        self.transactions = transactions
+
+
+    def toRow(self) -> list:
+        """
+            Returns:
+                `list` : the outcome as a report row, see `REPORT_COLUMNS`
+        """
+
+        actual = sorted({cents for ref, cents in self.transactions})
+
+        return [
+            self.status,
+            self.recipient,
+            self.note,
+            VenmoMoney.formatCents(self.cents) if self.cents is not None else "",
+            ";".join(VenmoMoney.formatCents(cents) for cents in actual),
+            self.row if self.row is not None else "",
+            ";".join(ref for ref, cents in self.transactions),
+        ]
+
+
+    def __repr__(self) -> str:
+        return "Outcome(" + ", ".join(str(value) for value in self.toRow()) + ")"
+
+
+
+class Reconciler():
+    """
+        Brief:
+            Checks that every intended payout was paid exactly once. Intended rows and transactions are grouped by recipient and note and compared within each group: an intended row with a transaction of the same amount is matched, or duplicated if that amount was paid more often than intended. Left over intended rows are paired with left over transactions of the group as amount mismatches, closest amount first, and otherwise missing. Left over transactions are unexpected.
+
+            Inputs that fit in `chunkSize` rows are grouped with hash indexes in memory. Larger inputs are sorted in chunks of `chunkSize` rows into temporary run files and merged, so memory stays bounded by `chunkSize` no matter how many rows there are, and the groups are compared in a single merge pass.
+
+        Instance Variables:
+            @var `chunkSize : int`
+                    -most rows of each input held in memory at once
+            @var `matchNotes : bool`
+                    -whether notes have to match. If False, rows are grouped by recipient only
+            @var `tempDirectory : str`
+                    -directory the run files are written to, None for the system default
+    """
+
+    def __init__(self, chunkSize = 200000, matchNotes = True, tempDirectory = None):
+
+        self.chunkSize = chunkSize
+        self.matchNotes = matchNotes
+        self.tempDirectory = tempDirectory
+
+        self.__codec = VenmoCodec.getCodec()
+
+
+    def outcomes(self, intended, transactions):
+        """
+            Brief:
+                Reconciles intended payouts against transactions, yielding outcomes as the groups are compared.
+
+            Args:
+                @param `intended : iterable`
+                        -the intended payouts as `Row`s, ex `readRows("payouts.csv")`
+                @param `transactions : iterable`
+                        -the transactions as `Row`s, ex `transactionsFromFeed(toolbox)`
+
+            Returns:
+                `generator` : an `Outcome` for every intended row and every unexpected transaction
+        """
+
+        with tempfile.TemporaryDirectory(dir = self.tempDirectory) as directory:
+
+            intendedKeys = self.__sorted(intended, directory, "intended")
+            transactionKeys = self.__sorted(transactions, directory, "transactions")
+
+            for group, intendedRows, transactionRows in self.__join(intendedKeys, transactionKeys):
+                yield from self.__classify(group, intendedRows, transactionRows)
+
+
+    def reconcile(self, intended, transactions, reportPath = None) -> dict:
+        """
+            Brief:
+                Reconciles intended payouts against transactions and counts the outcomes, optionally writing every outcome to a csv report as it goes.
+
+            Args:
+                @param `intended : iterable`
+                        -the intended payouts as `Row`s
+                @param `transactions : iterable`
+                        -the transactions as `Row`s
+                @param `reportPath : str = None`
+                        -csv file to write the outcomes to, see `REPORT_COLUMNS`
+
+            Returns:
+                `dict` : number of outcomes per status, plus `ok`, whether every intended payout was matched and nothing was unexpected
+        """
+
+        counts = dict.fromkeys(STATUSES, 0)
+        reportFile = open(reportPath, mode = "w", newline = "", encoding = "UTF-8") if reportPath is not None else None
+
+        try:
+
+            writer = csv.writer(reportFile) if reportFile is not None else None
+
+            if (writer is not None):
+                writer.writerow(REPORT_COLUMNS)
+
+            for outcome in self.outcomes(intended, transactions):
+
+                counts[outcome.status] += 1
+
+                if (writer is not None):
+                    writer.writerow(outcome.toRow())
+
+        finally:
+            if (reportFile is not None):
+                reportFile.close()
+
+        counts["ok"] = counts[MATCHED] == sum(counts[status] for status in STATUSES if status != UNEXPECTED) and counts[UNEXPECTED] == 0
+
+        return counts
+
+
+    def __sorted(self, rows, directory, name):
+
+        chunk = []
+        runs = []
+
+        for row in rows:
+
+            chunk.append(row.key(self.matchNotes))
+
+            if (len(chunk) >= self.chunkSize):
+                runs.append(self.__writeRun(sorted(chunk), directory, name + str(len(runs))))
+                chunk = []
+
+        if (not runs):
+            return chunk
+
+        if (chunk):
+            runs.append(self.__writeRun(sorted(chunk), directory, name + str(len(runs))))
+
+        return heapq.merge(*(self.__readRun(path) for path in runs))
+
+
+    def __writeRun(self, keys, directory, name) -> str:
+
+        path = os.path.join(directory, name + ".jsonl")
+
+        with open(path, mode = "wb") as file:
+            for key in keys:
+                file.write(self.__codec.dumps(key) + b"\n")
+
+        return path
+
+
+    def __readRun(self, path):
+
+        with open(path, mode = "rb") as file:
+            for line in file:
+                yield tuple(self.__codec.loads(line))
+
+
+    def __join(self, intendedKeys, transactionKeys):
+
+        if (isinstance(intendedKeys, list) and isinstance(transactionKeys, list)):
+            yield from self.__hashJoin(intendedKeys, transactionKeys)
+            return
+
+        groupOf = lambda key : key[:2]
+        intendedGroups = groupby(sorted(intendedKeys) if isinstance(intendedKeys, list) else intendedKeys, groupOf)
+        transactionGroups = groupby(sorted(transactionKeys) if isinstance(transactionKeys, list) else transactionKeys, groupOf)
+
+        intendedGroup = next(intendedGroups, None)
+        transactionGroup = next(transactionGroups, None)
+
+        while (intendedGroup is not None or transactionGroup is not None):
+
+            if (transactionGroup is None or (intendedGroup is not None and intendedGroup[0] < transactionGroup[0])):
+                yield intendedGroup[0], list(intendedGroup[1]), []
+                intendedGroup = next(intendedGroups, None)
+
+            elif (intendedGroup is None or transactionGroup[0] < intendedGroup[0]):
+                yield transactionGroup[0], [], list(transactionGroup[1])
+                transactionGroup = next(transactionGroups, None)
+
+            else:
+                yield intendedGroup[0], list(intendedGroup[1]), list(transactionGroup[1])
+                intendedGroup = next(intendedGroups, None)
+                transactionGroup = next(transactionGroups, None)
+
+
+    def __hashJoin(self, intendedKeys, transactionKeys):
+
+        transactionIndex = {}
+
+        for key in transactionKeys:
+            transactionIndex.setdefault(key[:2], []).append(key)
+
+        intendedIndex = {}
+
+        for key in intendedKeys:
+            intendedIndex.setdefault(key[:2], []).append(key)
+
+        for group, intendedRows in intendedIndex.items():
+            yield group, intendedRows, transactionIndex.pop(group, [])
+
+        for group, transactionRows in transactionIndex.items():
+            yield group, [], transactionRows
+
+
+    def __classify(self, group, intendedRows, transactionRows):
+
+        recipient, note = group
+        paidByAmount = {}
+
+        for key in sorted(transactionRows):
+            paidByAmount.setdefault(key[2], []).append(key)
+
+        intendedByAmount = {}
+
+        for key in sorted(intendedRows):
+            intendedByAmount.setdefault(key[2], []).append(key)
+
+        unpaid = []
+
+        for cents, rows in intendedByAmount.items():
+
+            paid = paidByAmount.pop(cents, [])
+
+            if (len(paid) > len(rows)):
+
+                for key in rows:
+                    yield Outcome(DUPLICATED, recipient, note, cents, key[3], [(each[3], each[2]) for each in paid])
+
+                continue
+
+            for key, each in zip(rows, paid):
+                yield Outcome(MATCHED, recipient, note, cents, key[3], [(each[3], each[2])])
+
+            unpaid.extend(rows[len(paid):])
+
+        leftover = [key for rows in paidByAmount.values() for key in rows]
+
+        for key in unpaid:
+
+            if (not leftover):
+                yield Outcome(MISSING, recipient, note, key[2], key[3], [])
+                continue
+
+            closest = min(range(len(leftover)), key = lambda index : abs(leftover[index][2] - key[2]))
+            each = leftover.pop(closest)
+
+            yield Outcome(AMOUNT_MISMATCH, recipient, note, key[2], key[3], [(each[3], each[2])])
+
+        for each in leftover:
+            yield Outcome(UNEXPECTED, recipient, note, None, None, [(each[3], each[2])])
+
+
+
+def readRows(path, recipientColumn = "recipient", amountColumn = "amount", noteColumn = "note", refColumn = None):
+    """
+        Brief:
+            Streams the rows of a csv file with a header, ex an intended payout sheet or a transaction export.
+
+        Args:
+            @param `path : str`
+                    -the csv file
+            @param `recipientColumn : str = "recipient"`
+                    -column with the recipient's venmo username or id
+            @param `amountColumn : str = "amount"`
+                    -column with the amount in dollars
+            @param `noteColumn : str = "note"`
+                    -column with the note. Missing columns count as an empty note
+            @param `refColumn : str = None`
+                    -column identifying the row, ex a payment id. The line number if None
+
+        Returns:
+            `generator` : a `Row` for every line
+    """
+
+    with open(path, mode = "r", newline = "", encoding = "UTF-8") as file:
+
+        for line, record in enumerate(csv.DictReader(file), 2):
+            yield Row(record[recipientColumn], record[amountColumn], record.get(noteColumn, ""), record[refColumn] if refColumn is not None else line)
+
+
+def transactionsFromFeed(toolbox, by = "username", pageSize = 50, untilID = None, maxStories = None, kind = VenmoWatcher.PAYMENT_SENT):
+    """
+        Brief:
+            Streams the payments the logged in account sent, newest first, by paging back through its activity feed with background priority. Stories of other kinds, ex payment requests or received payments, and cancelled or failed payments are skipped.
+
+        Args:
+            @param `toolbox : VenmoToolbox.VenmoToolbox`
+                    -a logged in toolbox
+            @param `by : str = "username"`
+                    -identify recipients by `username` or `id`, whichever the payout file uses
+            @param `pageSize : int = 50`
+                    -stories per feed request
+            @param `untilID : str = None`
+                    -stop at this story id, ex the newest story before the payout run
+            @param `maxStories : int = None`
+                    -stop after this many stories
+            @param `kind : str = VenmoWatcher.PAYMENT_SENT`
+                    -the kind of story to stream, see `VenmoWatcher.classifyStory`. `VenmoWatcher.REQUEST_SENT` streams the payment requests the account sent instead
+
+        Returns:
+            `generator` : a `Row` for every sent payment, with the payment id as `ref`
+    """
+
+    beforeID = None
+    seen = 0
+
+    while (maxStories is None or seen < maxStories):
+
+        with toolbox.priority(VenmoScheduler.BACKGROUND):
+            stories = toolbox.getActivityFeed(pageSize, beforeID).get("data", [])
+
+        if (not isinstance(stories, list) or not stories):
+            return
+
+        for story in stories:
+
+            if (untilID is not None and int(story.get("id", 0)) <= int(untilID)):
+                return
+
+            seen += 1
+
+            payment = story.get("payment", {})
+
+            if (VenmoWatcher.classifyStory(story, toolbox.userid) == kind and payment.get("status") not in ("cancelled", "failed")):
+                yield Row(payment.get("target", {}).get("user", {}).get(by, ""), payment.get("amount", 0), payment.get("note", ""), payment.get("id", story.get("id", "")))
+
+            if (maxStories is not None and seen >= maxStories):
+                return
+
+        if (len(stories) < pageSize):
+            return
+
+        beforeID = stories[-1].get("id")
+
+
+def main(args) -> int:
+
+    parser = argparse.ArgumentParser(description = "Reconciles an intended payout csv (recipient, amount, note) against the payments that were sent.")
+    parser.add_argument("payouts", help = "csv of intended payouts")
+    parser.add_argument("--transactions", help = "csv of sent payments with the same columns. Without it the payments are read from the activity feed of the account in auth.json")
+    parser.add_argument("--transaction-ref", default = None, help = "column of --transactions identifying a payment, the line number if not given")
+    parser.add_argument("--by", choices = ("username", "id"), default = "username", help = "how the payout file identifies recipients, for the activity feed")
+    parser.add_argument("--until", default = None, help = "story id to stop reading the activity feed at")
+    parser.add_argument("--report", default = None, help = "csv file to write every outcome to")
+    parser.add_argument("--chunk-size", type = int, default = 200000, help = "most rows of each input held in memory")
+    parser.add_argument("--ignore-notes", action = "store_true", help = "match on recipient and amount only")
+    options = parser.parse_args(args)
+
+    if (options.transactions is not None):
+        transactions = readRows(options.transactions, refColumn = options.transaction_ref)
+    else:
+        toolbox = VenmoToolbox.VenmoToolbox(autoRevokeTokenOnDelete = False)
+        toolbox.events.addSink(VenmoEvents.TextSink(sys.stdout, verbose = False))
+
+        if (not toolbox.login()):
+            toolbox.events.close()
+            return 1
+
+        transactions = transactionsFromFeed(toolbox, options.by, untilID = options.until)
+
+    counts = Reconciler(options.chunk_size, not options.ignore_notes).reconcile(readRows(options.payouts), transactions, options.report)
+
+    for status in STATUSES:
+        print("\t" + status + " : " + str(counts[status]))
+
+    return 0 if counts["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
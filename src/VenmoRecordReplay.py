@@ -0,0 +1,412 @@
+import json
+import time
+import hmac
+import hashlib
+import secrets
+import threading
+from urllib.parse import urlsplit
+
+from VenmoFakeBackend import FakeResponse, requestBody
+
+
+FIXTURE_VERSION = 1
+
+SECRET_KEYS = {"access_token", "password", "venmo-otp-secret", "venmo-otp", "authorization"}
+ID_KEYS = {"id", "user_id", "funding_source_id"}
+NAME_KEYS = {"username", "query", "phone_email_or_username"}
+PII_KEYS = {"first_name", "last_name", "display_name", "email", "phone", "about", "profile_picture_url", "name", "last_four", "note"}
+RECORDED_HEADERS = {"etag", "last-modified", "content-type", "venmo-otp-secret"}
+
+
+class Scrubber():
+    """
+        Brief:
+            Replaces tokens, passwords and personal information in recorded exchanges. Ids and usernames are replaced by pseudonyms derived from a per recording secret, so the same value is replaced the same way in urls, request bodies and responses and the recording still replays consistently.
+    """
+
+    def __init__(self, salt = None):
+        """
+            Args:
+                @param `salt : bytes = None`
+                        -secret the pseudonyms are derived from. A random one is made if None and never stored
+        """
+
+        self.__salt = salt if salt is not None else secrets.token_bytes(16)
+
+
+    def __digest(self, value) -> str:
+
+        return hmac.new(self.__salt, str(value).encode("UTF-8"), hashlib.sha256).hexdigest()
+
+
+    def pseudonymID(self, value) -> str:
+        """
+            Returns:
+                `str` : a 19 digit pseudonym for a venmo id
+        """
+
+        return str(10 ** 18 + int(self.__digest(value)[:15], 16) % (9 * 10 ** 18))
+
+
+    def pseudonymName(self, value) -> str:
+        """
+            Returns:
+                `str` : a pseudonym for a username or other personal string
+        """
+
+        return "user-" + self.__digest(str(value).lower())[:12]
+
+
+    def scrubUrl(self, url) -> str:
+        """
+            Brief:
+                Strips the scheme, host and api version from a url and replaces numeric path segments and numeric id query parameters, ex `before_id`, with pseudonyms. Ids a replayed client sends come from scrubbed responses, so they have to be recorded the same way wherever they appear in the url.
+
+            Args:
+                @param `url : str`
+                        -the request url
+
+            Returns:
+                `str` : the scrubbed path and query
+        """
+
+        parts = urlsplit(url)
+        path = parts.path
+
+        if (path.startswith("/v1")):
+            path = path[3:]
+
+        path = "/".join(self.pseudonymID(segment) if segment.isdigit() else segment for segment in path.split("/"))
+        parameters = []
+
+        for parameter in (parts.query.split("&") if parts.query else ()):
+
+            key, separator, value = parameter.partition("=")
+
+            if (value.isdigit() and (key.lower() in ID_KEYS or key.lower().endswith("_id"))):
+                value = self.pseudonymID(value)
+
+            parameters.append(key + separator + value)
+
+        return path + ("?" + "&".join(parameters) if parameters else "")
+
+
+    def scrubJson(self, obj):
+        """
+            Brief:
+                Returns a scrubbed copy of a json tree.
+
+            Args:
+                @param `obj : dict | list`
+                        -the json tree
+
+            Returns:
+                `dict | list` : the scrubbed copy
+        """
+
+        stack = []
+        root = self.__scrubValue(None, obj, stack)
+
+        while (stack):
+
+            source, target = stack.pop()
+
+            if (isinstance(source, dict)):
+                for key, value in source.items():
+                    target[key] = self.__scrubValue(key, value, stack)
+            else:
+                for value in source:
+                    target.append(self.__scrubValue(None, value, stack))
+
+        return root
+
+
+    def __scrubValue(self, key, value, stack):
+
+        if (isinstance(value, dict)):
+            copy = {}
+            stack.append((value, copy))
+            return copy
+
+        if (isinstance(value, list)):
+            copy = []
+            stack.append((value, copy))
+            return copy
+
+        if (value is None or key is None or isinstance(value, bool)):
+            return value
+
+        lowerKey = key.lower()
+
+        if (lowerKey in SECRET_KEYS):
+            return "scrubbed"
+
+        if (lowerKey in ID_KEYS):
+            return self.pseudonymID(value) if str(value).isdigit() else value
+
+        if (lowerKey in NAME_KEYS or lowerKey in PII_KEYS):
+            return self.pseudonymName(value)
+
+        return value
+
+
+    def scrubHeaders(self, headers) -> dict:
+        """
+            Returns:
+                `dict` : the response headers worth replaying, with secrets removed
+        """
+
+        result = {}
+
+        for key, value in headers.items():
+
+            if (key.lower() not in RECORDED_HEADERS):
+                continue
+
+            result[key] = "scrubbed" if key.lower() in SECRET_KEYS else value
+
+        return result
+
+
+
+def exchangeKey(method, path, body) -> tuple:
+    """
+        Brief:
+            The key recorded exchanges are matched on during replay.
+
+        Args:
+            @param `method : str`
+                    -http method
+            @param `path : str`
+                    -path and query without the api base
+            @param `body : dict`
+                    -json body of the request
+
+        Returns:
+            `tuple` : the key
+    """
+
+    return (method.upper(), path, json.dumps(body, sort_keys = True, separators = (",", ":")) if body is not None else "")
+
+
+
+class RecordingSession():
+    """
+        Brief:
+            Wraps a `requests.Session`, sending every request through it and recording a scrubbed copy of the exchange and its latency.
+
+        Instance Variables:
+            @var `session : requests.Session`
+                    -the session requests are sent over
+            @var `scrubber : Scrubber`
+                    -scrubs the recorded exchanges
+            @var `exchanges : list`
+                    -the recorded exchanges
+    """
+
+    def __init__(self, session, scrubber = None):
+        """
+            Args:
+                @param `session : requests.Session`
+                        -the session to record
+                @param `scrubber : Scrubber = None`
+                        -scrubs the recorded exchanges. A new one with a random secret is made if None
+        """
+
+        self.session = session
+        self.scrubber = scrubber if scrubber is not None else Scrubber()
+        self.exchanges = []
+        self.__lock = threading.Lock()
+
+
+    def request(self, method, url, headers = None, json = None, timeout = None, data = None, **kwargs):
+
+        start = time.perf_counter()
+        response = self.session.request(method, url, headers = headers, json = json, timeout = timeout, data = data, **kwargs)
+        latency = time.perf_counter() - start
+        body = requestBody(json, data)
+
+        try:
+            responseBody = self.scrubber.scrubJson(response.json()) if response.content else None
+        except ValueError:
+            responseBody = None
+
+        exchange = {
+            "m" : method.upper(),
+            "u" : self.scrubber.scrubUrl(url),
+            "q" : self.scrubber.scrubJson(body) if body is not None else None,
+            "s" : response.status_code,
+            "h" : self.scrubber.scrubHeaders(response.headers),
+            "b" : responseBody,
+            "t" : round(latency, 6),
+        }
+
+        with self.__lock:
+            self.exchanges.append(exchange)
+
+        return response
+
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+
+    def save(self, path, metadata = None) -> None:
+        """
+            Brief:
+                Writes the recorded exchanges to a fixture file, one compact json line per exchange after a header line.
+
+            Args:
+                @param `path : str`
+                        -the fixture file
+                @param `metadata : dict = None`
+                        -extra json stored in the header line, ex the parameters of the recorded workflows. It is scrubbed like the exchanges
+
+            Returns:
+                `None`
+        """
+
+        with open(path, mode = "w", encoding = "UTF-8") as file:
+
+            file.write(json.dumps({"version" : FIXTURE_VERSION, "metadata" : self.scrubber.scrubJson(metadata or {})}, separators = (",", ":")) + "\n")
+
+            for exchange in self.exchanges:
+                file.write(json.dumps(exchange, separators = (",", ":")) + "\n")
+
+
+
+class Fixture():
+    """
+        Brief:
+            The exchanges of a fixture file, indexed for replay.
+
+        Instance Variables:
+            @var `metadata : dict`
+                    -the json stored with the recording
+            @var `exchanges : list`
+                    -the recorded exchanges in order
+    """
+
+    def __init__(self, path):
+        """
+            Args:
+                @param `path : str`
+                        -the fixture file
+        """
+
+        self.metadata = {}
+        self.exchanges = []
+
+        with open(path, mode = "r", encoding = "UTF-8") as file:
+
+            header = json.loads(file.readline())
+
+            if (header.get("version") != FIXTURE_VERSION):
+                raise ValueError("Unsupported fixture version " + str(header.get("version")))
+
+            self.metadata = header.get("metadata", {})
+
+            for line in file:
+                if (line.strip()):
+                    self.exchanges.append(json.loads(line))
+
+        self.index = {}
+
+        for exchange in self.exchanges:
+
+            content = json.dumps(exchange["b"], separators = (",", ":")).encode("UTF-8") if exchange["b"] is not None else b""
+            self.index.setdefault(exchangeKey(exchange["m"], exchange["u"], exchange["q"]), []).append((exchange["s"], exchange["h"], content, exchange["t"]))
+
+
+
+class ReplaySession():
+    """
+        Brief:
+            Drop in replacement for `requests.Session` that answers requests from a recorded fixture instead of the network. Exchanges with the same method, path and body are replayed in the order they were recorded, the last one is repeated once they run out.
+
+        Instance Variables:
+            @var `fixture : Fixture`
+                    -the recording being replayed
+            @var `realtime : bool`
+                    -sleep for the recorded latency of each exchange instead of answering at full speed
+            @var `misses : int`
+                    -requests that had no recorded exchange. They are answered with a 404
+    """
+
+    def __init__(self, fixture, realtime = False):
+        """
+            Args:
+                @param `fixture : Fixture | str`
+                        -the recording, or the path of its fixture file
+                @param `realtime : bool = False`
+                        -replay with the recorded latencies
+        """
+
+        self.fixture = fixture if isinstance(fixture, Fixture) else Fixture(fixture)
+        self.realtime = realtime
+        self.misses = 0
+        self.__cursors = {}
+        self.__lock = threading.Lock()
+
+
+    def rewind(self) -> None:
+        """
+            Brief:
+                Starts replaying every exchange from the beginning again.
+
+            Returns:
+                `None`
+        """
+
+        with self.__lock:
+            self.__cursors.clear()
+            self.misses = 0
+
+
+    def request(self, method, url, headers = None, json = None, timeout = None, data = None, **kwargs) -> FakeResponse:
+
+        parts = urlsplit(url)
+        path = parts.path[3:] if parts.path.startswith("/v1") else parts.path
+        key = exchangeKey(method, path + ("?" + parts.query if parts.query else ""), requestBody(json, data))
+
+        with self.__lock:
+
+            recorded = self.fixture.index.get(key)
+
+            if (recorded is None):
+                self.misses += 1
+                return FakeResponse(404, {}, b"{\"error\":{\"code\":404,\"message\":\"No recorded exchange\"}}")
+
+            cursor = self.__cursors.get(key, 0)
+            self.__cursors[key] = cursor + 1
+
+        status, responseHeaders, content, latency = recorded[min(cursor, len(recorded) - 1)]
+
+        if (self.realtime):
+            time.sleep(latency)
+
+        return FakeResponse(status, dict(responseHeaders), content)
+
+
+    def get(self, url, **kwargs) -> FakeResponse:
+        return self.request("GET", url, **kwargs)
+
+
+    def post(self, url, **kwargs) -> FakeResponse:
+        return self.request("POST", url, **kwargs)
+
+
+    def delete(self, url, **kwargs) -> FakeResponse:
+        return self.request("DELETE", url, **kwargs)
+
+
+    def close(self) -> None:
+        pass
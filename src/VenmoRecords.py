@@ -0,0 +1,149 @@
+import VenmoLazyView
+
+
+class Record():
+    """
+        Brief:
+            Base class for the compact record types. A record keeps only the fields listed in `FIELDS` in `__slots__` instead of the whole json object, so large numbers of them take far less memory than the decoded json dicts.
+
+        Class Variables:
+            @var `FIELDS : tuple`
+                    -`(attribute, jsonKey, convert)` tuples. `convert` turns the json value into the stored value, None values are stored as is
+    """
+
+    __slots__ = ()
+    FIELDS = ()
+
+    def __init__(self, *values):
+
+        for (attribute, jsonKey, convert), value in zip(self.FIELDS, values):
+            setattr(self, attribute, value)
+
+
+    @classmethod
+    def fromJson(cls, obj):
+        """
+            Brief:
+                Creates a record from a venmo json object, reading only the fields the record keeps.
+
+            Args:
+                @param `obj : dict`
+                        -the json object
+
+            Returns:
+                `Record` : the new record
+        """
+
+        record = cls.__new__(cls)
+        get = obj.get
+
+        for attribute, jsonKey, convert in cls.FIELDS:
+
+            value = get(jsonKey)
+
+            if (value is not None and convert is not None):
+                value = convert(value)
+
+            setattr(record, attribute, value)
+
+        return record
+
+
+    @classmethod
+    def fromResponse(cls, responseJson) -> list:
+        """
+            Brief:
+                Creates one record per entry in the `data` list of an api response.
+
+            Args:
+                @param `responseJson : dict | VenmoLazyView.LazyView`
+                        -the decoded api response, or a lazy view of it. Entries of a view are parsed one at a time
+
+            Returns:
+                `list` : the records. Empty if the response has no `data` list, ex on an error
+        """
+
+        data = responseJson.get("data") if isinstance(responseJson, (dict, VenmoLazyView.LazyView)) else None
+
+        if (not isinstance(data, list) and not (isinstance(data, VenmoLazyView.LazyView) and data.isArray)):
+            return []
+
+        fromJson = cls.fromJson
+
+        return [fromJson(entry) for entry in data]
+
+
+    def toJson(self) -> dict:
+        """
+            Brief:
+                Converts the record back to a json object with the original venmo keys.
+
+            Returns:
+                `dict` : the json object
+        """
+
+        return {jsonKey : getattr(self, attribute) for attribute, jsonKey, convert in self.FIELDS}
+
+
+    def __eq__(self, other) -> bool:
+
+        if (type(self) is not type(other)):
+            return NotImplemented
+
+        return all(getattr(self, attribute) == getattr(other, attribute) for attribute, jsonKey, convert in self.FIELDS)
+
+
+    def __repr__(self) -> str:
+
+        return type(self).__name__ + "(" + ", ".join(attribute + "=" + repr(getattr(self, attribute)) for attribute, jsonKey, convert in self.FIELDS) + ")"
+
+
+
+class UserRecord(Record):
+    """
+        Brief:
+            A venmo user, ex the result of a user lookup.
+    """
+
+    FIELDS = (
+        ("id", "id", int),
+        ("username", "username", None),
+        ("firstName", "first_name", None),
+        ("lastName", "last_name", None),
+        ("displayName", "display_name", None),
+        ("friendStatus", "friend_status", None),
+    )
+    __slots__ = tuple(field[0] for field in FIELDS)
+
+
+
+class FriendRecord(Record):
+    """
+        Brief:
+            An entry of a friend list.
+    """
+
+    FIELDS = (
+        ("id", "id", int),
+        ("username", "username", None),
+        ("firstName", "first_name", None),
+        ("lastName", "last_name", None),
+    )
+    __slots__ = tuple(field[0] for field in FIELDS)
+
+
+
+class PaymentMethodRecord(Record):
+    """
+        Brief:
+            A payment method on the authenticated user's account.
+    """
+
+    FIELDS = (
+        ("id", "id", None),
+        ("type", "type", None),
+        ("name", "name", None),
+        ("lastFour", "last_four", None),
+        ("role", "peer_payment_role", None),
+    )
+    __slots__ = tuple(field[0] for field in FIELDS)
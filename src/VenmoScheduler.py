@@ -0,0 +1,177 @@
+import time
+import threading
+from collections import deque
+
+import VenmoConcurrencyLimiter
+
+
+INTERACTIVE = "interactive"
+PAYMENTS = "payments"
+BACKGROUND = "background"
+
+DEFAULT_WEIGHTS = {INTERACTIVE : 8, PAYMENTS : 4, BACKGROUND : 1}
+DEFAULT_RESERVES = {BACKGROUND : 1}
+
+
+class _Waiter():
+
+    __slots__ = ("priority", "start", "finish", "event", "granted")
+
+    def __init__(self, priority, start, finish):
+
+        self.priority = priority
+        self.start = start
+        self.finish = finish
+        self.event = threading.Event()
+        self.granted = False
+
+
+
+class RequestScheduler():
+    """
+        Brief:
+            Hands out the slots of an `AdaptiveLimiter` to waiting requests by priority class with weighted fair queueing. Each class has its own queue, so an interactive request only competes with the heads of the other queues instead of waiting behind every queued background request. While several classes are waiting, each gets slots in proportion to its weight, and an idle class's share goes to the others, so bulk jobs still use the whole limit when nothing else is running.
+
+        Instance Variables:
+            @var `limiter : VenmoConcurrencyLimiter.AdaptiveLimiter`
+                    -decides how many requests may be in flight at once
+            @var `weights : dict`
+                    -relative share of the slots per priority class
+            @var `reserves : dict`
+                    -number of slots a priority class has to leave free for the others, ex so a background job never takes the last slot an interactive request could use
+    """
+
+    def __init__(self, limiter, weights = None, reserves = None, clock = time.monotonic):
+        """
+            Args:
+                @param `limiter : VenmoConcurrencyLimiter.AdaptiveLimiter`
+                        -the limiter whose slots are scheduled
+                @param `weights : dict = None`
+                        -share per priority class. Defaults to `DEFAULT_WEIGHTS`
+                @param `reserves : dict = None`
+                        -slots per priority class left free for the others. Defaults to `DEFAULT_RESERVES`
+        """
+
+        self.limiter = limiter
+        self.weights = dict(weights if weights is not None else DEFAULT_WEIGHTS)
+        self.reserves = dict(reserves if reserves is not None else DEFAULT_RESERVES)
+
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__queues = {priority : deque() for priority in self.weights}
+        self.__lastFinish = {priority : 0.0 for priority in self.weights}
+        self.__virtualTime = 0.0
+        self.__counters = {priority : {"granted" : 0, "timedOut" : 0, "waitSeconds" : 0.0} for priority in self.weights}
+
+
+    def acquire(self, priority = INTERACTIVE, timeout = None) -> None:
+        """
+            Brief:
+                Waits until the scheduler grants this request a slot of the limiter. Must be followed by `release`.
+
+            Args:
+                @param `priority : str = INTERACTIVE`
+                        -priority class of the request, one of the keys of `weights`
+                @param `timeout : float = None`
+                        -longest to wait in seconds, None waits as long as needed
+
+            Returns:
+                `None`
+
+            Raises:
+                `VenmoConcurrencyLimiter.AcquireTimeoutError` : if no slot was granted within `timeout`
+        """
+
+        if (priority not in self.weights):
+            raise ValueError("Unknown request priority " + str(priority) + ". Choose from: " + ", ".join(self.weights))
+
+        queued = self.__clock()
+
+        with self.__lock:
+
+            start = max(self.__virtualTime, self.__lastFinish[priority])
+            waiter = _Waiter(priority, start, start + 1.0 / self.weights[priority])
+            self.__lastFinish[priority] = waiter.finish
+            self.__queues[priority].append(waiter)
+
+            self.__dispatch()
+
+        if (not waiter.granted):
+            waiter.event.wait(timeout)
+
+        with self.__lock:
+
+            counters = self.__counters[priority]
+
+            if (not waiter.granted):
+
+                self.__queues[priority].remove(waiter)
+                counters["timedOut"] += 1
+
+                raise VenmoConcurrencyLimiter.AcquireTimeoutError("Timed out waiting for a free " + priority + " request slot, the concurrency limit is " + str(self.limiter.limit) + ".")
+
+            counters["granted"] += 1
+            counters["waitSeconds"] += self.__clock() - queued
+
+
+    def release(self, latency, outcome = VenmoConcurrencyLimiter.SUCCESS) -> None:
+        """
+            Brief:
+                Returns the slot to the limiter, which adjusts its limit from the outcome, and grants the freed slots to the next waiting requests.
+
+            Args:
+                @param `latency : float`
+                        -how long the request took in seconds
+                @param `outcome : str = SUCCESS`
+                        -outcome of the request, see `VenmoConcurrencyLimiter.AdaptiveLimiter.release`
+
+            Returns:
+                `None`
+        """
+
+        self.limiter.release(latency, outcome)
+
+        with self.__lock:
+            self.__dispatch()
+
+
+    def stats(self) -> dict:
+        """
+            Returns:
+                `dict` : per priority class the number of `queued` requests, requests `granted` a slot, requests that `timedOut` waiting and their `averageWait` in seconds
+        """
+
+        with self.__lock:
+
+            result = {}
+
+            for priority, counters in self.__counters.items():
+                result[priority] = {
+                    "queued" : len(self.__queues[priority]),
+                    "granted" : counters["granted"],
+                    "timedOut" : counters["timedOut"],
+                    "averageWait" : counters["waitSeconds"] / counters["granted"] if counters["granted"] else 0.0,
+                }
+
+            return result
+
+
+    def __dispatch(self) -> None:
+
+        while (True):
+
+            heads = sorted((queue[0] for queue in self.__queues.values() if queue), key = lambda waiter : waiter.finish)
+
+            if (not heads):
+                return
+
+            for waiter in heads:
+                if (self.limiter.tryAcquire(self.reserves.get(waiter.priority, 0))):
+                    break
+            else:
+                return
+
+            self.__queues[waiter.priority].popleft()
+            self.__virtualTime = max(self.__virtualTime, waiter.start)
+            waiter.granted = True
+            waiter.event.set()
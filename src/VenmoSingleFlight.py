@@ -0,0 +1,140 @@
+import threading
+
+
+class WaitTimeoutError(TimeoutError):
+    """
+        Brief:
+            Raised in a coalesced caller that gave up waiting for the shared call to finish.
+    """
+
+
+
+class _Call():
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+
+class SingleFlight():
+    """
+        Brief:
+            Coalesces identical calls that are in flight at the same time. The first caller for a key runs the call, every caller that arrives with the same key before it finishes waits for and shares its result. Nothing is kept once the call finishes, so this is not a cache.
+
+        Instance Variables:
+            @var `enabled : bool`
+                    -whether calls are coalesced. When False every call runs on its own
+    """
+
+    def __init__(self, enabled = True):
+        """
+            Args:
+                @param `enabled : bool = True`
+                        -whether calls are coalesced
+        """
+
+        self.enabled = enabled
+        self.__calls = {}
+        self.__lock = threading.Lock()
+        self.__requested = 0
+        self.__executed = 0
+        self.__coalesced = 0
+
+
+    def do(self, key, function, timeout = None):
+        """
+            Brief:
+                Runs `function` unless a call with the same key is already in flight, in which case it waits for that call and returns its result. Exceptions raised by the shared call are raised in every waiting caller.
+
+            Args:
+                @param `key : hashable`
+                        -identifies the call, ex the method, url and parameters of a request
+                @param `function : callable`
+                        -zero argument callable that performs the call
+                @param `timeout : float = None`
+                        -longest a coalesced caller waits for the shared call before raising `WaitTimeoutError`. None waits until it finishes
+
+            Returns:
+                `any` : the value returned by the call. Coalesced callers get the same object, so it should be treated as read only
+        """
+
+        if (not self.enabled):
+
+            with self.__lock:
+                self.__requested += 1
+                self.__executed += 1
+
+            return function()
+
+        with self.__lock:
+
+            self.__requested += 1
+
+            call = self.__calls.get(key)
+
+            if (call is not None):
+                self.__coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self.__calls[key] = call
+                self.__executed += 1
+                leader = True
+
+        if (not leader):
+
+            if (not call.done.wait(timeout)):
+                raise WaitTimeoutError("Timed out waiting for the in flight call to finish.")
+
+            if (call.error is not None):
+                raise call.error
+
+            return call.result
+
+        try:
+            call.result = function()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.__lock:
+                self.__calls.pop(key, None)
+            call.done.set()
+
+        return call.result
+
+
+    def stats(self) -> dict:
+        """
+            Brief:
+                Returns counters describing how many calls were coalesced.
+
+            Returns:
+                `dict` : `requested` calls made, `executed` calls actually run, `coalesced` calls that shared another call's result and `inFlight` calls currently running
+        """
+
+        with self.__lock:
+
+            return {
+                "requested" : self.__requested,
+                "executed" : self.__executed,
+                "coalesced" : self.__coalesced,
+                "inFlight" : len(self.__calls),
+            }
+
+
+    def resetStats(self) -> None:
+        """
+            Brief:
+                Resets the counters returned by `stats()`.
+
+            Returns:
+                `None`
+        """
+
+        with self.__lock:
+            self.__requested = 0
+            self.__executed = 0
+            self.__coalesced = 0
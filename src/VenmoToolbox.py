@@ -1,9 +1,45 @@
+import time
 import requests
-import json
+import threading
+from contextlib import contextmanager
 from random import randint, choice
 from string import ascii_uppercase
-
-
+from concurrent.futures import ThreadPoolExecutor
+
+import VenmoIdentityCache
+import VenmoSingleFlight
+import VenmoTransport
+import VenmoRecords
+import VenmoCircuitBreaker
+import VenmoDeadline
+import VenmoConcurrencyLimiter
+import VenmoFriendSnapshot
+import VenmoLazyView
+import VenmoEndpoints
+import VenmoAuth
+import VenmoHttp2
+import VenmoEvents
+
+
+# Most requests each public method may send, as (cold, warm): cold with an empty identity cache, warm with the users involved already cached. Checked against the fake backend by `VenmoBenchmarks.py budgets`
+REQUEST_BUDGETS = {
+    "getUserInformationByID" : (1, 1),
+    "getUserInformationByUsername" : (1, 1),
+    "getUserIDByUsername" : (1, 1),
+    "searchUsers" : (1, 1),
+    "getUsernameByUserID" : (1, 1),
+    "getPaymentMethods" : (1, 0),
+    "getFriends" : (1, 1),
+    "getUsersFriends" : (1, 1),
+    "getFriendsDelta" : (1, 1),
+    "getActivityFeed" : (1, 1),
+    "sendMoneyByUserID" : (1, 1),
+    "sendMoneyByUsername" : (2, 1),
+    "requestMoneyByUserID" : (1, 1),
+    "requestMoneyByUsername" : (2, 1),
+    "sendFriendRequestByUserID" : (2, 1),
+    "sendFriendRequestByUsername" : (2, 1),
+}
 
 
 class VenmoToolbox():
@@ -19,7 +55,7 @@ class VenmoToolbox():
             @var `userID : str`
                     -logged in user's venmo ID
             @var `session : requests.Session` 
-                    -session object to persist cookies across api calls
+                    -session object to persist cookies across api calls. A `VenmoHttp2.Http2Session` if the toolbox was made with `http2`
             @var `deviceID : str`
                     -current device id that venmo see's when you log in. Can be stored to remember device and not have to log in using 2FA next time.
             @var `autoLogOut : bool` 
@@ -31,43 +67,63 @@ class VenmoToolbox():
             @var `fName : str`
                     -logged in user's first name according to the venmo account
             @var `endpoints : dict`
-                    -contains all the venmo api endpoints used in the toolbox
+                    -the api base url under `base`, ex to point the toolbox at an emulator, and the path of every endpoint for reference. Only `base` is read, endpoints are changed through `endpointRegistry`
+            @var `endpointRegistry : VenmoEndpoints.EndpointRegistry`
+                    -descriptor of every endpoint the toolbox calls: its method, url template and the timeout, retries, cache ttl, rate class and priority its requests are sent with. Every request is dispatched through it
             @var `defaultHeaders : dict`
                     -default headers sent in most requests. Some api requests copy and modify these headers
+            @var `identityCache : VenmoIdentityCache.IdentityCache`
+                    -username/id pairs seen in api responses. Used by the bulk resolution methods to skip lookups
+            @var `maxConcurrency : int`
+                    -default upper bound on the number of requests the bulk methods send at once. The transport's adaptive `limiter` picks the actual number below it from the observed latency and throttling
+            @var `singleFlight : VenmoSingleFlight.SingleFlight`
+                    -coalesces identical GET requests that are in flight at the same time
+            @var `transport : VenmoTransport.Transport`
+                    -sends the api requests over `session`. Keeps the validators and parsed bodies of conditional GETs, and bounds the requests in flight with an adaptive `VenmoConcurrencyLimiter.AdaptiveLimiter`
+            @var `timeout : float`
+                    -seconds to wait for the api on each request to an endpoint without a timeout of its own
+            @var `friendSnapshots : VenmoFriendSnapshot.SnapshotStore`
+                    -latest snapshot of the authenticated user's friend list, used by `getFriendsDelta`. Kept in memory unless it is replaced with a store that has a file path
+            @var `tokens : VenmoAuth.TokenManager`
+                    -tracks whether the oauth token is still valid. A 401 logs in again with the credentials of the last login, once per rejected token, and requests that are safe to repeat are sent again with the new token
+            @var `events : VenmoEvents.EventBus`
+                    -structured events for logins, payments, friend requests and, at `DEBUG`, every request with its endpoint, outcome and latency. Nothing is printed unless a sink is added, ex `toolbox.events.addSink(VenmoEvents.TextSink())`
+            @var `circuitBreakers : VenmoCircuitBreaker.CircuitBreakerRegistry`
+                    -one circuit breaker per endpoint `rateClass`. While a circuit is open, requests to its endpoints raise `VenmoCircuitBreaker.CircuitOpenError` instead of waiting on a failing api
     """
 
-    def __init__(self, autoRevokeTokenOnDelete = True):
+    def __init__(self, autoRevokeTokenOnDelete = True, http2 = False):
         """
             Args:
                 @param `autoRevokeTokenOnDelete : bool`
                         -dictates whether to send the request to delete the token issued on login when the instance in destructed. Default value is True
+                @param `http2 : bool = False`
+                        -send requests over HTTP/2 so concurrent requests share one connection. Needs `httpx[http2]`, otherwise the toolbox falls back to HTTP/1.1 and emits a `VenmoEvents.TRANSPORT` warning on the first login, once sinks are attached. Servers without HTTP/2 support are talked to over HTTP/1.1
         """
 
+        self.events = VenmoEvents.EventBus()
         self.bearerToken = ""
         self.username = ""
         self.userid = ""
-        self.session = requests.Session()
+        self.transport = VenmoTransport.Transport(VenmoHttp2.makeSession(http2), limiter = VenmoConcurrencyLimiter.AdaptiveLimiter(maxLimit = 32))
+        self.__http2Fallback = VenmoHttp2.unavailableReason() if http2 else ""
         self.deviceID = ""
         self.autoLogOut = autoRevokeTokenOnDelete
         self.loginJson = {}
         self.accJson = {}
         self.fName = ""
-
-        self.endpoints = {
-
-            "base" : "https://api.venmo.com/v1",
-            "oauth" : "/oauth/access_token",
-            "2FAGet" : "/account/two-factor/token?client_id=1",
-            "2FAPost" : "/account/two-factor/token",
-            "account" : "/me",
-            "userLookup" : "/users/{}",
-            "usersLookup" : "/users",
-            "friends" : "/users/{}/friends?limit=1337",
-            "paymentMethods" : "/payment-methods",
-            "friendRequest" : "/friend-requests",
-            "pay" : "/payments",
-
-        }
+        self.identityCache = VenmoIdentityCache.IdentityCache()
+        self.maxConcurrency = 32
+        self.singleFlight = VenmoSingleFlight.SingleFlight()
+        self.timeout = 30.0
+        self.circuitBreakers = VenmoCircuitBreaker.CircuitBreakerRegistry()
+        self.__callPriority = threading.local()
+        self.friendSnapshots = VenmoFriendSnapshot.SnapshotStore()
+        self.tokens = VenmoAuth.TokenManager(self.__relogin)
+        self.__credentials = None
+
+        self.endpointRegistry = VenmoEndpoints.EndpointRegistry()
+        self.endpoints = dict(base = VenmoEndpoints.DEFAULT_BASE, **self.endpointRegistry.fragments())
 
         self.defaultHeaders = {
 
@@ -78,6 +134,16 @@ class VenmoToolbox():
         }
 
 
+    @property
+    def session(self) -> requests.Session:
+        return self.transport.session
+
+
+    @session.setter
+    def session(self, session) -> None:
+        self.transport.session = session
+
+
     def updateDefaultHeaders(self) -> None:
         """
             Brief:
@@ -93,7 +159,7 @@ class VenmoToolbox():
     def __del__(self):
         """
             Brief: 
-                Overloaded destructor. Checks the value of self.autoLogOut and bases on values will or will not send the api request to revoke the current oauth2 token.
+                Overloaded destructor. Checks the value of self.autoLogOut and bases on values will or will not send the api request to revoke the current oauth2 token. Then closes `events`, which stops its dispatcher thread.
 
             Args:
                 N/A
@@ -108,13 +174,17 @@ class VenmoToolbox():
             logoutHeaders = self.defaultHeaders.copy()
 
 
-            r = self.session.delete(self.endpoints["base"] + self.endpoints["oauth"], headers = logoutHeaders)
+            try:
+                r = self.__send("logout", headers = logoutHeaders, reauthenticate = False)
+            except VenmoCircuitBreaker.CircuitOpenError as e:
+                self.events.emit(VenmoEvents.LOGOUT, "Could not revoke the active token. " + str(e), VenmoEvents.WARNING, endpoint = "logout", outcome = "circuitOpen")
+            else:
+                self.events.emit(VenmoEvents.LOGOUT, "Successfully revoked the active token", endpoint = "logout", outcome = "revoked", status = r.status_code)
 
-            print(r.text)
-            print("Successfully revoked the active token")
+        self.events.close()
 
 
-    def login(self, username = "", password = "", deviceID="") -> bool:
+    def login(self, username = "", password = "", deviceID="", deadline = None) -> bool:
         """
             Brief:
                 Attempts to login. Will try to use the credentials stored in the local `auth.json` file. If the files is not found, corrupted, or contains empty json fields it will create a new file using the values passed to method. It then attemps to login, handling 2FA as needed.
@@ -126,11 +196,19 @@ class VenmoToolbox():
                         -password to use when logging in if no `auth.json` exists 
                 @param `deviceID : str = ""~
                         -device id to use when logging in. If empty, it will generate a random one.
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
 
             Returns:
                 `bool` : whether the login attempt was successful or not
         """
 
+        deadline = VenmoDeadline.Deadline.of(deadline)
+
+        if (self.__http2Fallback != ""):
+            self.events.emit(VenmoEvents.TRANSPORT, "HTTP/2 is not available, sending requests over HTTP/1.1. " + self.__http2Fallback, VenmoEvents.WARNING, outcome = "http2Unavailable")
+            self.__http2Fallback = ""
+
         if (deviceID == ""):
 
             self.deviceID = self.generateRandomDeviceID()
@@ -144,10 +222,10 @@ class VenmoToolbox():
         try:
 
             authFile = open("auth.json", mode = "r", encoding = "UTF-8")
-            loginCredentials  = json.loads(authFile.read())
+            loginCredentials  = self.transport.codec.loads(authFile.read())
 
             if (loginCredentials.get("phone_email_or_username", "") == "" or loginCredentials.get("password", "") == ""):
-                print("Incorrect auth json or empty fields.")
+                self.events.emit(VenmoEvents.LOGIN, "Incorrect auth json or empty fields.", VenmoEvents.WARNING, outcome = "invalidAuthFile")
 
                 raise FileNotFoundError
 
@@ -156,12 +234,12 @@ class VenmoToolbox():
         except FileNotFoundError as e:
 
             if (username == "" or password == ""):
-                print("No existing auth file or empty credentials entered. Unable to login.")
+                self.events.emit(VenmoEvents.LOGIN, "No existing auth file or empty credentials entered. Unable to login.", VenmoEvents.ERROR, outcome = "noCredentials")
                 return False
 
             self.createAuthFile(username, password)
             authFile = open("auth.json")
-            loginCredentials = json.loads(authFile.read())
+            loginCredentials = self.transport.codec.loads(authFile.read())
         
 
         authFile.close()
@@ -171,10 +249,10 @@ class VenmoToolbox():
         loginHeaders.pop("Authorization")
 
 
-        response = self.session.post(self.endpoints["base"] + self.endpoints["oauth"], json = loginCredentials, headers = loginHeaders)
+        response = self.__send("oauth", headers = loginHeaders, body = loginCredentials, deadline = deadline)
 
 
-        responseJson = json.loads(response.text)
+        responseJson = self.transport.decode(response)
 
 
         if (responseJson.get("error", "") != ""):  #Error
@@ -183,20 +261,23 @@ class VenmoToolbox():
 
             if (errorCode == 264):
                 
-                print("Incorrect Credentials.")
+                self.events.emit(VenmoEvents.LOGIN, "Incorrect Credentials.", VenmoEvents.ERROR, endpoint = "oauth", outcome = "incorrectCredentials")
                 return False
             
             elif (errorCode == 81109):
                 
-                responseJson = json.loads(self.__handle2FA(response.headers["venmo-otp-secret"]))
+                responseJson = self.transport.decode(self.__handle2FA(response.headers["venmo-otp-secret"], deadline))
 
             else:
                 
-                print("Unexpected Error Logging In.")
+                self.events.emit(VenmoEvents.LOGIN, "Unexpected Error Logging In.", VenmoEvents.ERROR, endpoint = "oauth", outcome = "error", code = errorCode)
                 return False
 
         
-        self.setAccountVariables(responseJson)
+        self.__credentials = loginCredentials
+        self.setAccountVariables(responseJson, deadline)
+
+        self.events.emit(VenmoEvents.LOGIN, "Logged in as " + self.username + ".", VenmoEvents.DEBUG, endpoint = "oauth", userID = self.userid or None, outcome = "loggedIn")
        
        
         return True
@@ -204,21 +285,19 @@ class VenmoToolbox():
     
 
 
-    def __handle2FA(self, otp_secret) -> requests.models.Response.text:
+    def __handle2FA(self, otp_secret, deadline = None) -> requests.models.Response:
         
-        self.__get2FASms(otp_secret)
+        self.__get2FASms(otp_secret, deadline)
+        self.events.flush()
 
         otpSMS = input("Enter the code sent to your phone via sms and hit enter.\n:>")
 
-        response = self.__2FALogin(otp_secret, otpSMS)
-
-
-        return response.text
+        return self.__2FALogin(otp_secret, otpSMS, deadline)
 
 
         
 
-    def get2FAOptions(self, otp_secret) -> dict:
+    def get2FAOptions(self, otp_secret, deadline = None) -> dict:
         """
             Brief:  
                 Querys the api for methods to receive a 2FA code.
@@ -226,7 +305,9 @@ class VenmoToolbox():
             Args:
                 @param `otp_secret : str `
                         -otp secrete header in the login request response
-            
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
+
             Returns:
                 `dict` : response json containing all the methods for receiving a 2FA code
         """
@@ -235,25 +316,25 @@ class VenmoToolbox():
         get2FAHeaders.pop("Authorization")
         get2FAHeaders.update({"venmo-otp-secret": otp_secret})
 
-        response = self.session.get(self.endpoints["base"] + self.endpoints["2FAGet"], headers = get2FAHeaders)
+        response = self.__send("2FAGet", headers = get2FAHeaders, deadline = deadline)
 
-        return json.loads(response.text)
+        return self.transport.decode(response)
 
 
 
-    def __get2FASms(self, otp) -> None:
+    def __get2FASms(self, otp, deadline = None) -> None:
 
         
         send2FASmsHeaders = self.defaultHeaders.copy()
         send2FASmsHeaders.pop("Authorization")
         send2FASmsHeaders.update({"venmo-otp-secret" : otp})
 
-        send2FASmsBodyJson = json.loads("{\"via\": \"sms\"} ")
+        send2FASmsBodyJson = {"via" : "sms"}
         
 
-        response = self.session.post(self.endpoints["base"] + self.endpoints["2FAPost"], headers = send2FASmsHeaders, json=send2FASmsBodyJson)
+        response = self.__send("2FAPost", headers = send2FASmsHeaders, body = send2FASmsBodyJson, deadline = deadline)
         
-        responseJSON = json.loads(response.text)
+        responseJSON = self.transport.decode(response)
 
         if (responseJSON.get("data", "") != ""):
 
@@ -261,18 +342,18 @@ class VenmoToolbox():
 
                 if (responseJSON["data"].get("status", "") == "sent"):
 
-                    print("SMS CODE SENT")
+                    self.events.emit(VenmoEvents.TWO_FACTOR, "SMS CODE SENT", endpoint = "2FAPost", outcome = "sent")
 
             else:
 
-                print("Error sending sms code")
+                self.events.emit(VenmoEvents.TWO_FACTOR, "Error sending sms code", VenmoEvents.ERROR, endpoint = "2FAPost", outcome = "failed")
 
         else:
 
-            print("Error sending sms code")
+            self.events.emit(VenmoEvents.TWO_FACTOR, "Error sending sms code", VenmoEvents.ERROR, endpoint = "2FAPost", outcome = "failed")
 
 
-    def __2FALogin(self, otpHeader, otpSMS) -> requests.models.Response:
+    def __2FALogin(self, otpHeader, otpSMS, deadline = None) -> requests.models.Response:
 
          
         login2FAHeaders = self.defaultHeaders.copy()
@@ -283,11 +364,11 @@ class VenmoToolbox():
 
         authFile = open("auth.json")
 
-        login2FABodyJson = json.loads(authFile.read())
+        login2FABodyJson = self.transport.codec.loads(authFile.read())
 
         authFile.close()
 
-        return self.session.post(self.endpoints["base"] + self.endpoints["oauth"], headers= login2FAHeaders, json=login2FABodyJson)
+        return self.__send("oauth", headers = login2FAHeaders, body = login2FABodyJson, deadline = deadline)
 
 
     def getAccountInfo(self) -> dict:
@@ -301,7 +382,7 @@ class VenmoToolbox():
         return self.accJson
 
 
-    def setAccountVariables(self, loginJson) -> None:
+    def setAccountVariables(self, loginJson, deadline = None) -> None:
         """
             Brief:
                 Sets the instance variables to the respective values  in the passed json. Also updates the default headers.
@@ -309,6 +390,8 @@ class VenmoToolbox():
             Args:
                 @param `loginJson : dict`
                         -Json containing the values to set the instance variables to. Usually the json returned in a login attempt.
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
 
             Returns:
                 `None`
@@ -320,11 +403,10 @@ class VenmoToolbox():
         self.userid = loginJson["user"]["id"]
         self.fName = loginJson["user"]
 
+        self.tokens.set(self.bearerToken, loginJson.get("expires_in"))
         self.updateDefaultHeaders()
 
-        response = self.session.get(self.endpoints["base"] + self.endpoints["account"], headers = self.defaultHeaders)
-
-        self.accJson = json.loads(response.text)
+        self.accJson = self.__getJson("account", deadline = deadline)
 
     def createAuthFile(self, username="", password="") -> None:
         """
@@ -341,13 +423,13 @@ class VenmoToolbox():
                 `None`
         """
 
-        loginJSON = "{{\n\t\"phone_email_or_username\": \"{a1}\",\n\t\"client_id\": \"1\",\n\t\"password\": \"{a2}\"\n}}".format(a1 = username, a2 = password)
+        loginJSON = self.transport.codec.dumps({"phone_email_or_username" : username, "client_id" : "1", "password" : password}).decode("UTF-8")
         file = open("auth.json", mode="w+", encoding="UTF-8")
         file.write(loginJSON)
         file.close()
 
 
-    def getUserInformationByID(self, userID ) -> dict:
+    def getUserInformationByID(self, userID, asRecords = False, deadline = None, lazy = False) -> dict:
         """
             Brief:
                 Gets a user's venmo information by venmo id
@@ -355,67 +437,151 @@ class VenmoToolbox():
             Args:
                 @param `userId : str`
                         -the desired user's venmo id
+                @param `asRecords : bool = False`
+                        -return a compact `VenmoRecords.UserRecord` instead of the response json
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
+                @param `lazy : bool = False`
+                        -return a `VenmoLazyView.LazyView` over the raw response instead of the decoded json, so only the fields that are read get parsed
 
             Returns:
-                `dict` : the user's venmo information in json
+                `dict` : the user's venmo information in json. If `asRecords` is set, the `UserRecord` or None if the user was not found
         """
 
         try:
 
             userID = int(userID)
 
-            response = self.session.get(self.endpoints["base"] + self.endpoints["userLookup"].format(userID), headers = self.defaultHeaders)
+            responseJson = self.__getJson("userLookup", (userID,), deadline = deadline, lazy = lazy)
+
+            self.identityCache.addUser(responseJson.get("data"))
 
-            return json.loads(response.text)
+            if (asRecords):
+                return VenmoRecords.UserRecord.fromJson(responseJson["data"]) if isinstance(responseJson.get("data"), (dict, VenmoLazyView.LazyView)) else None
+
+            return responseJson
 
         except ValueError as e:
 
-            print("Not a valid number.")
-            return {}
+            self.events.emit(VenmoEvents.USER_LOOKUP, "Not a valid number.", VenmoEvents.WARNING, endpoint = "userLookup", outcome = "invalidID")
+            return None if asRecords else {}
         
-    def getUserInformationByUsername(self, username ) -> dict:
+    def getUserInformationByUsername(self, username, asRecords = False, deadline = None, lazy = False) -> dict:
         """
             Brief:
-                Gets a user's venmo information by venmo username
+                Gets a user's venmo information by venmo username. The user is taken from the username search results, so it costs a single request
 
             Args:
                 @param `username : str`
                         -the desired user's venmo username
+                @param `asRecords : bool = False`
+                        -return a compact `VenmoRecords.UserRecord` instead of the response json
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
+                @param `lazy : bool = False`
+                        -ignored, the user comes out of the search results already parsed. Kept so the method takes the same arguments as `getUserInformationByID`
 
             Returns:
-                `dict` : the user's venmo information in json
+                `dict` : the user's venmo information in json as `{"data" : user}`, or an error json if the user was not found. If `asRecords` is set, the `UserRecord` or None if the user was not found
         """
 
-        userId = self.getUserIDByUsername(username)
+        user = self.__searchUser(username, deadline)
 
-        return self.getUserInformationByID(userId)
+        if (user is None):
+            return None if asRecords else {"error" : {"code" : 283, "message" : "Could not find a user with the username " + str(username) + "."}}
+
+        if (asRecords):
+            return VenmoRecords.UserRecord.fromJson(user)
+
+        return {"data" : user}
 
     
     def authenticated(self) -> bool:
         """
             Brief:
-                Tells you if the current instance of the toolbox has an oauth2 token. Doesn't check the validity of the token. If the token is set via direct access to the self.bearerToken variable it could be a non valid token but this would still return true.
+                Tells you if the current instance of the toolbox has a usable oauth2 token: one that the api has not rejected without a successful re-login and that has not expired. If the token is set via direct access to the self.bearerToken variable its validity is unknown and this returns true.
 
             Returns:
-                `bool` : Does the current instance have an oauth2 token
+                `bool` : Does the current instance have a usable oauth2 token
         """
-        if (self.bearerToken != ""):
-            return True
-        else:
+        if (self.bearerToken == ""):
             return False
 
-    def getPaymentMethods(self) -> dict:
+        if (self.bearerToken != self.tokens.token):
+            return True
+
+        return self.tokens.valid()
+
+
+    def reauthenticate(self, deadline = None) -> bool:
+        """
+            Brief:
+                Logs in again with the credentials of the last login and switches every following request to the new token. Concurrent calls, and requests that get a 401 at the same time, share one login. Accounts that need a 2FA code on every login cannot be re-authenticated this way.
+
+            Args:
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -longest time in seconds to wait for the login
+
+            Returns:
+                `bool` : whether there is a new token
+        """
+
+        return self.tokens.refresh(timeout = VenmoDeadline.Deadline.of(deadline).remaining())
+
+
+    def getTokenStats(self) -> dict:
+        """
+            Brief:
+                Returns the state of the oauth token and how often it had to be renewed.
+
+            Returns:
+                `dict` : the stats returned by `VenmoAuth.TokenManager.stats()`
+        """
+
+        return self.tokens.stats()
+
+
+    def __relogin(self) -> str:
+
+        if (self.__credentials is None):
+            return ""
+
+        loginHeaders = self.defaultHeaders.copy()
+        loginHeaders.pop("Authorization")
+
+        responseJson = self.transport.decode(self.__send("oauth", headers = loginHeaders, body = self.__credentials, reauthenticate = False))
+
+        if (responseJson.get("error", "") != "" or not responseJson.get("access_token")):
+            return ""
+
+        self.loginJson = responseJson
+        self.bearerToken = responseJson["access_token"]
+        self.tokens.set(self.bearerToken, responseJson.get("expires_in"))
+        self.updateDefaultHeaders()
+
+        return self.bearerToken
+
+    def getPaymentMethods(self, asRecords = False, deadline = None) -> dict:
         """
             Brief:
                 Get the available payment menthods currently on the authenticated user's account.
 
+            Args:
+                @param `asRecords : bool = False`
+                        -return a list of compact `VenmoRecords.PaymentMethodRecord` instead of the response json
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
+
             Returns:
-                `dict` : json containing payment method information
+                `dict` : json containing payment method information. If `asRecords` is set, the list of `PaymentMethodRecord`
         """ 
         
-        response = self.session.get(self.endpoints["base"] + self.endpoints["paymentMethods"], headers = self.defaultHeaders)
+        responseJson = self.__getJson("paymentMethods", deadline = deadline)
 
-        return json.loads(response.text)
+        if (asRecords):
+            return VenmoRecords.PaymentMethodRecord.fromResponse(responseJson)
+
+        return responseJson
 
 
     def getBalance(self) -> float:
@@ -429,40 +595,117 @@ class VenmoToolbox():
         return self.loginJson["balance"]
             
         
-    def getFriends(self) -> dict:
+    def getFriends(self, asRecords = False, deadline = None, lazy = False) -> dict:
         """
             Brief:
                 Gets the authenticated user's friend list
 
+            Args:
+                @param `asRecords : bool = False`
+                        -return a list of compact `VenmoRecords.FriendRecord` instead of the response json
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
+                @param `lazy : bool = False`
+                        -return a `VenmoLazyView.LazyView` over the raw response instead of the decoded json. Iterating its `data` parses one friend at a time. The friends are not added to the identity cache
+
             Returns:
-                `dict`: the users friends as json
+                `dict`: the users friends as json. If `asRecords` is set, the list of `FriendRecord`
         """
         
-        response  = self.session.get(self.endpoints["base"] + self.endpoints["friends"].format(self.userid), headers = self.defaultHeaders)
+        return self.getUsersFriends(self.userid, asRecords, deadline, lazy)
+
+
+    def getFriendsDelta(self, deadline = None) -> dict:
+        """
+            Brief:
+                Fetches the authenticated user's friend list and compares it with the snapshot in `friendSnapshots`, which is then replaced by the new one. If the list did not change, the comparison is skipped. A stored snapshot of another account is replaced without being compared.
+
+            Args:
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
+
+            Returns:
+                `dict` : `unchanged`, the friend `count`, the content `hash`, `previousTakenAt` and the `added` and `removed` friends as `{"id", "username"}`. Everyone counts as added on the first call. On an error, the error json
+        """
+
+        responseJson = self.getFriends(deadline = deadline)
 
+        if (responseJson.get("error", "") != "" or not isinstance(responseJson.get("data"), list)):
+            return responseJson
 
-        return json.loads(response.text)
+        return self.friendSnapshots.update(responseJson, self.userid).toJson()
 
 
-    def getUsersFriends(self, userID) -> dict:
+    def getFriendsSnapshot(self) -> dict:
+        """
+            Brief:
+                Returns the latest snapshot of the authenticated user's friend list without fetching anything.
+
+            Returns:
+                `dict` : `userID`, `takenAt`, `hash` and `friends` (username by id). Empty if no snapshot of this account was taken yet
+        """
+
+        snapshot = self.friendSnapshots.latest(self.userid)
+
+        return snapshot.toJson() if snapshot is not None else {}
+
+
+    def getUsersFriends(self, userID, asRecords = False, deadline = None, lazy = False) -> dict:
         """
             Brief:
                 Gets a user's friend list
 
+            Args:
+                @param `userID : int`
+                        -a venmo id
+                @param `asRecords : bool = False`
+                        -return a list of compact `VenmoRecords.FriendRecord` instead of the response json
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
+                @param `lazy : bool = False`
+                        -return a `VenmoLazyView.LazyView` over the raw response instead of the decoded json. Iterating its `data` parses one friend at a time. The friends are not added to the identity cache
+
             Returns:
-                `dict`: the users friends as json
+                `dict`: the users friends as json. If `asRecords` is set, the list of `FriendRecord`
         """
-        response  = self.session.get(self.endpoints["base"] + self.endpoints["friends"].format(userID), headers = self.defaultHeaders)
+        responseJson = self.__getJson("friends", (userID,), deadline = deadline, lazy = lazy)
 
+        if (not lazy):
+            self.__cacheUsers(responseJson)
 
-        return json.loads(response.text)
+        if (asRecords):
+            return VenmoRecords.FriendRecord.fromResponse(responseJson)
 
+        return responseJson
 
 
-    def sendMoneyByUsername(self, amount, username , paymentID, msg, audienceVisibility = 0 ) -> bool:
+    def getActivityFeed(self, limit = 50, beforeID = None, deadline = None, lazy = False) -> dict:
         """
             Brief:
-                Creates a transaction to send money to a user via venmo username
+                Gets the authenticated user's activity feed: payments and requests the user sent or received, newest first. Repeated calls are revalidated with a conditional GET, so polling an unchanged feed costs no download.
+
+            Args:
+                @param `limit : int = 50`
+                        -maximum number of stories to return
+                @param `beforeID : str = None`
+                        -only return stories older than this story id, used to page back through the feed
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
+                @param `lazy : bool = False`
+                        -return a `VenmoLazyView.LazyView` over the raw response instead of the decoded json, so only the fields that are read get parsed
+
+            Returns:
+                `dict` : the feed as json, the stories are in `data`
+        """
+
+        return self.__getJson("activity", (self.userid,), deadline = deadline, lazy = lazy, params = {"limit" : limit, "before_id" : beforeID})
+
+
+
+    def sendMoneyByUsername(self, amount, username , paymentID, msg, audienceVisibility = 0, deadline = None) -> bool:
+        """
+            Brief:
+                Creates a transaction to send money to a user via venmo username. Usernames already in the identity cache are not looked up again
 
             Args:
                 @param `amount : float`
@@ -475,20 +718,24 @@ class VenmoToolbox():
                         -A required msg to display with the transaction
                 @param `audienceVisibility : int = 0`
                         -Dictates the visibility of the transactions. 0 -> private, 1 -> friends only, 2 -> public
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
 
             Returns:    
                 `bool` : Whether the transaction was successful or not
         """
 
 
-        return self.sendMoneyByUserID(amount, self.getUserIDByUsername(username), paymentID, msg,  audienceVisibility)
+        deadline = VenmoDeadline.Deadline.of(deadline)
+
+        return self.sendMoneyByUserID(amount, self.__resolveUserID(username, deadline), paymentID, msg,  audienceVisibility, deadline)
 
         
 
-    def requestMoneyByUsername(self, amount, username ,  msg, audienceVisibility = 0 ) -> bool:
+    def requestMoneyByUsername(self, amount, username ,  msg, audienceVisibility = 0, deadline = None) -> bool:
         """
             Brief:
-                Creates a transaction to request money to a user via venmo username
+                Creates a transaction to request money to a user via venmo username. Usernames already in the identity cache are not looked up again
 
             Args:
                 @param `amount : float`
@@ -499,13 +746,17 @@ class VenmoToolbox():
                         -A msg to display with the transaction
                 @param `audienceVisibility : int = 0`
                         -Dictates the visibility of the transactions. 0 -> private, 1 -> friends only, 2 -> public
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
 
             Returns:    
                 `bool` : Whether the transaction was successful or not
         """
-        return self.requestMoneyByUserID(amount, self.getUserIDByUsername(username), msg, audienceVisibility)
+        deadline = VenmoDeadline.Deadline.of(deadline)
 
-    def sendMoneyByUserID(self, amount, userID , paymentID, msg, audienceVisibility = 0 ) -> bool:
+        return self.requestMoneyByUserID(amount, self.__resolveUserID(username, deadline), msg, audienceVisibility, deadline)
+
+    def sendMoneyByUserID(self, amount, userID , paymentID, msg, audienceVisibility = 0, deadline = None) -> bool:
         """
             Brief:
                 Creates a transaction to send money to a user via venmo id
@@ -521,6 +772,8 @@ class VenmoToolbox():
                         -A required msg to display with the transaction
                 @param `audienceVisibility : int = 0`
                         -Dictates the visibility of the transactions. 0 -> private, 1 -> friends only, 2 -> public
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
 
             Returns:    
                 `bool` : Whether the transaction was successful or not
@@ -541,23 +794,25 @@ class VenmoToolbox():
         elif (audienceVisibility == 2):
             data.update({"audience": "public"})
         else:
-            print("Invalid visibility level.")
+            self.events.emit(VenmoEvents.PAYMENT, "Invalid visibility level.", VenmoEvents.WARNING, endpoint = "pay", userID = userID, outcome = "invalidAudience")
             return False
 
-        dataJson = json.loads(json.dumps(data))
+        start = time.perf_counter()
 
-        response = self.session.post(self.endpoints["base"] + self.endpoints["pay"], headers = self.defaultHeaders, json = dataJson)
+        response = self.__send("pay", body = data, deadline = deadline)
 
 
-        responseJson = json.loads(response.text)
+        responseJson = self.transport.decode(response)
 
         if (responseJson.get("error", "" ) != ""):
-            print("Error sending transaction. ")
+            self.events.emit(VenmoEvents.PAYMENT, "Error sending transaction.", VenmoEvents.ERROR, endpoint = "pay", userID = userID, outcome = "failed", latency = time.perf_counter() - start, amount = str(amount), code = self.__errorCode(responseJson))
             return False
 
+        self.events.emit(VenmoEvents.PAYMENT, "Sent " + str(amount) + " to " + str(userID) + ".", endpoint = "pay", userID = userID, outcome = "sent", latency = time.perf_counter() - start, amount = str(amount))
+
         return True
 
-    def requestMoneyByUserID(self, amount, userID ,msg,  audienceVisibility = 0 ) -> bool:
+    def requestMoneyByUserID(self, amount, userID ,msg,  audienceVisibility = 0, deadline = None) -> bool:
         """
             Brief:
                 Creates a transaction to request money to a user via venmo id
@@ -571,6 +826,8 @@ class VenmoToolbox():
                         -A required msg to display with the transaction
                 @param `audienceVisibility : int = 0`
                         -Dictates the visibility of the transactions. 0 -> private, 1 -> friends only, 2 -> public
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
 
             Returns:    
                 `bool` : Whether the transaction was successful or not
@@ -589,22 +846,24 @@ class VenmoToolbox():
         elif (audienceVisibility == 2):
             data.update({"audience": "public"})
         else:
-            print("Invalid visibility level.")
+            self.events.emit(VenmoEvents.PAYMENT, "Invalid visibility level.", VenmoEvents.WARNING, endpoint = "pay", userID = userID, outcome = "invalidAudience")
             return False
 
-        dataJson = json.loads(json.dumps(data))
+        start = time.perf_counter()
 
-        response = self.session.post(self.endpoints["base"] + self.endpoints["pay"], headers = self.defaultHeaders, json = dataJson)
+        response = self.__send("pay", body = data, deadline = deadline)
 
-        responseJson = json.loads(response.text)
+        responseJson = self.transport.decode(response)
 
         if (responseJson.get("error", "" ) != ""):
-            print("Error sending transaction. ")
+            self.events.emit(VenmoEvents.PAYMENT, "Error sending transaction.", VenmoEvents.ERROR, endpoint = "pay", userID = userID, outcome = "failed", latency = time.perf_counter() - start, amount = str(-amount), code = self.__errorCode(responseJson))
             return False
 
+        self.events.emit(VenmoEvents.PAYMENT, "Requested " + str(amount) + " from " + str(userID) + ".", endpoint = "pay", userID = userID, outcome = "requested", latency = time.perf_counter() - start, amount = str(-amount))
+
         return True
 
-    def getUserIDByUsername(self,username ) -> int:
+    def getUserIDByUsername(self,username, deadline = None) -> int:
         """
             Brief:
                 Gets a user's venmo id by venmo username
@@ -612,27 +871,351 @@ class VenmoToolbox():
             Args:
                 @param `username : str  
                         -a venmo username
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
 
             Returns:
                 `int` : the user id corresponding the the passed username if its a valid username, otherwise -1
         """
 
-        requestDataJson = json.loads("{{\"query\": \"{a1}\", \"limit\":\"50\",\"offset\": \"0\", \"type\":\"username\"}}".format(a1 = username))
+        user = self.__searchUser(username, deadline)
 
-        response = self.session.get(self.endpoints["base"] + self.endpoints["usersLookup"], headers = self.defaultHeaders, json=requestDataJson)
+        if (user is None):
+            return -1
 
-        responseJson = json.loads(response.text)
+        return int(user["id"])
 
 
-        for user in responseJson["data"]:
-            if (user["username"].lower() == username.lower()):
-                return int(user["id"])
-                
+    def __searchUser(self, username, deadline = None) -> dict:
+
+        requestDataJson = {"query" : username, "limit" : "50", "offset" : "0", "type" : "username"}
+
+        responseJson = self.__getJson("usersLookup", body = requestDataJson, deadline = deadline, lazy = True)
+
+        for user in responseJson.get("data", []):
+
+            self.identityCache.addUser(user)
+
+            if (user["username"].lower() == str(username).lower()):
+                return user
+
+        return None
+
+
+    def searchUsers(self, query, limit = 50, deadline = None) -> list:
+        """
+            Brief:
+                Searches the venmo directory for users whose username starts with a query, ex to suggest matches while a username is typed. Every user found is added to the identity cache.
+
+            Args:
+                @param `query : str`
+                        -the start of a username
+                @param `limit : int = 50`
+                        -maximum number of users to return
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
+
+            Returns:
+                `list` : the matching users as json, empty if there are none. None if the api answered with an error, so a failed search is not mistaken for one without matches
+        """
+
+        requestDataJson = {"query" : query, "limit" : str(limit), "offset" : "0", "type" : "username"}
 
-        return -1
+        responseJson = self.__getJson("usersLookup", body = requestDataJson, deadline = deadline)
+        users = responseJson.get("data")
+
+        if (not isinstance(users, list)):
+            return None
+
+        self.__cacheUsers(responseJson)
+
+        return users
+
+
+    def __resolveUserID(self, username, deadline = None) -> int:
+
+        userID = self.identityCache.getUserID(username)
+
+        if (userID == -1):
+            userID = self.getUserIDByUsername(username, deadline)
+
+        return userID
+
+
+    def resolveUsernames(self, usernames, maxConcurrency = None, deadline = None) -> dict:
+        """
+            Brief:
+                Resolves many venmo usernames to venmo ids at once. Duplicate usernames are only looked up once, usernames already in the identity cache are served from it, and the remaining lookups are sent concurrently.
+
+            Args:
+                @param `usernames : list`
+                        -the venmo usernames to resolve
+                @param `maxConcurrency : int = None`
+                        -upper bound on the lookups in flight at once, the adaptive limiter of the transport may allow fewer. Defaults to self.maxConcurrency
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
+
+            Returns:
+                `dict` : `{"resolved" : {username : id}, "unresolved" : [username]}`
+        """
+
+        deadline = VenmoDeadline.Deadline.of(deadline)
+        resolved = {}
+        pending = []
+        seen = set()
+
+        for username in usernames:
+
+            username = str(username).strip()
+
+            if (username == "" or username.lower() in seen):
+                continue
+
+            seen.add(username.lower())
+
+            userID = self.identityCache.getUserID(username)
+
+            if (userID != -1):
+                resolved[username] = userID
+            else:
+                pending.append(username)
+
+        unresolved = []
+
+        for username, userID in self.__runConcurrently(lambda username : self.getUserIDByUsername(username, deadline), pending, maxConcurrency):
+
+            if (userID is None or userID == -1):
+                unresolved.append(username)
+            else:
+                resolved[username] = userID
+
+        return {"resolved" : resolved, "unresolved" : unresolved}
+
+
+    def resolveUserIDs(self, userIDs, maxConcurrency = None, deadline = None) -> dict:
+        """
+            Brief:
+                Resolves many venmo ids to venmo usernames at once. Duplicate ids are only looked up once, ids already in the identity cache are served from it, and the remaining lookups are sent concurrently.
+
+            Args:
+                @param `userIDs : list`
+                        -the venmo ids to resolve
+                @param `maxConcurrency : int = None`
+                        -upper bound on the lookups in flight at once, the adaptive limiter of the transport may allow fewer. Defaults to self.maxConcurrency
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
+
+            Returns:
+                `dict` : `{"resolved" : {id : username}, "unresolved" : [id]}`
+        """
+
+        deadline = VenmoDeadline.Deadline.of(deadline)
+        resolved = {}
+        pending = []
+        unresolved = []
+        seen = set()
+
+        for userID in userIDs:
+
+            try:
+                userID = int(userID)
+            except (TypeError, ValueError):
+                unresolved.append(userID)
+                continue
+
+            if (userID in seen):
+                continue
+
+            seen.add(userID)
+
+            username = self.identityCache.getUsername(userID)
+
+            if (username != ""):
+                resolved[userID] = username
+            else:
+                pending.append(userID)
+
+        for userID, username in self.__runConcurrently(lambda userID : self.getUsernameByUserID(userID, deadline), pending, maxConcurrency):
+
+            if (not username):
+                unresolved.append(userID)
+            else:
+                resolved[userID] = username
+
+        return {"resolved" : resolved, "unresolved" : unresolved}
+
+
+    @contextmanager
+    def priority(self, priority):
+        """
+            Brief:
+                Sends every request the calling thread makes inside the `with` block with the given priority class, including the concurrent requests of bulk methods. Outside of one, payments are sent as `VenmoScheduler.PAYMENTS` and everything else as `VenmoScheduler.INTERACTIVE`.
+
+                ex: `with toolbox.priority(VenmoScheduler.BACKGROUND): toolbox.resolveUsernames(usernames)`
+
+            Args:
+                @param `priority : str`
+                        -`VenmoScheduler.INTERACTIVE`, `VenmoScheduler.PAYMENTS` or `VenmoScheduler.BACKGROUND`
+        """
+
+        previous = getattr(self.__callPriority, "value", None)
+        self.__callPriority.value = priority
+
+        try:
+            yield
+        finally:
+            self.__callPriority.value = previous
+
+
+    def __priority(self, endpoint) -> str:
+
+        priority = getattr(self.__callPriority, "value", None)
+
+        if (priority is not None):
+            return priority
+
+        return endpoint.priority
+
+
+    def __runConcurrently(self, function, items, maxConcurrency = None) -> list:
+
+        if (not items):
+            return []
+
+        if (maxConcurrency is None):
+            maxConcurrency = self.maxConcurrency
+
+        priority = getattr(self.__callPriority, "value", None)
+
+        def call(item):
+            self.__callPriority.value = priority
+            try:
+                return item, function(item)
+            except Exception:
+                return item, None
+
+        with ThreadPoolExecutor(max_workers = max(1, min(maxConcurrency, len(items)))) as executor:
+            return list(executor.map(call, items))
+
+
+    def getSingleFlightStats(self) -> dict:
+        """
+            Brief:
+                Returns how many GET requests were coalesced by the single flight layer.
+
+            Returns:
+                `dict` : `requested`, `executed`, `coalesced` and `inFlight` request counts
+        """
+
+        return self.singleFlight.stats()
+
+
+    def getTransportStats(self) -> dict:
+        """
+            Brief:
+                Returns the transport counters, ex how many conditional GETs were answered with `304 Not Modified` and how many bytes and json decodes that saved.
+
+            Returns:
+                `dict` : the counters returned by `VenmoTransport.Transport.stats()`
+        """
+
+        return self.transport.stats()
+
+
+    def getCircuitStates(self) -> dict:
+        """
+            Brief:
+                Returns the state of the circuit breaker of every endpoint class that has been used.
+
+            Returns:
+                `dict` : `state` (`closed`, `open` or `half_open`), `calls`, `failureRate`, `slowCallRate`, `rejected` and `retryAfter` by endpoint class
+        """
+
+        return self.circuitBreakers.states()
+
+
+    def getConcurrencyStats(self) -> dict:
+        """
+            Brief:
+                Returns the state of the adaptive concurrency limiter, ex to export the limit it settled on as a metric.
+
+            Returns:
+                `dict` : the stats returned by `VenmoConcurrencyLimiter.AdaptiveLimiter.stats()` plus the per priority class `queues` of the scheduler, empty if the transport has no limiter
+        """
+
+        if (self.transport.limiter is None):
+            return {}
+
+        result = self.transport.limiter.stats()
+        result["queues"] = self.transport.scheduler.stats()
+
+        return result
+
+
+    def __send(self, name, args = (), headers = None, body = None, deadline = None, params = None, reauthenticate = True):
+
+        endpoint = self.endpointRegistry[name]
+        deadline = VenmoDeadline.Deadline.of(deadline)
+        timeout = deadline.timeout(endpoint.timeout if endpoint.timeout is not None else self.timeout, endpoint.method + " " + name)
+        url = endpoint.url(self.endpoints["base"], *args, params = params)
+
+        return self.__traced(name, lambda : self.transport.request(endpoint.method, url, headers if headers is not None else self.defaultHeaders, body, timeout, self.circuitBreakers.get(endpoint.rateClass), self.__priority(endpoint), endpoint.retries, deadline, self.tokens if reauthenticate else None, endpoint.safe))
+
+
+    def __getJson(self, name, args = (), body = None, deadline = None, lazy = False, params = None) -> dict:
+
+        endpoint = self.endpointRegistry[name]
+        deadline = VenmoDeadline.Deadline.of(deadline)
+        timeout = deadline.timeout(endpoint.timeout if endpoint.timeout is not None else self.timeout, "GET " + name)
+        url = endpoint.url(self.endpoints["base"], *args, params = params)
+
+        key = ("GET", url, self.transport.codec.dumps(body, True) if body is not None else None, lazy)
+        breaker = self.circuitBreakers.get(endpoint.rateClass)
+        priority = self.__priority(endpoint)
+
+        try:
+            return self.__traced(name, lambda : self.singleFlight.do(key, lambda : self.transport.getJson(url, self.defaultHeaders, body, endpoint.conditional, timeout, breaker, priority, lazy, endpoint.cacheTTL, endpoint.retries, deadline, self.tokens), deadline.remaining()))
+        except VenmoSingleFlight.WaitTimeoutError:
+            raise VenmoDeadline.DeadlineExceededError(deadline.remaining(), "GET " + name)
+
+
+    def __traced(self, name, call):
+
+        if (not self.events.enabled(VenmoEvents.DEBUG)):
+            return call()
+
+        start = time.perf_counter()
+
+        try:
+            result = call()
+        except Exception as e:
+            self.events.emit(VenmoEvents.REQUEST, level = VenmoEvents.DEBUG, endpoint = name, outcome = type(e).__name__, latency = time.perf_counter() - start)
+            raise
+
+        status = getattr(result, "status_code", None)
+
+        self.events.emit(VenmoEvents.REQUEST, level = VenmoEvents.DEBUG, endpoint = name, outcome = "ok" if status is None or status < 400 else "error", latency = time.perf_counter() - start, status = status)
+
+        return result
+
+
+    def __errorCode(self, responseJson):
+
+        error = responseJson.get("error")
+
+        return error.get("code") if isinstance(error, dict) else None
+
+
+    def __cacheUsers(self, responseJson) -> None:
+
+        if (not isinstance(responseJson, dict) or not isinstance(responseJson.get("data"), list)):
+            return
+
+        for user in responseJson["data"]:
+            self.identityCache.addUser(user)
 
     
-    def getUsernameByUserID(self, userID) -> str:
+    def getUsernameByUserID(self, userID, deadline = None) -> str:
         """
             Brief:
                 gets a user's venmo username by venmo id
@@ -640,12 +1223,14 @@ class VenmoToolbox():
             Args:
                 @param `userID : int`
                         -a venmo user id
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
 
             Returns:
                 `str` : the corresponding username if its a valid venmo id, otherwise reuturs \"\"
         """
 
-        userInfo = self.getUserInformationByID(userID)
+        userInfo = self.getUserInformationByID(userID, deadline = deadline)
 
 
         if (userInfo.get("data", "")  != ""):
@@ -654,7 +1239,7 @@ class VenmoToolbox():
         return ""
 
 
-    def sendFriendRequestByUsername(self, username) -> bool:
+    def sendFriendRequestByUsername(self, username, deadline = None) -> bool:
         """
             Brief:  
                 Sends a friend request to a user via username
@@ -662,51 +1247,71 @@ class VenmoToolbox():
             Args:
                 @param `username : str`
                         -a venmo username
-            
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
+
             Returns:
                 `bool` : when the friend request was sent or not
         """
 
-        userID = self.getUserIDByUsername(username)
+        deadline = VenmoDeadline.Deadline.of(deadline)
+
+        userID = self.__resolveUserID(username, deadline)
 
         if (userID == -1):
-            print("User not found.")
+            self.events.emit(VenmoEvents.FRIEND_REQUEST, "User not found.", VenmoEvents.WARNING, endpoint = "friendRequest", outcome = "notFound", username = username)
             return False
 
-        return self.sendFriendRequestByUserID(userID)
+        return self.__sendFriendRequest(userID, self.identityCache.getUsername(userID) or username, deadline)
 
-    def sendFriendRequestByUserID(self, userID) -> bool:
+    def sendFriendRequestByUserID(self, userID, deadline = None) -> bool:
         """
             Brief:  
-                Sends a friend request to a user via venmo id
+                Sends a friend request to a user via venmo id. The user is looked up once to check it exists, unless its username is already in the identity cache
 
             Args:
                 @param `userID : int`
                         -a venmo id
-            
+                @param `deadline : float | VenmoDeadline.Deadline = None`
+                        -overall time budget in seconds shared by every request the call makes. Raises `VenmoDeadline.DeadlineExceededError` when too little is left for the next request
+
             Returns:
                 `bool` : when the friend request was sent or not
         """
 
-        if (self.getUsernameByUserID(userID) == ""):
-            print("User not found.")
+        deadline = VenmoDeadline.Deadline.of(deadline)
+
+        username = self.identityCache.getUsername(userID)
+
+        if (username == ""):
+            username = self.getUsernameByUserID(userID, deadline)
+
+        if (username == ""):
+            self.events.emit(VenmoEvents.FRIEND_REQUEST, "User not found.", VenmoEvents.WARNING, endpoint = "friendRequest", userID = userID, outcome = "notFound")
             return False
 
-        body = json.loads("{{\"user_id\" : \"{a1}\"}}".format(a1 = userID))
-        
-        response = self.session.post(self.endpoints["base"] + self.endpoints["friendRequest"], headers = self.defaultHeaders, json = body)
+        return self.__sendFriendRequest(userID, username, deadline)
+
+
+    def __sendFriendRequest(self, userID, username, deadline = None) -> bool:
+
+        body = {"user_id" : str(userID)}
+
+        start = time.perf_counter()
+
+        response = self.__send("friendRequest", body = body, deadline = deadline)
 
-        responseJson = json.loads(response.text)
+        responseJson = self.transport.decode(response)
 
         if (responseJson.get("error", "") != ""):
             if (responseJson["error"]["code"] == 2208 ):
-                print("Already a pending friend request")
+                self.events.emit(VenmoEvents.FRIEND_REQUEST, "Already a pending friend request", VenmoEvents.WARNING, endpoint = "friendRequest", userID = userID, outcome = "pending", latency = time.perf_counter() - start, username = username)
                 return False
             else:
-                print("Unknown error. Code", response["error"]["code"])
+                self.events.emit(VenmoEvents.FRIEND_REQUEST, "Unknown error. Code " + str(responseJson["error"]["code"]), VenmoEvents.ERROR, endpoint = "friendRequest", userID = userID, outcome = "error", latency = time.perf_counter() - start, username = username, code = responseJson["error"]["code"])
 
         if (responseJson.get("data", "") != ""):
-            print("Friend request successfully sent to " + self.getUsernameByUserID(userID) + ".")
+            self.events.emit(VenmoEvents.FRIEND_REQUEST, "Friend request successfully sent to " + username + ".", endpoint = "friendRequest", userID = userID, outcome = "sent", latency = time.perf_counter() - start, username = username)
         
 
         return True
@@ -0,0 +1,468 @@
+import time
+import threading
+from collections import OrderedDict
+
+import VenmoCodec
+import VenmoLazyView
+import VenmoConcurrencyLimiter
+import VenmoScheduler
+import VenmoCircuitBreaker
+
+
+class CacheEntry():
+    """
+        Brief:
+            A cached response. Holds the validators the server sent with it, the already parsed body and the `time.monotonic()` time it was stored or last revalidated.
+    """
+
+    __slots__ = ("etag", "lastModified", "parsed", "size", "storedAt")
+
+    def __init__(self, etag, lastModified, parsed, size, storedAt = None):
+        self.etag = etag
+        self.lastModified = lastModified
+        self.parsed = parsed
+        self.size = size
+        self.storedAt = storedAt if storedAt is not None else time.monotonic()
+
+
+
+class ResponseCache():
+    """
+        Brief:
+            Memory bounded, least recently used store of parsed responses and their `ETag`/`Last-Modified` validators. Used to send conditional GETs and to serve responses that are still fresh.
+
+        Instance Variables:
+            @var `maxBytes : int`
+                    -maximum total size of the cached response bodies, measured in raw body bytes
+    """
+
+    def __init__(self, maxBytes = 8 * 1024 * 1024):
+        """
+            Args:
+                @param `maxBytes : int = 8MiB`
+                        -maximum total size of the cached response bodies
+        """
+
+        self.maxBytes = maxBytes
+        self.__entries = OrderedDict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+
+
+    def get(self, key) -> CacheEntry:
+        """
+            Brief:
+                Looks up a cached response.
+
+            Args:
+                @param `key : hashable`
+                        -the cache key of the request
+
+            Returns:
+                `CacheEntry` : the cached entry, otherwise None
+        """
+
+        with self.__lock:
+
+            entry = self.__entries.get(key)
+
+            if (entry is not None):
+                self.__entries.move_to_end(key)
+
+            return entry
+
+
+    def put(self, key, entry) -> None:
+        """
+            Brief:
+                Stores a response, evicting the least recently used entries until the cache fits in `maxBytes`. Entries larger than the whole cache are not stored.
+
+            Args:
+                @param `key : hashable`
+                        -the cache key of the request
+                @param `entry : CacheEntry`
+                        -the response to store
+
+            Returns:
+                `None`
+        """
+
+        with self.__lock:
+
+            old = self.__entries.pop(key, None)
+            if (old is not None):
+                self.__size -= old.size
+
+            if (entry.size > self.maxBytes):
+                return
+
+            self.__entries[key] = entry
+            self.__size += entry.size
+
+            while (self.__size > self.maxBytes):
+                evictedKey, evicted = self.__entries.popitem(last = False)
+                self.__size -= evicted.size
+
+
+    def clear(self) -> None:
+        """
+            Brief:
+                Removes every cached response.
+
+            Returns:
+                `None`
+        """
+
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+
+    def stats(self) -> dict:
+        """
+            Returns:
+                `dict` : number of `entries` and their total size in `bytes`
+        """
+
+        with self.__lock:
+            return {"entries" : len(self.__entries), "bytes" : self.__size}
+
+
+
+class Transport():
+    """
+        Brief:
+            Sends the toolbox's http requests over a `requests.Session` and encodes and decodes the json bodies with `codec`, straight from and to bytes. GETs that opt in are sent as conditional requests, a `304 Not Modified` reuses the already parsed body without decoding it again.
+
+        Instance Variables:
+            @var `session : requests.Session`
+                    -session the requests are sent over
+            @var `responseCache : ResponseCache`
+                    -validators and parsed bodies of conditional GETs
+            @var `limiter : VenmoConcurrencyLimiter.AdaptiveLimiter`
+                    -bounds the number of requests in flight at once, None for no bound
+            @var `scheduler : VenmoScheduler.RequestScheduler`
+                    -grants the slots of `limiter` to waiting requests by priority class
+            @var `codec : VenmoCodec.StdlibCodec | VenmoCodec.OrjsonCodec`
+                    -json codec for request and response bodies
+            @var `retryBackoff : float`
+                    -seconds to wait before the first retry of a failed request, doubled on every further retry
+            @var `maxRetryWait : float`
+                    -longest wait before a retry, including waits asked for by `Retry-After`
+    """
+
+    def __init__(self, session, responseCache = None, limiter = None, scheduler = None, codec = None):
+        """
+            Args:
+                @param `session : requests.Session`
+                        -session to send requests over
+                @param `responseCache : ResponseCache = None`
+                        -store for conditional GETs. A new 8MiB cache is made if None
+                @param `limiter : VenmoConcurrencyLimiter.AdaptiveLimiter = None`
+                        -adaptive bound on the requests in flight at once. None sends every request right away
+                @param `scheduler : VenmoScheduler.RequestScheduler = None`
+                        -priority scheduler over `limiter`. One with the default weights is made if None and there is a limiter
+                @param `codec : VenmoCodec.StdlibCodec | VenmoCodec.OrjsonCodec = None`
+                        -json codec. The fastest installed one is used if None
+        """
+
+        self.session = session
+        self.responseCache = responseCache if responseCache is not None else ResponseCache()
+        self.limiter = limiter
+        self.scheduler = scheduler if scheduler is not None or limiter is None else VenmoScheduler.RequestScheduler(limiter)
+        self.codec = codec if codec is not None else VenmoCodec.getCodec()
+        self.__lock = threading.Lock()
+        self.retryBackoff = 0.1
+        self.maxRetryWait = 2.0
+        self.__counters = {"requests" : 0, "bytesReceived" : 0, "decodes" : 0, "lazyViews" : 0, "notModified" : 0, "fresh" : 0, "retries" : 0}
+
+
+    def request(self, method, url, headers, body = None, timeout = None, breaker = None, priority = VenmoScheduler.INTERACTIVE, retries = 0, deadline = None, auth = None, replay = False):
+        """
+            Brief:
+                Sends a request and returns the raw response. If a circuit breaker is passed, the request is refused with `CircuitOpenError` while its circuit is open, before it waits for a concurrency slot, and the outcome is recorded on it. Connection errors, timeouts, 5xx and 429 responses count as failures, and are retried up to `retries` times with exponential backoff, or after the `Retry-After` of a 429. With a token manager, a 401 renews the token once and, if `replay` is set, sends the request again with the new token. With a `limiter`, the request first waits up to `timeout` seconds for the `scheduler` to grant it a slot and its outcome adjusts the limit.
+
+            Args:
+                @param `method : str`
+                        -http method
+                @param `url : str`
+                        -the full request url
+                @param `headers : dict`
+                        -request headers
+                @param `body : dict = None`
+                        -json body, encoded with `codec`
+                @param `timeout : float = None`
+                        -seconds to wait for the server
+                @param `breaker : VenmoCircuitBreaker.CircuitBreaker = None`
+                        -circuit breaker of the endpoint class
+                @param `priority : str = VenmoScheduler.INTERACTIVE`
+                        -priority class the scheduler queues the request in
+                @param `retries : int = 0`
+                        -times to send the request again after a failure. Only pass more than 0 for requests that are safe to repeat
+                @param `deadline : VenmoDeadline.Deadline = None`
+                        -overall budget of the call. Retries that would not finish before it are not sent, and each retry's timeout is cut to what is left
+                @param `auth : VenmoAuth.TokenManager = None`
+                        -token manager of the toolbox. Puts the current token in `headers` and renews it on a 401
+                @param `replay : bool = False`
+                        -send the request again after a 401 once the token was renewed. Only pass True for requests that are safe to repeat
+
+            Returns:
+                `requests.Response` : the response of the last attempt
+        """
+
+        data = None
+
+        if (body is not None):
+
+            data = self.codec.dumps(body)
+
+            if ("Content-Type" not in headers):
+                headers = dict(headers)
+                headers["Content-Type"] = "application/json"
+
+        if (auth is not None):
+            auth.beforeRequest(headers)
+            headers = auth.authorize(headers)
+
+        attempt = 0
+        reauthenticated = False
+
+        while (True):
+
+            error = None
+
+            try:
+                response = self.__requestOnce(method, url, headers, data, timeout, breaker, priority)
+            except (VenmoCircuitBreaker.CircuitOpenError, VenmoConcurrencyLimiter.AcquireTimeoutError):
+                raise
+            except Exception as exception:
+                error = exception
+                response = None
+
+            if (response is not None and response.status_code == 401 and auth is not None and not reauthenticated and "Authorization" in headers):
+
+                reauthenticated = True
+
+                if (auth.refresh(headers["Authorization"], timeout) and replay):
+                    auth.countReplay()
+                    headers = auth.authorize(headers)
+                    continue
+
+                return response
+
+            if (response is not None and response.status_code != 429 and response.status_code < 500):
+                return response
+
+            wait = self.retryBackoff * (2 ** attempt)
+
+            if (response is not None and response.status_code == 429):
+                try:
+                    wait = max(wait, float(response.headers.get("Retry-After", 0)))
+                except ValueError:
+                    pass
+
+            wait = min(wait, self.maxRetryWait)
+            remaining = deadline.remaining() if deadline is not None else None
+
+            if (attempt >= retries or (remaining is not None and remaining < wait + deadline.minimumStep)):
+
+                if (error is not None):
+                    raise error
+
+                return response
+
+            attempt += 1
+            self.__count(retries = 1)
+            time.sleep(wait)
+
+            if (deadline is not None):
+                timeout = deadline.timeout(timeout, method + " " + url)
+
+
+    def __requestOnce(self, method, url, headers, data, timeout, breaker, priority):
+
+        probe = breaker.beforeCall() if breaker is not None else False
+        scheduler = self.scheduler
+
+        if (scheduler is not None):
+            try:
+                scheduler.acquire(priority, timeout)
+            except BaseException:
+                if (breaker is not None):
+                    breaker.cancelCall(probe)
+                raise
+
+        outcome = None
+        start = time.monotonic()
+
+        try:
+
+            outcome = VenmoConcurrencyLimiter.DROPPED
+
+            try:
+                response = self.session.request(method, url, headers = headers, data = data, timeout = timeout)
+            except Exception:
+                if (breaker is not None):
+                    breaker.recordFailure(time.monotonic() - start, probe)
+                raise
+
+            if (response.status_code == 429):
+                outcome = VenmoConcurrencyLimiter.THROTTLED
+            elif (response.status_code >= 500):
+                outcome = VenmoConcurrencyLimiter.ERROR
+            else:
+                outcome = VenmoConcurrencyLimiter.SUCCESS
+
+            if (breaker is not None):
+                if (outcome == VenmoConcurrencyLimiter.SUCCESS):
+                    breaker.recordSuccess(time.monotonic() - start, probe)
+                else:
+                    breaker.recordFailure(time.monotonic() - start, probe)
+
+        finally:
+            if (scheduler is not None):
+                scheduler.release(time.monotonic() - start, outcome)
+
+        self.__count(requests = 1, bytesReceived = len(response.content))
+
+        return response
+
+
+    def getJson(self, url, headers, body = None, conditional = False, timeout = None, breaker = None, priority = VenmoScheduler.INTERACTIVE, lazy = False, maxAge = 0.0, retries = 0, deadline = None, auth = None) -> dict:
+        """
+            Brief:
+                Sends a GET and returns the decoded json body. With a `maxAge`, a cached body younger than it is returned without sending anything.
+
+            Args:
+                @param `url : str`
+                        -the full request url
+                @param `headers : dict`
+                        -request headers
+                @param `body : dict = None`
+                        -json body, some venmo GETs take their parameters this way
+                @param `conditional : bool = False`
+                        -send `If-None-Match`/`If-Modified-Since` from a previous response and reuse its parsed body on a 304
+                @param `timeout : float = None`
+                        -seconds to wait for the server
+                @param `breaker : VenmoCircuitBreaker.CircuitBreaker = None`
+                        -circuit breaker of the endpoint class
+                @param `priority : str = VenmoScheduler.INTERACTIVE`
+                        -priority class the scheduler queues the request in
+                @param `lazy : bool = False`
+                        -return a `VenmoLazyView.LazyView` over the raw body instead of decoding it
+                @param `maxAge : float = 0.0`
+                        -seconds a cached body is fresh for. Bodies are cached for this long even if the server sent no validators
+                @param `retries : int = 0`
+                        -times to send the GET again after a failure, see `request`
+                @param `deadline : VenmoDeadline.Deadline = None`
+                        -overall budget of the call, see `request`
+                @param `auth : VenmoAuth.TokenManager = None`
+                        -token manager of the toolbox. A GET that was rejected with a 401 is sent again once the token was renewed
+
+            Returns:
+                `dict` : the decoded json body, or its `LazyView` if `lazy` is set. Bodies reused from the cache are shared, so they should be treated as read only
+        """
+
+        entry = None
+        key = None
+
+        if (conditional or maxAge > 0):
+
+            key = (url, headers.get("Authorization", ""), self.codec.dumps(body, True) if body is not None else None, lazy)
+            entry = self.responseCache.get(key)
+
+            if (entry is not None and time.monotonic() - entry.storedAt < maxAge):
+                self.__count(fresh = 1)
+                return entry.parsed
+
+            if (entry is not None and not conditional):
+                entry = None
+
+            if (entry is not None):
+
+                headers = dict(headers)
+
+                if (entry.etag):
+                    headers["If-None-Match"] = entry.etag
+                if (entry.lastModified):
+                    headers["If-Modified-Since"] = entry.lastModified
+
+        response = self.request("GET", url, headers, body, timeout, breaker, priority, retries, deadline, auth, True)
+
+        if (entry is not None and response.status_code == 304):
+            entry.storedAt = time.monotonic()
+            self.__count(notModified = 1)
+            return entry.parsed
+
+        if (lazy):
+            parsed = VenmoLazyView.LazyView(response.content)
+            self.__count(lazyViews = 1)
+        else:
+            parsed = self.decode(response)
+
+        if (key is not None and response.status_code == 200):
+
+            etag = response.headers.get("ETag", "") if conditional else ""
+            lastModified = response.headers.get("Last-Modified", "") if conditional else ""
+
+            if (etag or lastModified or maxAge > 0):
+                self.responseCache.put(key, CacheEntry(etag, lastModified, parsed, len(response.content)))
+
+        return parsed
+
+
+    def decode(self, response):
+        """
+            Brief:
+                Decodes the json body of a response with `codec`, straight from its bytes.
+
+            Args:
+                @param `response : requests.Response`
+                        -the response
+
+            Returns:
+                `dict | list` : the decoded body
+        """
+
+        parsed = self.codec.loads(response.content)
+        self.__count(decodes = 1)
+
+        return parsed
+
+
+    def stats(self) -> dict:
+        """
+            Brief:
+                Returns transport counters, used to measure bandwidth and decode savings.
+
+            Returns:
+                `dict` : `requests` sent, `bytesReceived` in response bodies, full json `decodes`, `lazyViews` made instead of decoding, `notModified` responses, `fresh` bodies served from the cache without a request, `retries` and the response cache stats
+        """
+
+        with self.__lock:
+            result = dict(self.__counters)
+
+        result["cache"] = self.responseCache.stats()
+
+        return result
+
+
+    def resetStats(self) -> None:
+        """
+            Brief:
+                Resets the transport counters.
+
+            Returns:
+                `None`
+        """
+
+        with self.__lock:
+            for key in self.__counters:
+                self.__counters[key] = 0
+
+
+    def __count(self, **amounts) -> None:
+
+        with self.__lock:
+            for key, amount in amounts.items():
+                self.__counters[key] += amount
@@ -0,0 +1,351 @@
+import sys
+import time
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import VenmoToolbox
+import VenmoScheduler
+import VenmoEvents
+
+
+PAYMENT_RECEIVED = "paymentReceived"
+REQUEST_RECEIVED = "requestReceived"
+PAYMENT_SENT = "paymentSent"
+REQUEST_SENT = "requestSent"
+
+
+def classifyStory(story, userID) -> str:
+    """
+        Brief:
+            Works out what an activity feed story means for the watched account.
+
+        Args:
+            @param `story : dict`
+                    -a story from the activity feed
+            @param `userID : str`
+                    -venmo id of the watched account
+
+        Returns:
+            `str` : `PAYMENT_RECEIVED`, `REQUEST_RECEIVED`, `PAYMENT_SENT`, `REQUEST_SENT`, or "" for stories that are not payments
+    """
+
+    payment = story.get("payment")
+
+    if (not isinstance(payment, dict)):
+        return ""
+
+    actorID = str(payment.get("actor", {}).get("id", ""))
+    charge = payment.get("action") == "charge"
+
+    if (actorID == str(userID)):
+        return REQUEST_SENT if charge else PAYMENT_SENT
+
+    return REQUEST_RECEIVED if charge else PAYMENT_RECEIVED
+
+
+
+class ActivityWatcher():
+    """
+        Brief:
+            Long running watcher that polls the activity feed of a logged in toolbox and hands new stories to registered handlers. The poll interval drops to `minInterval` after new activity or while a backlog is still being read, and grows by `backoff` on every idle poll up to `maxInterval`. Only stories newer than the high water mark are handled, and the number of feed requests per minute is capped. Polls are sent with background priority so they never delay interactive calls on the same toolbox.
+
+        Instance Variables:
+            @var `toolbox : VenmoToolbox.VenmoToolbox`
+                    -the logged in toolbox to poll with
+            @var `highWaterMark : int`
+                    -id of the newest story handled so far. Save it to resume without handling stories twice
+            @var `minInterval : float`
+                    -seconds between polls right after new activity
+            @var `maxInterval : float`
+                    -longest wait between polls while idle
+            @var `backoff : float`
+                    -factor the interval grows by on every idle or failed poll
+            @var `maxRequestsPerMinute : int`
+                    -most feed requests sent in any 60 second window
+            @var `pageSize : int`
+                    -stories requested per page
+    """
+
+    def __init__(self, toolbox, highWaterMark = None, minInterval = 2.0, maxInterval = 60.0, backoff = 2.0, maxRequestsPerMinute = 20, pageSize = 50, workers = 4, clock = time.monotonic):
+        """
+            Args:
+                @param `toolbox : VenmoToolbox.VenmoToolbox`
+                        -the logged in toolbox to poll with
+                @param `highWaterMark : int = None`
+                        -id of the newest story already handled. If None, the stories in the feed at the first poll are skipped and only later ones are handled
+                @param `minInterval : float = 2.0`
+                        -seconds between polls right after new activity
+                @param `maxInterval : float = 60.0`
+                        -longest wait between polls while idle
+                @param `backoff : float = 2.0`
+                        -factor the interval grows by on every idle or failed poll
+                @param `maxRequestsPerMinute : int = 20`
+                        -most feed requests sent in any 60 second window
+                @param `pageSize : int = 50`
+                        -stories requested per page
+                @param `workers : int = 4`
+                        -threads the handlers run on
+        """
+
+        self.toolbox = toolbox
+        self.highWaterMark = highWaterMark
+        self.minInterval = minInterval
+        self.maxInterval = maxInterval
+        self.backoff = backoff
+        self.maxRequestsPerMinute = maxRequestsPerMinute
+        self.pageSize = pageSize
+
+        self.__clock = clock
+        self.__workers = workers
+        self.__executor = None
+        self.__handlers = []
+        self.__interval = minInterval
+        self.__requestTimes = deque()
+        self.__backlog = []
+        self.__cursor = None
+        self.__stop = threading.Event()
+        self.__thread = None
+        self.__lock = threading.Lock()
+        self.__counters = {"polls" : 0, "requests" : 0, "failedPolls" : 0, "events" : 0, "handlerErrors" : 0}
+
+
+    def addHandler(self, handler, kinds = None) -> None:
+        """
+            Brief:
+                Registers a function to call with every new story.
+
+            Args:
+                @param `handler : function`
+                        -called as `handler(kind, story)` on a worker thread. Handlers for different stories may run at the same time
+                @param `kinds : set = None`
+                        -only call the handler for these kinds, ex `{PAYMENT_RECEIVED, REQUEST_RECEIVED}`. None calls it for every story
+
+            Returns:
+                `None`
+        """
+
+        self.__handlers.append((handler, set(kinds) if kinds is not None else None))
+
+
+    def start(self) -> "ActivityWatcher":
+        """
+            Brief:
+                Starts polling on a background thread.
+
+            Returns:
+                `ActivityWatcher` : this watcher
+        """
+
+        self.__stop.clear()
+        self.__executor = ThreadPoolExecutor(max_workers = self.__workers)
+        self.__thread = threading.Thread(target = self.__run, daemon = True)
+        self.__thread.start()
+
+        return self
+
+
+    def stop(self, wait = True) -> None:
+        """
+            Brief:
+                Stops polling. Handlers that are already running are finished first if `wait` is set.
+
+            Args:
+                @param `wait : bool = True`
+                        -wait for the poll thread and running handlers to finish
+
+            Returns:
+                `None`
+        """
+
+        self.__stop.set()
+
+        if (self.__thread is not None and wait):
+            self.__thread.join()
+
+        self.__thread = None
+
+        if (self.__executor is not None):
+            self.__executor.shutdown(wait = wait)
+            self.__executor = None
+
+
+    def pollOnce(self) -> int:
+        """
+            Brief:
+                Fetches the stories newer than the high water mark, pages back through the feed if they do not fit in one page, and dispatches them oldest first. If the request budget for this minute or the api gives out while paging, the stories read so far and the page to continue from are kept, and the next poll resumes paging there instead of starting over, so a backlog longer than the budget still catches up.
+
+            Returns:
+                `int` : number of new stories dispatched. -1 if the request budget ran out before every new story was read, the rest are read on the next polls. 0 if the api answered with an error instead of a page, the poll is counted in `failedPolls` and the high water mark is left alone
+        """
+
+        with self.__lock:
+            self.__counters["polls"] += 1
+
+        newStories = list(self.__backlog)
+        beforeID = self.__cursor
+
+        while (True):
+
+            if (not self.__takeRequest()):
+                self.__backlog, self.__cursor = newStories, beforeID
+                return -1
+
+            with self.toolbox.priority(VenmoScheduler.BACKGROUND):
+                page = self.toolbox.getActivityFeed(self.pageSize, beforeID).get("data")
+
+            if (not isinstance(page, list)):
+                self.__backlog, self.__cursor = newStories, beforeID
+                with self.__lock:
+                    self.__counters["failedPolls"] += 1
+                return 0
+
+            if (self.highWaterMark is None):
+                self.highWaterMark = max((int(story["id"]) for story in page), default = 0)
+                return 0
+
+            fresh = [story for story in page if int(story["id"]) > self.highWaterMark]
+            newStories.extend(fresh)
+
+            if (len(fresh) < len(page) or len(page) < self.pageSize):
+                break
+
+            beforeID = page[-1]["id"]
+
+        self.__backlog, self.__cursor = [], None
+
+        return self.__dispatch(newStories)
+
+
+    def stats(self) -> dict:
+        """
+            Returns:
+                `dict` : number of `polls`, feed `requests`, `failedPolls`, dispatched `events` and `handlerErrors`, plus the current poll `interval`, `highWaterMark` and the number of stories read into the `backlog` but not dispatched yet
+        """
+
+        with self.__lock:
+            result = dict(self.__counters)
+
+        result["interval"] = self.__interval
+        result["backlog"] = len(self.__backlog)
+        result["highWaterMark"] = self.highWaterMark
+
+        return result
+
+
+    def __run(self) -> None:
+
+        while (not self.__stop.is_set()):
+
+            try:
+                found = self.pollOnce()
+            except Exception:
+                with self.__lock:
+                    self.__counters["failedPolls"] += 1
+                found = 0
+
+            if (found != 0):
+                self.__interval = self.minInterval
+            else:
+                self.__interval = min(self.maxInterval, self.__interval * self.backoff)
+
+            self.__stop.wait(self.__interval)
+
+
+    def __takeRequest(self) -> bool:
+
+        now = self.__clock()
+
+        while (self.__requestTimes and now - self.__requestTimes[0] >= 60.0):
+            self.__requestTimes.popleft()
+
+        if (len(self.__requestTimes) >= self.maxRequestsPerMinute):
+            return False
+
+        self.__requestTimes.append(now)
+
+        with self.__lock:
+            self.__counters["requests"] += 1
+
+        return True
+
+
+    def __dispatch(self, stories) -> int:
+
+        stories.sort(key = lambda story : int(story["id"]))
+
+        for story in stories:
+
+            kind = classifyStory(story, self.toolbox.userid)
+
+            for handler, kinds in self.__handlers:
+                if (kinds is None or kind in kinds):
+                    self.__submit(handler, kind, story)
+
+            self.highWaterMark = max(self.highWaterMark, int(story["id"]))
+
+        with self.__lock:
+            self.__counters["events"] += len(stories)
+
+        return len(stories)
+
+
+    def __submit(self, handler, kind, story) -> None:
+
+        def call():
+            try:
+                handler(kind, story)
+            except Exception:
+                with self.__lock:
+                    self.__counters["handlerErrors"] += 1
+
+        if (self.__executor is None):
+            call()
+        else:
+            self.__executor.submit(call)
+
+
+
+def printStory(kind, story) -> None:
+
+    payment = story.get("payment", {})
+    actor = payment.get("actor", {}).get("username", "")
+    target = payment.get("target", {}).get("user", {}).get("username", "")
+
+    print("{:<16} {:>10} {} -> {} \"{}\"".format(kind, str(payment.get("amount", "")), actor, target, payment.get("note", "")))
+
+
+def main(args) -> None:
+
+    parser = argparse.ArgumentParser(description = "Watches the activity feed of the account in auth.json and prints new payments and requests.")
+    parser.add_argument("--min-interval", type = float, default = 2.0)
+    parser.add_argument("--max-interval", type = float, default = 60.0)
+    parser.add_argument("--max-requests-per-minute", type = int, default = 20)
+    parser.add_argument("--since", type = int, default = None, help = "high water mark to resume from, the id of the newest story already handled")
+    options = parser.parse_args(args)
+
+    toolbox = VenmoToolbox.VenmoToolbox(autoRevokeTokenOnDelete = False)
+    toolbox.events.addSink(VenmoEvents.TextSink(sys.stdout, verbose = False))
+
+    if (not toolbox.login()):
+        toolbox.events.close()
+        return
+
+    watcher = ActivityWatcher(toolbox, options.since, options.min_interval, options.max_interval, maxRequestsPerMinute = options.max_requests_per_minute)
+    watcher.addHandler(printStory)
+    watcher.start()
+
+    try:
+        while (True):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+        toolbox.events.close()
+        print("Stopped at high water mark " + str(watcher.highWaterMark))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,73 @@
+import io
+import os
+import sys
+import json
+import gc
+import threading
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import VenmoEvents
+import VenmoBenchmarks
+
+
+def test_payment_events_with_decimal_amounts_are_written_as_json():
+
+    toolbox = VenmoBenchmarks.makeFakeToolbox()
+    stream = io.StringIO()
+    toolbox.events.addSink(VenmoEvents.JsonLinesSink(stream = stream))
+
+    assert toolbox.requestMoneyByUserID(Decimal("2.50"), "2000000000000000002", "lunch")
+    assert toolbox.events.flush()
+
+    payments = [line for line in map(json.loads, stream.getvalue().splitlines()) if line["kind"] == VenmoEvents.PAYMENT]
+
+    assert [payment["amount"] for payment in payments] == ["-2.50"]
+    assert toolbox.events.stats()["sinkErrors"] == 0
+
+
+def test_sink_error_only_drops_the_failing_event():
+
+    bus = VenmoEvents.EventBus()
+    stream = io.StringIO()
+    bus.addSink(VenmoEvents.JsonLinesSink(stream = stream))
+
+    bus.emit(VenmoEvents.PAYMENT, "first")
+    bus.emit(VenmoEvents.PAYMENT, "bad", amount = object())
+    bus.emit(VenmoEvents.PAYMENT, "last")
+    assert bus.flush()
+
+    assert [json.loads(line)["message"] for line in stream.getvalue().splitlines()] == ["first", "last"]
+    assert bus.stats()["sinkErrors"] == 1
+
+
+def test_close_stops_the_dispatcher_thread():
+
+    gc.collect()
+    before = threading.active_count()
+
+    bus = VenmoEvents.EventBus()
+    sink = bus.addSink(VenmoEvents.MemorySink())
+    bus.emit(VenmoEvents.PAYMENT, "queued before close")
+    assert threading.active_count() == before + 1
+
+    bus.close()
+
+    assert threading.active_count() == before
+    assert [event.message for event in sink.events()] == ["queued before close"]
+
+
+def test_dropping_a_toolbox_stops_its_dispatcher_thread():
+
+    gc.collect()
+    before = threading.active_count()
+
+    toolbox = VenmoBenchmarks.makeFakeToolbox()
+    toolbox.events.addSink(VenmoEvents.MemorySink())
+    assert threading.active_count() == before + 1
+
+    del toolbox
+    gc.collect()
+
+    assert threading.active_count() == before
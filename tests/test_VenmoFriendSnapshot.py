@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import VenmoFriendSnapshot
+
+
+def friendList(*usernames):
+    return {"data" : [{"id" : str(index), "username" : username} for index, username in enumerate(usernames)]}
+
+
+def test_snapshot_of_another_account_is_reset(tmp_path):
+
+    path = str(tmp_path / "friends_snapshot.json")
+
+    delta = VenmoFriendSnapshot.SnapshotStore(path).update(friendList("alice", "bob"), "1")
+    assert [friend["username"] for friend in delta.added] == ["alice", "bob"]
+
+    store = VenmoFriendSnapshot.SnapshotStore(path)
+    assert store.latest("2") is None
+
+    delta = store.update(friendList("carol"), "2")
+    assert delta.previous is None
+    assert [friend["username"] for friend in delta.added] == ["carol"]
+    assert delta.removed == []
+
+    store = VenmoFriendSnapshot.SnapshotStore(path)
+    assert store.latest("1") is None
+    assert store.latest("2").userID == "2"
+    assert store.update(friendList("carol"), "2").unchanged
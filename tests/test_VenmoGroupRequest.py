@@ -0,0 +1,46 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import VenmoBenchmarks
+import VenmoGroupRequest
+
+
+def test_errors_are_not_retried_unless_asked_and_found_in_the_feed():
+
+    toolbox = VenmoBenchmarks.makeFakeToolbox()
+    backend = toolbox.session.backend
+    handle = backend.handle
+    dropped = {"2000000000000000002", "2000000000000000003"}
+    refused = {"2000000000000000004"}
+
+    def failingHandle(method, url, headers = None, body = None):
+
+        if (method == "POST" and "/payments" in url and body.get("user_id") in refused):
+            return 500, {}, b'{"error":{"code":500,"message":"Internal error"}}'
+
+        if (method == "POST" and "/payments" in url and body.get("user_id") in dropped):
+            dropped.discard(body.get("user_id"))
+            handle(method, url, headers, body)
+            raise ConnectionError("Connection dropped after the request was sent")
+
+        return handle(method, url, headers, body)
+
+    backend.handle = failingHandle
+
+    group = VenmoGroupRequest.GroupRequest(toolbox)
+    result = group.send("30.00", ["2000000000000000002", "2000000000000000003", "2000000000000000004"], "dinner")
+
+    assert [member.status for member in result.members] == [VenmoGroupRequest.ERROR, VenmoGroupRequest.ERROR, VenmoGroupRequest.FAILED]
+    assert result.retryList() == [result.members[2]]
+
+    refused.clear()
+    group.retry(result)
+
+    assert [member.status for member in result.members] == [VenmoGroupRequest.ERROR, VenmoGroupRequest.ERROR, VenmoGroupRequest.REQUESTED]
+    assert len(backend.payments) == 3
+
+    assert group.confirmErrors(result) == 2
+    assert result.ok()
+    assert result.retryList((VenmoGroupRequest.ERROR,)) == []
@@ -0,0 +1,87 @@
+import io
+import os
+import sys
+import json
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import VenmoCodec
+import VenmoLazyView
+import VenmoOutput
+
+
+DOCUMENT = {"skipped" : [1, {"a" : "}]\\\"{["}, "é"], "escaped\"key" : "ü", "empty" : {}, "none" : None, "data" : [{"id" : str(index), "user" : {"username" : "user-" + str(index)}} for index in range(5)]}
+
+
+def test_views_read_the_same_values_as_decoding():
+
+    for text in (json.dumps(DOCUMENT), json.dumps(DOCUMENT, indent = 2, ensure_ascii = False)):
+
+        view = VenmoLazyView.LazyView(text.encode("UTF-8"))
+
+        assert view.path("data", 3, "user", "username") == "user-3"
+        assert view["escaped\"key"] == "ü"
+        assert view["none"] is None
+        assert list(view) == list(DOCUMENT)
+        assert list(view["data"]) == DOCUMENT["data"]
+        assert view.toJson() == DOCUMENT
+
+
+def test_output_renders_views_like_decoded_json():
+
+    view = VenmoLazyView.LazyView(json.dumps(DOCUMENT).encode("UTF-8"))
+
+    assert list(VenmoOutput.flatten(view)) == list(VenmoOutput.flatten(DOCUMENT))
+
+    for render in (VenmoOutput.renderFlat, VenmoOutput.renderJson, VenmoOutput.renderNdjson):
+
+        rendered = []
+
+        for obj in (view, DOCUMENT):
+            stream = io.StringIO()
+            writer = VenmoOutput.BufferedWriter(stream)
+            render(obj, writer)
+            writer.flush()
+            rendered.append(stream.getvalue())
+
+        assert rendered[0] == rendered[1]
+
+
+def test_json_output_is_the_same_with_every_codec(monkeypatch):
+
+    view = VenmoLazyView.LazyView(json.dumps(DOCUMENT).encode("UTF-8"))
+    rendered = set()
+
+    for name in VenmoCodec.CODECS:
+
+        monkeypatch.setattr(VenmoOutput, "_CODEC", VenmoCodec.getCodec(name))
+
+        for render in (VenmoOutput.renderJson, VenmoOutput.renderNdjson):
+            stream = io.StringIO()
+            writer = VenmoOutput.BufferedWriter(stream)
+            render(view, writer)
+            writer.flush()
+            rendered.add((render.__name__, stream.getvalue()))
+
+    assert len(rendered) == 2
+
+
+def test_truncated_bodies_fail_fast():
+
+    full = json.dumps({"data" : [{"id" : str(index), "note" : "a \\\"quoted\\\" note " * 50} for index in range(2000)], "next" : None}).encode("UTF-8")
+
+    for cut in (len(full) // 2, full.index(b"quoted") + 3, full.rindex(b"}, {") + 3):
+
+        view = VenmoLazyView.LazyView(full[:cut])
+        start = time.monotonic()
+
+        with pytest.raises(ValueError):
+            view.get("next")
+
+        with pytest.raises(ValueError):
+            len(view["data"])
+
+        assert time.monotonic() - start < 2.0
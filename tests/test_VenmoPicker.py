@@ -0,0 +1,49 @@
+import os
+import sys
+from contextlib import nullcontext
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import VenmoPicker
+
+
+class SearchToolbox():
+    """
+        Brief:
+            Stand in for a logged in toolbox that answers user searches with the given results, one per call.
+    """
+
+    def __init__(self, *results):
+
+        self.results = list(results)
+        self.queries = []
+
+
+    def priority(self, priority):
+        return nullcontext()
+
+
+    def searchUsers(self, query, limit = 50, deadline = None):
+
+        self.queries.append(query)
+
+        return self.results.pop(0)
+
+
+
+def test_failed_search_is_sent_again():
+
+    toolbox = SearchToolbox(None, [{"id" : "2", "username" : "alice"}])
+    picker = VenmoPicker.UserPicker(toolbox, debounce = 0)
+
+    picker.suggest("al")
+    assert picker.wait(2) is None
+    assert picker.stats()["failedSearches"] == 1
+
+    picker.suggest("al")
+    assert [user["username"] for user in picker.wait(2)] == ["alice"]
+    assert toolbox.queries == ["al", "al"]
+
+    picker.suggest("ali")
+    assert [user["username"] for user in picker.suggest("ali")] == ["alice"]
+    assert toolbox.queries == ["al", "al"]
@@ -0,0 +1,56 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import VenmoBenchmarks
+import VenmoFakeBackend
+import VenmoRecordReplay
+
+
+def pageFeed(toolbox) -> list:
+
+    storyIDs = []
+    beforeID = None
+
+    while (True):
+
+        page = toolbox.getActivityFeed(limit = 2, beforeID = beforeID)["data"]
+
+        if (not page):
+            return storyIDs
+
+        storyIDs.extend(story["id"] for story in page)
+        beforeID = page[-1]["id"]
+
+
+def test_scrub_url_pseudonymizes_ids_in_the_query():
+
+    scrubber = VenmoRecordReplay.Scrubber(b"secret")
+    scrubbed = scrubber.scrubUrl("https://api.venmo.com/v1/stories/target-or-actor/42?limit=50&before_id=4000000000000000003")
+
+    assert scrubbed == "/stories/target-or-actor/" + scrubber.pseudonymID("42") + "?limit=50&before_id=" + scrubber.pseudonymID("4000000000000000003")
+
+
+def test_paging_by_story_id_replays_without_misses(tmp_path):
+
+    backend = VenmoFakeBackend.FakeVenmoBackend(userCount = 10, friendCount = 5)
+    toolbox = VenmoBenchmarks.makeFakeToolbox(backend)
+
+    for index in range(5):
+        backend.addActivity("2", toolbox.userid, amount = index + 1.0)
+
+    recording = VenmoRecordReplay.RecordingSession(toolbox.session)
+    toolbox.session = recording
+
+    recorded = pageFeed(toolbox)
+    recording.save(str(tmp_path / "feed.jsonl"))
+
+    replay = VenmoRecordReplay.ReplaySession(str(tmp_path / "feed.jsonl"))
+    toolbox.session = replay
+    toolbox.userid = recording.scrubber.pseudonymID(toolbox.userid)
+
+    replayed = pageFeed(toolbox)
+
+    assert len(replayed) == len(recorded) == 5
+    assert replay.misses == 0
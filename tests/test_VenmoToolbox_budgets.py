@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import VenmoToolbox
+import VenmoBenchmarks
+
+
+@pytest.fixture(scope = "module")
+def budgetResults():
+    return VenmoBenchmarks.checkRequestBudgets()
+
+
+def test_every_budgeted_method_is_checked():
+
+    assert set(VenmoToolbox.REQUEST_BUDGETS) == set(VenmoBenchmarks.BUDGET_CALLS)
+
+
+@pytest.mark.parametrize("name", sorted(VenmoToolbox.REQUEST_BUDGETS))
+def test_method_stays_within_its_request_budget(budgetResults, name):
+
+    result = budgetResults[name]
+
+    assert result["cold"] <= result["coldBudget"], name + " sent " + str(result["cold"]) + " requests with an empty identity cache"
+    assert result["warm"] <= result["warmBudget"], name + " sent " + str(result["warm"]) + " requests with a warm identity cache"
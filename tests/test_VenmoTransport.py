@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import VenmoTransport
+import VenmoFakeBackend
+import VenmoCircuitBreaker
+import VenmoConcurrencyLimiter
+
+
+def test_open_circuit_fails_fast_without_waiting_for_a_slot():
+
+    limiter = VenmoConcurrencyLimiter.AdaptiveLimiter(initialLimit = 1, maxLimit = 1)
+    transport = VenmoTransport.Transport(VenmoFakeBackend.FakeSession(), limiter = limiter)
+    breaker = VenmoCircuitBreaker.CircuitBreaker("users", windowSize = 2, minimumCalls = 2)
+
+    breaker.recordFailure()
+    breaker.recordFailure()
+    assert breaker.state() == VenmoCircuitBreaker.OPEN
+
+    transport.scheduler.acquire()
+
+    try:
+        start = time.monotonic()
+
+        with pytest.raises(VenmoCircuitBreaker.CircuitOpenError):
+            transport.request("GET", "https://api.venmo.com/v1/me", {}, timeout = 5.0, breaker = breaker)
+
+        assert time.monotonic() - start < 1.0
+
+    finally:
+        transport.scheduler.release(0.0)
+
+
+def test_probe_that_gets_no_slot_is_given_back():
+
+    clock = [0.0]
+    limiter = VenmoConcurrencyLimiter.AdaptiveLimiter(initialLimit = 1, maxLimit = 1)
+    transport = VenmoTransport.Transport(VenmoFakeBackend.FakeSession(), limiter = limiter)
+    breaker = VenmoCircuitBreaker.CircuitBreaker("users", windowSize = 2, minimumCalls = 2, openSeconds = 1.0, halfOpenProbes = 1, clock = lambda : clock[0])
+
+    breaker.recordFailure()
+    breaker.recordFailure()
+    clock[0] = 2.0
+
+    transport.scheduler.acquire()
+
+    with pytest.raises(VenmoConcurrencyLimiter.AcquireTimeoutError):
+        transport.request("GET", "https://api.venmo.com/v1/me", {}, timeout = 0.05, breaker = breaker)
+
+    transport.scheduler.release(0.0)
+
+    assert breaker.beforeCall()
@@ -0,0 +1,119 @@
+import os
+import sys
+from contextlib import nullcontext
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import VenmoWatcher
+
+
+class FeedToolbox():
+    """
+        Brief:
+            Stand in for a logged in toolbox that answers feed requests with the given bodies, one per call.
+    """
+
+    userid = "1"
+
+    def __init__(self, *bodies):
+
+        self.bodies = list(bodies)
+
+
+    def priority(self, priority):
+        return nullcontext()
+
+
+    def getActivityFeed(self, limit = 50, beforeID = None):
+        return self.bodies.pop(0)
+
+
+
+def story(storyID):
+    return {"id" : str(storyID), "type" : "payment", "payment" : {"action" : "pay", "actor" : {"id" : "2"}, "target" : {"user" : {"id" : "1"}}}}
+
+
+def test_error_body_on_first_poll_does_not_replay_history():
+
+    history = [story(3), story(2), story(1)]
+    toolbox = FeedToolbox({"error" : {"code" : 500, "message" : "Internal error"}}, {"data" : history}, {"data" : [story(4)] + history})
+
+    watcher = VenmoWatcher.ActivityWatcher(toolbox, pageSize = 50)
+    seen = []
+    watcher.addHandler(lambda kind, story : seen.append(story["id"]))
+
+    assert watcher.pollOnce() == 0
+    assert watcher.highWaterMark is None
+    assert watcher.stats()["failedPolls"] == 1
+
+    assert watcher.pollOnce() == 0
+    assert watcher.highWaterMark == 3
+
+    assert watcher.pollOnce() == 1
+    assert seen == ["4"]
+    assert watcher.stats()["failedPolls"] == 1
+
+
+def test_error_body_while_paging_keeps_high_water_mark():
+
+    toolbox = FeedToolbox({"data" : [story(1)]}, {"data" : [story(3), story(2)]}, {"error" : {"code" : 500}})
+
+    watcher = VenmoWatcher.ActivityWatcher(toolbox, pageSize = 2)
+    seen = []
+    watcher.addHandler(lambda kind, story : seen.append(story["id"]))
+
+    assert watcher.pollOnce() == 0
+    assert watcher.pollOnce() == 0
+    assert seen == []
+    assert watcher.highWaterMark == 1
+    assert watcher.stats()["failedPolls"] == 1
+
+
+class PagedFeedToolbox(FeedToolbox):
+    """
+        Brief:
+            Stand in for a logged in toolbox over a feed of stories, newest first, paged by `beforeID`.
+    """
+
+    def __init__(self, stories):
+
+        super().__init__()
+        self.stories = stories
+
+
+    def getActivityFeed(self, limit = 50, beforeID = None):
+
+        older = [story for story in self.stories if beforeID is None or int(story["id"]) < int(beforeID)]
+
+        return {"data" : older[:limit]}
+
+
+
+def test_backlog_longer_than_the_request_budget_catches_up():
+
+    clock = [0.0]
+    toolbox = PagedFeedToolbox([story(storyID) for storyID in range(30, 0, -1)])
+
+    watcher = VenmoWatcher.ActivityWatcher(toolbox, highWaterMark = 0, maxRequestsPerMinute = 2, pageSize = 4, clock = lambda : clock[0])
+    seen = []
+    watcher.addHandler(lambda kind, story : seen.append(int(story["id"])))
+
+    for _ in range(8):
+
+        found = watcher.pollOnce()
+        clock[0] += 60.0
+
+        if (found > 0):
+            break
+
+        assert found == -1
+        assert watcher.highWaterMark == 0
+
+    assert seen == list(range(1, 31))
+    assert watcher.highWaterMark == 30
+    assert watcher.stats()["backlog"] == 0
+
+    toolbox.stories.insert(0, story(31))
+
+    assert watcher.pollOnce() == 1
+    assert seen[-1] == 31